@@ -1,7 +1,10 @@
 from app.graph.state import PharmacyState
+from app.observability.tracing import record_step
 from app.db.database import SessionLocal
 from app.db.models import Medicine
 from app.services.order_service import create_order
+from app.services.inventory_service import sync_inventory_alerts
+from app.autonomy.refill_queue import due_queue
 
 
 def action_agent(state: PharmacyState) -> PharmacyState:
@@ -17,6 +20,7 @@ def action_agent(state: PharmacyState) -> PharmacyState:
         medicines = state["extraction"]["medicines"]
 
         order_items = []
+        touched = []
 
         for item in medicines:
             medicine = (
@@ -27,6 +31,7 @@ def action_agent(state: PharmacyState) -> PharmacyState:
             )
 
             medicine.stock_quantity -= item["quantity"]
+            touched.append(medicine)
 
             order_items.append({
                 "medicine_id": medicine.id,
@@ -34,6 +39,9 @@ def action_agent(state: PharmacyState) -> PharmacyState:
                 "dosage": item.get("dosage", ""),
             })
 
+        # Commits together with the stock change in create_order
+        sync_inventory_alerts(db, touched)
+
         order = create_order(db, customer_id, order_items)
 
         state["execution"] = {
@@ -41,14 +49,16 @@ def action_agent(state: PharmacyState) -> PharmacyState:
             "actions": ["order_created", "inventory_updated"],
         }
 
-        state["decision_trace"].append({
-            "agent": "action_agent",
-            "input": order_items,
-            "decision": "executed",
-            "output": state["execution"],
-        })
+        record_step(
+            state, "action_agent", "executed",
+            lambda: {
+                "input": order_items,
+                "output": state["execution"],
+            }
+        )
 
         db.commit()
+        due_queue.notify_order(customer_id)
         return state
 
     except Exception as e:
@@ -1,6 +1,7 @@
 # backend/app/agents/conversation_agent.py
 
 from app.graph.state import PharmacyState
+from app.observability.tracing import record_step
 import re
 
 def conversation_agent(state: PharmacyState) -> PharmacyState:
@@ -57,12 +58,13 @@ def conversation_agent(state: PharmacyState) -> PharmacyState:
         "medicines": medicines
     }
 
-    state["decision_trace"].append({
-        "agent": "conversation_agent",
-        "input": message,
-        "reasoning": f"Extracted {len(medicines)} medicine(s) from message (quantity: {default_quantity})",
-        "decision": "extracted" if medicines else "no_medicines_found",
-        "output": state["extraction"]
-    })
+    record_step(
+        state, "conversation_agent", "extracted" if medicines else "no_medicines_found",
+        lambda: {
+            "input": message,
+            "reasoning": f"Extracted {len(medicines)} medicine(s) from message (quantity: {default_quantity})",
+            "output": state["extraction"]
+        }
+    )
 
     return state
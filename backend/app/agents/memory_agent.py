@@ -1,12 +1,13 @@
 from app.graph.state import PharmacyState
-from app.db.database import SessionLocal
+from app.observability.tracing import record_step
+from app.db.database import ReadSessionLocal
 from app.db.models import OrderHistory
 
 
 def memory_agent(state: PharmacyState) -> PharmacyState:
     assert isinstance(state, dict), f"STATE CORRUPTED: {type(state)}"
 
-    db = SessionLocal()
+    db = ReadSessionLocal()
     try:
         customer_id = state["customer"]["id"]
 
@@ -29,13 +30,14 @@ def memory_agent(state: PharmacyState) -> PharmacyState:
 
         state["meta"]["customer_history"] = history_payload
 
-        state["decision_trace"].append({
-            "agent": "memory_agent",
-            "input": {"customer_id": customer_id},
-            "reasoning": f"Fetched {len(history_payload)} previous orders",
-            "decision": "context_provided",
-            "output": history_payload,
-        })
+        record_step(
+            state, "memory_agent", "context_provided",
+            lambda: {
+                "input": {"customer_id": customer_id},
+                "reasoning": f"Fetched {len(history_payload)} previous orders",
+                "output": history_payload,
+            }
+        )
 
         return state
 
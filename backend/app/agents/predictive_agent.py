@@ -1,26 +1,27 @@
-from datetime import datetime, timedelta
-from app.db.database import SessionLocal
-from app.services.order_service import get_customer_history
+from datetime import datetime
+from app.db.database import ReadSessionLocal
+from app.autonomy.consumption_model import forecast_customers
 
-def predictive_agent(customer_id: int):
-    db = SessionLocal()
-    history = get_customer_history(db, customer_id)
+PROACTIVE_REFILL_DAYS = 5
 
-    predictions = []
 
-    for record in history:
-        last_purchase = record.purchase_date
-        duration = record.prescribed_duration or 30
+def predictive_agent(customer_id: int):
+    db = ReadSessionLocal()
+    try:
+        fc = forecast_customers(db, [customer_id])
+        days_left = fc.days_remaining(datetime.utcnow())
 
-        expected_end = last_purchase + timedelta(days=duration)
-        days_left = (expected_end - datetime.utcnow()).days
+        predictions = []
 
-        if days_left <= 5:
-            predictions.append({
-                "customer_id": customer_id,
-                "medicine": record.medicine_name,
-                "days_left": days_left,
-                "action": "proactive_refill"
-            })
+        for i in range(len(fc)):
+            if days_left[i] <= PROACTIVE_REFILL_DAYS:
+                predictions.append({
+                    "customer_id": customer_id,
+                    "medicine": fc.medicine_name(i),
+                    "days_left": int(days_left[i]),
+                    "action": "proactive_refill"
+                })
 
-    return predictions
+        return predictions
+    finally:
+        db.close()
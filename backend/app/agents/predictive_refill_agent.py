@@ -1,40 +1,39 @@
 from datetime import datetime
 from app.graph.state import PharmacyState
-from app.db.database import SessionLocal
-from app.db.models import OrderHistory
+from app.observability.tracing import record_step
+from app.db.database import ReadSessionLocal
+from app.autonomy.consumption_model import forecast_customers
+from app.autonomy.refill_engine import REFILL_ALERT_WINDOW_DAYS
 
 
 def predictive_refill_agent(state: PharmacyState) -> PharmacyState:
     assert isinstance(state, dict), f"STATE CORRUPTED: {type(state)}"
 
-    db = SessionLocal()
+    db = ReadSessionLocal()
     try:
         customer_id = state["customer"]["id"]
 
-        history = (
-            db.query(OrderHistory)
-            .filter(OrderHistory.customer_id == customer_id)
-            .order_by(OrderHistory.created_at.desc())
-            .all()
-        )
+        # Same arrays and model as the refill engine
+        fc = forecast_customers(db, [customer_id])
+        days_remaining = fc.days_remaining(datetime.utcnow())
 
         alerts = []
 
-        for record in history:
-            days_since = (datetime.utcnow() - record.created_at).days
-            if days_since >= 1:
+        for i in range(len(fc)):
+            if days_remaining[i] <= REFILL_ALERT_WINDOW_DAYS:
                 alerts.append({
-                    "medicine": record.medicine_name,
+                    "medicine": fc.medicine_name(i),
+                    "days_remaining": int(days_remaining[i]),
+                    "daily_rate": round(float(fc.daily_rate[i]), 2),
                     "message": "Likely running low",
                 })
 
         state["meta"]["refill_alerts"] = alerts
 
-        state["decision_trace"].append({
-            "agent": "predictive_refill_agent",
-            "decision": "alerts_generated",
-            "output": alerts,
-        })
+        record_step(
+            state, "predictive_refill_agent", "alerts_generated",
+            lambda: {"output": alerts}
+        )
 
         return state
 
@@ -1,9 +1,10 @@
 import re
 from datetime import datetime
 from app.graph.state import PharmacyState
-from app.db.database import SessionLocal
+from app.db.database import ReadSessionLocal
 from app.db.models import Medicine, Prescription
 from app.rules.safety_rules import MAX_QTY_PER_ORDER
+from app.observability.tracing import discard, record_step, trace_level
 
 # 1A️⃣ OTC ALLOWLIST LOGIC
 # Policy: If prescription_required == false → prescription is NOT needed
@@ -41,11 +42,18 @@ def safety_agent(state: PharmacyState) -> PharmacyState:
     # 🔒 HARD ASSERTION — non-negotiable
     assert isinstance(state, dict), f"STATE CORRUPTED: {type(state)}"
 
-    db = SessionLocal()
+    db = ReadSessionLocal()
 
     violations = []
     clarification_questions = []
+    # Reasoning is noted as (template, args) and formatted only when the
+    # step is recorded at full detail (record_step's build below)
     reasoning_steps = []
+    if trace_level(state) == "full":
+        def note(template, *args):
+            reasoning_steps.append((template, args))
+    else:
+        note = discard
     error_type = None  # Will be VALIDATION, SAFETY, or SYSTEM
     decision = "approved"  # Can be: approved, clarification_required, blocked
 
@@ -55,7 +63,7 @@ def safety_agent(state: PharmacyState) -> PharmacyState:
     if not medicines:
         error_type = "VALIDATION"
         violations.append("No medicines requested")
-        reasoning_steps.append("No medicines found in extraction")
+        note("No medicines found in extraction")
         decision = "blocked"
     else:
         # --- Normalization helpers ---
@@ -94,24 +102,18 @@ def safety_agent(state: PharmacyState) -> PharmacyState:
             if not medicine:
                 error_type = "VALIDATION"
                 violations.append(f"Medicine not found: {name}")
-                reasoning_steps.append(
-                    f"❌ Medicine '{name}' not found in inventory (normalized lookup failed)"
-                )
+                note("❌ Medicine '{}' not found in inventory (normalized lookup failed)", name)
                 decision = "blocked"
                 continue
 
             if not medicine:
                 error_type = "VALIDATION"
                 violations.append(f"Medicine not found: {name}")
-                reasoning_steps.append(
-                    f"❌ Medicine '{name}' not found in inventory"
-                )
+                note("❌ Medicine '{}' not found in inventory", name)
                 decision = "blocked"
                 continue
 
-            reasoning_steps.append(
-                f"✅ Found medicine '{medicine.name}' (OTC={not medicine.prescription_required})"
-            )
+            note("✅ Found medicine '{}' (OTC={})", medicine.name, not medicine.prescription_required)
 
             # 2️⃣ Quantity rule
             if quantity > MAX_QTY_PER_ORDER:
@@ -119,9 +121,7 @@ def safety_agent(state: PharmacyState) -> PharmacyState:
                 violations.append(
                     f"Quantity {quantity} exceeds allowed limit ({MAX_QTY_PER_ORDER})"
                 )
-                reasoning_steps.append(
-                    f"⚠️ Quantity {quantity} exceeds max limit of {MAX_QTY_PER_ORDER}"
-                )
+                note("⚠️ Quantity {} exceeds max limit of {}", quantity, MAX_QTY_PER_ORDER)
                 decision = "blocked"
 
             # 3️⃣ Stock check (always required)
@@ -131,14 +131,13 @@ def safety_agent(state: PharmacyState) -> PharmacyState:
                     f"Insufficient stock for {medicine.name} "
                     f"(available: {medicine.stock_quantity}, requested: {quantity})"
                 )
-                reasoning_steps.append(
-                    f"❌ Stock insufficient: {medicine.stock_quantity} available, {quantity} requested"
+                note(
+                    "❌ Stock insufficient: {} available, {} requested",
+                    medicine.stock_quantity, quantity
                 )
                 decision = "blocked"
             else:
-                reasoning_steps.append(
-                    f"✅ Stock available: {medicine.stock_quantity} units"
-                )
+                note("✅ Stock available: {} units", medicine.stock_quantity)
 
             # 1B️⃣ MAX DOSAGE ENFORCEMENT
             # Parse dosage and validate against safe limits
@@ -151,23 +150,17 @@ def safety_agent(state: PharmacyState) -> PharmacyState:
                     violations.append(
                         f"Dosage {dosage_value}mg exceeds safe daily limit ({safe_limit}mg)"
                     )
-                    reasoning_steps.append(
-                        f"⚠️ Dosage {dosage_value}mg exceeds safe daily limit of {safe_limit}mg"
-                    )
+                    note("⚠️ Dosage {}mg exceeds safe daily limit of {}mg", dosage_value, safe_limit)
                     decision = "blocked"
                 else:
-                    reasoning_steps.append(
-                        f"✅ Dosage {dosage_value}mg within safe limit ({safe_limit}mg/day)"
-                    )
+                    note("✅ Dosage {}mg within safe limit ({}mg/day)", dosage_value, safe_limit)
             elif dosage_value == 0:
                 # 1C️⃣ CLARIFICATION INSTEAD OF HARD BLOCK
                 # Missing dosage info: ask instead of block
                 clarification_questions.append(
                     f"How many mg per dose of {medicine.name}? (e.g., 500mg)"
                 )
-                reasoning_steps.append(
-                    f"❓ Dosage not specified for {medicine.name}"
-                )
+                note("❓ Dosage not specified for {}", medicine.name)
                 if decision == "approved":
                     decision = "clarification_required"
 
@@ -189,19 +182,13 @@ def safety_agent(state: PharmacyState) -> PharmacyState:
                     violations.append(
                         f"Valid prescription required for {medicine.name}"
                     )
-                    reasoning_steps.append(
-                        f"❌ No valid prescription found for Rx medicine '{medicine.name}'"
-                    )
+                    note("❌ No valid prescription found for Rx medicine '{}'", medicine.name)
                     decision = "blocked"
                 else:
-                    reasoning_steps.append(
-                        f"✅ Valid prescription found for Rx medicine '{medicine.name}'"
-                    )
+                    note("✅ Valid prescription found for Rx medicine '{}'", medicine.name)
             else:
                 # ✅ OTC medicine — EXPLICITLY allowed without prescription (OTC allowlist)
-                reasoning_steps.append(
-                    f"✅ '{medicine.name}' is OTC — no prescription required (OTC allowlist)"
-                )
+                note("✅ '{}' is OTC — no prescription required (OTC allowlist)", medicine.name)
 
     # Finalize decision
     # 1C️⃣ CLARIFICATION INSTEAD OF HARD BLOCK
@@ -230,13 +217,16 @@ def safety_agent(state: PharmacyState) -> PharmacyState:
         "error_type": error_type  # VALIDATION, SAFETY, SYSTEM, or None if approved
     }
 
-    state["decision_trace"].append({
-        "agent": "safety_agent",
-        "input": medicines,
-        "reasoning": reasoning_steps,
-        "decision": decision,
-        "output": state["safety"]
-    })
+    # Blocked runs are always kept, with full detail
+    record_step(
+        state, "safety_agent", decision,
+        lambda: {
+            "input": medicines,
+            "reasoning": [template.format(*args) for template, args in reasoning_steps],
+            "output": state["safety"]
+        },
+        keep=decision == "blocked"
+    )
 
     db.close()
     return state
@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.db.database import ReadSessionLocal
+from app.security.admin_auth import admin_auth
+from app.services.analytics_service import GRANULARITIES, SEGMENTS, query_sales
+
+"""
+Analytics Admin API
+
+Purpose:
+- Sales time series per medicine and customer segment
+- Served from the pre-aggregated sales_rollups table (hour / day
+  buckets maintained on every order), so a range query reads one row
+  per bucket instead of scanning order history
+"""
+
+router = APIRouter(
+    prefix="/admin/analytics",
+    tags=["admin"]
+)
+
+DEFAULT_RANGE_DAYS = 30
+
+
+class SalesPointOut(BaseModel):
+    bucket: datetime
+    medicine_name: str
+    segment: str
+    units: int
+    purchases: int
+
+
+@router.get("/sales", response_model=List[SalesPointOut], dependencies=[Depends(admin_auth)])
+def get_sales(
+    granularity: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    medicine: Optional[str] = None,
+    segment: Optional[str] = None
+):
+    """
+    Units sold and purchase counts per bucket in [start, end).
+
+    Admin-only endpoint.
+    - granularity: "hour" or "day" (hourly buckets are kept for 90 days;
+      the part of an hourly range before that comes back in daily buckets)
+    - start / end: defaults to the last 30 days
+    - medicine: filter to one medicine name
+    - segment: "new" (customer's first purchase) or "returning"
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"Unsupported granularity: {granularity}")
+    if segment is not None and segment not in SEGMENTS:
+        raise HTTPException(status_code=400, detail=f"Unknown segment: {segment}")
+
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS)
+
+    db = ReadSessionLocal()
+    try:
+        rows = query_sales(db, granularity, start, end, medicine_name=medicine, segment=segment)
+
+        return ORJSONResponse([
+            {
+                "bucket": bucket,
+                "medicine_name": medicine_name,
+                "segment": segment,
+                "units": units,
+                "purchases": purchases
+            }
+            for bucket, medicine_name, segment, units, purchases in rows
+        ])
+    finally:
+        db.close()
@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List
 
-from app.db.database import SessionLocal
+from app.db.database import ReadSessionLocal
 from app.db.models import Customer
 from app.graph.pharmacy_workflow import run_workflow
 
@@ -40,7 +40,7 @@ def chat(request: ChatRequest):
     - clarification_required: Ask user for more info, no violation
     - blocked: Safety violation, cannot proceed
     """
-    db = SessionLocal()
+    db = ReadSessionLocal()
 
     try:
         customer = db.query(Customer).filter(
@@ -0,0 +1,135 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Request, Response
+
+from app.config import DATA_VERSION_TTL_SECONDS
+from app.db.database import ReadSessionLocal
+from app.db.versioning import add_bump_listener, read_version
+
+"""
+Conditional GET caching
+
+Purpose:
+- ETags derived from a table's data version plus the query string
+- If-None-Match hits return 304 from the in-process version cache,
+  without opening a DB session
+- Rendered bodies are kept in a small LRU keyed by (path, query,
+  version), so repeated polls between changes skip query and render
+
+The cached version is trusted for DATA_VERSION_TTL_SECONDS; commits in
+this process invalidate it at once, commits elsewhere within the TTL.
+"""
+
+# Rendered bodies kept across all cached endpoints
+BODY_CACHE_SIZE = 64
+
+# Headers from the rendered response replayed on cache hits
+CACHED_HEADERS = ("x-next-cursor",)
+
+
+class VersionCache:
+
+    def __init__(self, ttl: float = DATA_VERSION_TTL_SECONDS):
+        self.ttl = ttl
+        self._versions = {}  # name -> (version, read_at)
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> int:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._versions.get(name)
+        if cached is not None and now - cached[1] < self.ttl:
+            return cached[0]
+
+        db = ReadSessionLocal()
+        try:
+            version = read_version(db, name)
+        finally:
+            db.close()
+
+        with self._lock:
+            self._versions[name] = (version, now)
+        return version
+
+    def forget(self, name: str):
+        with self._lock:
+            self._versions.pop(name, None)
+
+
+class BodyCache:
+
+    def __init__(self, size: int = BODY_CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+versions = VersionCache()
+bodies = BodyCache()
+
+add_bump_listener(versions.forget)
+
+
+def make_etag(name: str, version: int, query: str) -> str:
+    digest = hashlib.blake2b(query.encode(), digest_size=6).hexdigest()
+    return f'"{name}-v{version}-{digest}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def cached_response(request: Request, name: str, render) -> Response:
+    """
+    Serve a GET whose body depends only on data version `name` and the
+    query string. render() builds the Response on a cache miss.
+    """
+    query = request.url.query
+    version = versions.get(name)
+    etag = make_etag(name, version, query)
+
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    key = (request.url.path, query, version)
+    entry = bodies.get(key)
+
+    if entry is None:
+        rendered = render()
+        entry = (
+            rendered.body,
+            rendered.media_type,
+            {k: v for k, v in rendered.headers.items() if k in CACHED_HEADERS},
+        )
+        bodies.put(key, entry)
+
+    body, media_type, headers = entry
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={**headers, "ETag": etag, "Cache-Control": "no-cache"}
+    )
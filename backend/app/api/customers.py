@@ -1,5 +1,11 @@
+from datetime import datetime
+from typing import List, Optional
+
 from fastapi import APIRouter, Depends
-from app.db.database import SessionLocal
+from pydantic import BaseModel
+
+from app.api.pagination import keyset_page, page_response, page_size, row_dict
+from app.db.database import ReadSessionLocal
 from app.db.models import Customer
 from app.security.admin_auth import admin_auth
 
@@ -18,20 +24,47 @@ router = APIRouter(
 )
 
 
-@router.get("/", dependencies=[Depends(admin_auth)])
-def list_customers():
+class CustomerOut(BaseModel):
+    id: Optional[int]
+    name: Optional[str]
+    phone: Optional[str]
+    email: Optional[str]
+    is_new_user: Optional[bool]
+    preferred_language: Optional[str]
+    created_at: Optional[datetime]
+
+
+@router.get(
+    "/",
+    response_model=List[CustomerOut],
+    response_model_exclude_unset=True,
+    dependencies=[Depends(admin_auth)]
+)
+def list_customers(
+    cursor: Optional[str] = None,
+    limit: int = page_size(),
+    fields: Optional[str] = None
+):
     """
-    List all customers.
+    List customers by id, one page at a time.
 
-    Returns:
-    - id
-    - name
-    - created_at (if present in model)
+    Query params:
+    - cursor: value of the previous page's X-Next-Cursor header
+    - limit: page size (default 100, max 1000)
+    - fields: comma-separated columns to return (default: all)
     """
-    db = SessionLocal()
+    db = ReadSessionLocal()
     try:
-        customers = db.query(Customer).all()
-        return customers
+        customers, next_cursor = keyset_page(
+            db,
+            Customer,
+            sort_keys=(Customer.id,),
+            cursor=cursor,
+            limit=limit,
+            fields=fields,
+            descending=False
+        )
+        return page_response(customers, next_cursor)
     finally:
         db.close()
 
@@ -41,13 +74,9 @@ def get_customer(customer_id: int):
     """
     Get a single customer by ID.
     """
-    db = SessionLocal()
+    db = ReadSessionLocal()
     try:
-        customer = (
-            db.query(Customer)
-            .filter(Customer.id == customer_id)
-            .first()
-        )
+        customer = row_dict(db, Customer, Customer.id == customer_id)
 
         if not customer:
             return {"error": "Customer not found"}
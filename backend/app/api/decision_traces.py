@@ -1,7 +1,16 @@
-from fastapi import APIRouter, Depends
-from app.db.database import SessionLocal
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from app.api.pagination import keyset_page, page_response, page_size, row_dict
+from app.db.database import ReadSessionLocal
 from app.db.models import DecisionTrace
+from app.observability.trace_store import trace_partitions
 from app.security.admin_auth import admin_auth
+from app.services.trace_search_service import search_traces
 
 """
 Decision Traces Admin API
@@ -9,6 +18,9 @@ Decision Traces Admin API
 Purpose:
 - Expose agent decision traces for judges and auditors
 - Show how the system reasoned step-by-step
+- Full-text search over trace input / reasoning / output
+- With TRACE_PARTITIONING, reads span the day partitions
+  (app.observability.trace_store)
 - Read-only by design
 """
 
@@ -18,39 +30,115 @@ router = APIRouter(
 )
 
 
-@router.get("/", dependencies=[Depends(admin_auth)])
-def list_decision_traces(limit: int = 50):
+class DecisionTraceOut(BaseModel):
+    id: Optional[int]
+    request_id: Optional[str]
+    agent_name: Optional[str]
+    input: Optional[str]
+    reasoning: Optional[str]
+    decision: Optional[str]
+    output: Optional[str]
+    created_at: Optional[datetime]
+
+
+class DecisionTraceMatchOut(DecisionTraceOut):
+    rank: float
+
+
+@router.get(
+    "/",
+    response_model=List[DecisionTraceOut],
+    response_model_exclude_unset=True,
+    dependencies=[Depends(admin_auth)]
+)
+def list_decision_traces(
+    cursor: Optional[str] = None,
+    limit: int = page_size(50),
+    fields: Optional[str] = None
+):
     """
-    List recent decision traces.
+    List recent decision traces, newest first, one page at a time.
 
     Query params:
-    - limit: number of traces to return (default 50)
+    - cursor: value of the previous page's X-Next-Cursor header
+    - limit: number of traces per page (default 50, max 1000)
+    - fields: comma-separated columns to return (default: all)
     """
-    db = SessionLocal()
+    if trace_partitions is not None:
+        try:
+            traces, next_cursor = trace_partitions.page(cursor, limit, fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return page_response(traces, next_cursor)
+
+    db = ReadSessionLocal()
     try:
-        traces = (
-            db.query(DecisionTrace)
-            .order_by(DecisionTrace.created_at.desc())
-            .limit(limit)
-            .all()
+        traces, next_cursor = keyset_page(
+            db,
+            DecisionTrace,
+            sort_keys=(DecisionTrace.created_at, DecisionTrace.id),
+            cursor=cursor,
+            limit=limit,
+            fields=fields
         )
-        return traces
+        return page_response(traces, next_cursor)
     finally:
         db.close()
 
 
+@router.get(
+    "/search",
+    response_model=List[DecisionTraceMatchOut],
+    dependencies=[Depends(admin_auth)]
+)
+def search_decision_traces(
+    q: str = Query(..., min_length=1),
+    agent: Optional[str] = None,
+    decision: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = page_size(50)
+):
+    """
+    Traces matching a search, best match first.
+
+    Query params:
+    - q: words must all appear; "quoted text" must appear as a phrase
+      (e.g. q="Insufficient stock" Metformin)
+    - agent: filter to one agent (e.g. safety_agent)
+    - decision: filter to one decision (e.g. blocked)
+    - start / end: created_at range [start, end)
+    - limit: number of traces (default 50, max 1000)
+    """
+    filters = dict(agent_name=agent, decision=decision, start=start, end=end, limit=limit)
+
+    try:
+        if trace_partitions is not None:
+            traces = trace_partitions.search(q, **filters)
+        else:
+            db = ReadSessionLocal()
+            try:
+                traces = search_traces(db, q, **filters)
+            finally:
+                db.close()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ORJSONResponse(traces)
+
+
 @router.get("/{trace_id}", dependencies=[Depends(admin_auth)])
 def get_decision_trace(trace_id: int):
     """
     Get a single decision trace by ID.
     """
-    db = SessionLocal()
+    if trace_partitions is not None:
+        trace = trace_partitions.get(trace_id)
+        return trace if trace else {"error": "Decision trace not found"}
+
+    db = ReadSessionLocal()
     try:
-        trace = (
-            db.query(DecisionTrace)
-            .filter(DecisionTrace.id == trace_id)
-            .first()
-        )
+        trace = row_dict(db, DecisionTrace, DecisionTrace.id == trace_id)
 
         if not trace:
             return {"error": "Decision trace not found"}
@@ -0,0 +1,158 @@
+import csv
+import io
+import zlib
+from typing import Optional
+
+import orjson
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.api.pagination import parse_fields
+from app.db.database import ReadSessionLocal
+from app.db.models import DecisionTrace, Medicine, OrderHistory
+from app.observability.trace_store import trace_partitions
+from app.security.admin_auth import admin_auth
+
+"""
+Export Admin API
+
+Purpose:
+- Full-table exports for auditors (orders, decision traces, inventory)
+- Rows are read in batches from a streaming cursor (yield_per) and
+  written straight into a chunked response: memory stays flat at any
+  table size and the first bytes go out after the first batch
+- NDJSON or CSV, optionally gzip-compressed on the fly
+- Read-only by design
+"""
+
+router = APIRouter(
+    prefix="/admin/export",
+    tags=["admin"]
+)
+
+# Rows fetched per round trip; also the unit of each response chunk
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+# -------------------------
+# Encoding
+# -------------------------
+
+def _ndjson_chunks(names, batches):
+    for batch in batches:
+        yield b"".join(
+            orjson.dumps(dict(zip(names, row)), option=orjson.OPT_APPEND_NEWLINE)
+            for row in batch
+        )
+
+
+def _csv_chunks(names, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(names)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Empty table: header only
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# -------------------------
+# Streaming
+# -------------------------
+
+def _row_batches(model, names, batch_size, sources=None):
+    """
+    Yields lists of row tuples ordered by id. sources are (session
+    factory, table) pairs read in turn, by default the model's table on
+    the read session. Each session lives exactly as long as its part of
+    the stream and is closed even if the client disconnects.
+    """
+    for sessions, table in sources or [(ReadSessionLocal, model.__table__)]:
+        db = sessions()
+        try:
+            result = db.execute(
+                select(*[table.c[name] for name in names])
+                .order_by(table.c.id)
+                .execution_options(yield_per=batch_size)
+            )
+            for partition in result.partitions():
+                yield [tuple(row) for row in partition]
+        finally:
+            db.close()
+
+
+def stream_export(model, name: str, format: str, fields: Optional[str], compress: bool, sources=None):
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+
+    names = parse_fields(model, fields)
+    batches = _row_batches(model, names, EXPORT_BATCH_SIZE, sources)
+    chunks = _ndjson_chunks(names, batches) if format == "ndjson" else _csv_chunks(names, batches)
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{name}.{format}"'
+    }
+    if compress:
+        chunks = _gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[format], headers=headers)
+
+
+# -------------------------
+# Endpoints
+# -------------------------
+
+@router.get("/orders", dependencies=[Depends(admin_auth)])
+def export_orders(format: str = "ndjson", fields: Optional[str] = None, gzip: bool = False):
+    """
+    Stream every order history record.
+
+    Query params:
+    - format: ndjson (default) or csv
+    - fields: comma-separated columns to include (default: all)
+    - gzip: compress the stream (Content-Encoding: gzip)
+    """
+    return stream_export(OrderHistory, "orders", format, fields, gzip)
+
+
+@router.get("/decision-traces", dependencies=[Depends(admin_auth)])
+def export_decision_traces(format: str = "ndjson", fields: Optional[str] = None, gzip: bool = False):
+    """
+    Stream every decision trace. Same query params as /orders.
+    """
+    sources = None
+    if trace_partitions is not None:
+        # Pre-partitioning table first, then days oldest first: ascending ids
+        sources = [(p.sessions, p.table) for p in reversed(trace_partitions.spanning())]
+    return stream_export(DecisionTrace, "decision_traces", format, fields, gzip, sources)
+
+
+@router.get("/medicines", dependencies=[Depends(admin_auth)])
+def export_medicines(format: str = "ndjson", fields: Optional[str] = None, gzip: bool = False):
+    """
+    Stream the current inventory. Same query params as /orders.
+    """
+    return stream_export(Medicine, "medicines", format, fields, gzip)
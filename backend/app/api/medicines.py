@@ -1,5 +1,12 @@
-from fastapi import APIRouter, Depends
-from app.db.database import SessionLocal
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Request
+from pydantic import BaseModel
+
+from app.api.conditional import cached_response
+from app.api.pagination import keyset_page, page_response, page_size
+from app.db.database import ReadSessionLocal
 from app.db.models import Medicine
 from app.security.admin_auth import admin_auth
 
@@ -18,16 +25,55 @@ router = APIRouter(
 )
 
 
-@router.get("/", dependencies=[Depends(admin_auth)])
-def list_medicines():
+class MedicineOut(BaseModel):
+    id: Optional[int]
+    name: Optional[str]
+    stock_quantity: Optional[int]
+    prescription_required: Optional[bool]
+    reorder_point: Optional[int]
+    critical_point: Optional[int]
+    reorder_quantity: Optional[int]
+    created_at: Optional[datetime]
+
+
+@router.get(
+    "/",
+    response_model=List[MedicineOut],
+    response_model_exclude_unset=True,
+    dependencies=[Depends(admin_auth)]
+)
+def list_medicines(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = page_size(),
+    fields: Optional[str] = None
+):
     """
-    List all medicines in inventory.
+    List medicines in inventory by id, one page at a time.
 
     Admin-only endpoint.
+    Query params:
+    - cursor: value of the previous page's X-Next-Cursor header
+    - limit: page size (default 100, max 1000)
+    - fields: comma-separated columns to return (default: all)
+
+    Conditional: responses carry an ETag tied to the medicines data
+    version; If-None-Match gets a 304 until stock changes.
     """
-    db = SessionLocal()
-    try:
-        medicines = db.query(Medicine).all()
-        return medicines
-    finally:
-        db.close()
+    def render():
+        db = ReadSessionLocal()
+        try:
+            medicines, next_cursor = keyset_page(
+                db,
+                Medicine,
+                sort_keys=(Medicine.id,),
+                cursor=cursor,
+                limit=limit,
+                fields=fields,
+                descending=False
+            )
+            return page_response(medicines, next_cursor)
+        finally:
+            db.close()
+
+    return cached_response(request, "medicines", render)
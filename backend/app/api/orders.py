@@ -1,5 +1,11 @@
+from datetime import datetime
+from typing import List, Optional
+
 from fastapi import APIRouter, Depends, HTTPException
-from app.db.database import SessionLocal
+from pydantic import BaseModel
+
+from app.api.pagination import keyset_page, page_response, page_size, row_dict
+from app.db.database import ReadSessionLocal
 from app.db.models import OrderHistory
 from app.security.admin_auth import admin_auth
 
@@ -18,31 +24,57 @@ router = APIRouter(
 )
 
 
-@router.get("/", dependencies=[Depends(admin_auth)])
-def list_orders():
+# Every field is optional so ?fields= projections validate
+class OrderOut(BaseModel):
+    id: Optional[int]
+    customer_id: Optional[int]
+    medicine_name: Optional[str]
+    quantity: Optional[int]
+    created_at: Optional[datetime]
+
+
+@router.get(
+    "/",
+    response_model=List[OrderOut],
+    response_model_exclude_unset=True,
+    dependencies=[Depends(admin_auth)]
+)
+def list_orders(
+    cursor: Optional[str] = None,
+    limit: int = page_size(),
+    fields: Optional[str] = None
+):
     """
-    List all order history records.
+    List order history records, newest first, one page at a time.
 
     Admin-only endpoint.
+    Query params:
+    - cursor: value of the previous page's X-Next-Cursor header
+    - limit: page size (default 100, max 1000)
+    - fields: comma-separated columns to return (default: all)
     Returns:
+    - id
     - customer_id
     - medicine_name
     - quantity
     - created_at
     """
-    db = SessionLocal()
+    db = ReadSessionLocal()
     try:
-        orders = (
-            db.query(OrderHistory)
-            .order_by(OrderHistory.created_at.desc())
-            .all()
+        orders, next_cursor = keyset_page(
+            db,
+            OrderHistory,
+            sort_keys=(OrderHistory.created_at, OrderHistory.id),
+            cursor=cursor,
+            limit=limit,
+            fields=fields
         )
-        return orders
+        return page_response(orders, next_cursor)
     finally:
         db.close()
 
 
-@router.get("/{order_id}", dependencies=[Depends(admin_auth)])
+@router.get("/{order_id}", response_model=OrderOut, dependencies=[Depends(admin_auth)])
 def get_order_detail(order_id: int):
     """
     Get details of a specific order history record.
@@ -55,13 +87,9 @@ def get_order_detail(order_id: int):
     - quantity
     - created_at
     """
-    db = SessionLocal()
+    db = ReadSessionLocal()
     try:
-        order = (
-            db.query(OrderHistory)
-            .filter(OrderHistory.id == order_id)
-            .first()
-        )
+        order = row_dict(db, OrderHistory, OrderHistory.id == order_id)
         
         if not order:
             raise HTTPException(
@@ -0,0 +1,68 @@
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from fastapi.responses import ORJSONResponse
+
+from app.db import keyset
+from app.db.keyset import table_of
+
+"""
+Admin list pagination
+
+Purpose:
+- Keyset (cursor) pagination: each page seeks past the last row of the
+  previous one via the sort index, so page 10,000 costs the same as page 1
+  (the query itself lives in app.db.keyset; bad cursors and unknown
+  fields become 400s here)
+- Optional column projection (?fields=id,name) so only the requested
+  columns are read and serialized
+- The next-page cursor travels in the X-Next-Cursor header, keeping
+  response bodies plain JSON lists
+- Pages are built from row tuples and rendered by orjson directly; the
+  endpoint's response_model documents the shape without re-validating
+  every row through pydantic and jsonable_encoder
+"""
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def page_size(default: int = DEFAULT_PAGE_SIZE):
+    return Query(default, ge=1, le=MAX_PAGE_SIZE)
+
+
+# -------------------------
+# Keyset page
+# -------------------------
+
+def parse_fields(model, fields: Optional[str]) -> list:
+    """Column names to return; all columns when fields is empty."""
+    try:
+        return keyset.parse_fields(model, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def keyset_page(db, model, sort_keys: tuple, cursor: Optional[str], limit: int, **options):
+    """
+    One page of `model` rows ordered by sort_keys, starting after
+    `cursor` (see app.db.keyset.keyset_page). Returns (rows, next_cursor).
+    """
+    try:
+        return keyset.keyset_page(db, model, sort_keys, cursor, limit, **options)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def row_dict(db, model, criterion) -> Optional[dict]:
+    """Single row as a plain dict of every column, or None."""
+    columns = list(table_of(model).columns)
+    row = db.query(*columns).filter(criterion).first()
+    return dict(zip([c.key for c in columns], row)) if row else None
+
+
+def page_response(rows: list, next_cursor: Optional[str]) -> ORJSONResponse:
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return ORJSONResponse(rows, headers=headers)
@@ -1,7 +1,14 @@
-from fastapi import APIRouter, Depends
-from datetime import datetime, timedelta
-from app.db.database import SessionLocal
-from app.db.models import Medicine, Order
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import ORJSONResponse
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import case, func
+
+from app.api.conditional import cached_response
+from app.db.database import ReadSessionLocal
+from app.db.models import InventoryAlert, Medicine, Order, OrderItem
 from app.security.admin_auth import admin_auth
 
 """
@@ -18,57 +25,102 @@ router = APIRouter(
     tags=["admin"]
 )
 
-# Stock levels for alerting
-LOW_STOCK_THRESHOLD = 20  # Alert if below this
-CRITICAL_STOCK_THRESHOLD = 5  # Critical if below this
+class StockAlertOut(BaseModel):
+    id: int
+    name: str
+    current_stock: int
+    status: str
+    reorder_point: int
+    suggested_order_qty: int
+    prescription_required: Optional[bool]
+    alert_priority: str
 
 
-@router.get("/", dependencies=[Depends(admin_auth)])
-def list_refill_alerts():
+@router.get("/", response_model=List[StockAlertOut], dependencies=[Depends(admin_auth)])
+def list_refill_alerts(request: Request):
     """
     List all medicines that need refilling.
     
     Admin-only endpoint.
     Returns medicines with:
-    - status: "CRITICAL" (0-5 units) or "LOW" (5-20 units)
+    - status: "CRITICAL" (at or below critical_point) or "LOW"
+      (at or below reorder_point), per medicine
     - current_stock
     - reorder_point
-    - suggested_order_qty
+    - suggested_order_qty (the medicine's reorder_quantity)
+
+    Conditional on the medicines data version (ETag / 304).
     """
-    db = SessionLocal()
+    return cached_response(request, "medicines", _render_stock_alerts)
+
+
+def _render_stock_alerts() -> ORJSONResponse:
+    db = ReadSessionLocal()
     try:
-        # Find all medicines below stock threshold
-        medicines = (
-            db.query(Medicine)
-            .filter(Medicine.stock_quantity <= LOW_STOCK_THRESHOLD)
-            .order_by(Medicine.stock_quantity.asc())
+        # Snapshot maintained by inventory_service: one row per alert
+        rows = (
+            db.query(
+                InventoryAlert.medicine_id,
+                InventoryAlert.name,
+                InventoryAlert.current_stock,
+                InventoryAlert.status,
+                InventoryAlert.reorder_point,
+                InventoryAlert.reorder_quantity,
+                InventoryAlert.prescription_required
+            )
+            .order_by(InventoryAlert.current_stock.asc())
             .all()
         )
-        
-        alerts = []
-        for medicine in medicines:
-            status = "CRITICAL" if medicine.stock_quantity <= CRITICAL_STOCK_THRESHOLD else "LOW"
-            
-            alerts.append({
-                "id": medicine.id,
-                "name": medicine.name,
-                "current_stock": medicine.stock_quantity,
+
+        alerts = [
+            {
+                "id": medicine_id,
+                "name": name,
+                "current_stock": stock,
                 "status": status,
-                "reorder_point": LOW_STOCK_THRESHOLD,
-                "suggested_order_qty": 100,  # Standard reorder quantity
-                "prescription_required": medicine.prescription_required,
+                "reorder_point": reorder_point,
+                "suggested_order_qty": reorder_quantity,
+                "prescription_required": prescription_required,
                 "alert_priority": "CRITICAL" if status == "CRITICAL" else "HIGH"
-            })
-        
-        return alerts
+            }
+            for (medicine_id, name, stock, status, reorder_point,
+                 reorder_quantity, prescription_required) in rows
+        ]
+
+        return ORJSONResponse(alerts)
     finally:
         db.close()
 
 
-@router.get("/customer/{customer_id}", dependencies=[Depends(admin_auth)])
+# Standard refill interval between purchases of the same medicine
+REFILL_INTERVAL_DAYS = 30
+
+
+class CustomerRefillAlertOut(BaseModel):
+    order_id: int
+    medicine_id: int
+    medicine_name: str
+    last_order_date: datetime
+    days_since_order: int
+    refill_eligible: bool
+    next_eligible_date: datetime
+    refill_priority: str
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@router.get(
+    "/customer/{customer_id}",
+    response_model=List[CustomerRefillAlertOut],
+    dependencies=[Depends(admin_auth)]
+)
 def get_customer_refill_alerts(customer_id: int):
     """
-    Get refill alerts for a specific customer.
+    Get refill alerts for a specific customer, one row per medicine.
     
     Admin-only endpoint.
     Returns list of medicines eligible for auto-refill:
@@ -76,37 +128,48 @@ def get_customer_refill_alerts(customer_id: int):
     - Days since last order
     - Refill eligibility (e.g., 30 days between refills)
     - Suggested next order date
+
+    One query: orders -> order_items -> medicines, grouped by medicine,
+    with eligibility decided in SQL. Served by orders(customer_id, created_at).
     """
-    db = SessionLocal()
+    db = ReadSessionLocal()
     try:
-        # Find recent orders for this customer
-        orders = (
-            db.query(Order)
+        now = datetime.utcnow()
+        cutoff = now - timedelta(days=REFILL_INTERVAL_DAYS)
+        last_order_at = func.max(Order.created_at)
+
+        rows = (
+            db.query(
+                func.max(Order.id),
+                Medicine.id,
+                Medicine.name,
+                last_order_at,
+                case((last_order_at <= cutoff, True), else_=False)
+            )
+            .join(OrderItem, OrderItem.order_id == Order.id)
+            .join(Medicine, Medicine.id == OrderItem.medicine_id)
             .filter(Order.customer_id == customer_id)
-            .order_by(Order.created_at.desc())
-            .limit(20)
+            .group_by(Medicine.id, Medicine.name)
+            .order_by(last_order_at.desc())
             .all()
         )
         
         alerts = []
-        now = datetime.utcnow()
-        refill_interval_days = 30  # Standard refill interval
-        
-        for order in orders:
-            days_since = (now - order.created_at).days
-            next_eligible_date = order.created_at + timedelta(days=refill_interval_days)
-            is_eligible = now >= next_eligible_date
+        for order_id, medicine_id, medicine_name, last_order, is_eligible in rows:
+            last_order = _naive_utc(last_order)
+            is_eligible = bool(is_eligible)
             
             alerts.append({
-                "order_id": order.id,
-                "medicine_id": order.medicine_id,
-                "last_order_date": order.created_at.isoformat(),
-                "days_since_order": days_since,
+                "order_id": order_id,
+                "medicine_id": medicine_id,
+                "medicine_name": medicine_name,
+                "last_order_date": last_order,
+                "days_since_order": (now - last_order).days,
                 "refill_eligible": is_eligible,
-                "next_eligible_date": next_eligible_date.isoformat(),
+                "next_eligible_date": last_order + timedelta(days=REFILL_INTERVAL_DAYS),
                 "refill_priority": "READY" if is_eligible else "PENDING"
             })
         
-        return alerts
+        return ORJSONResponse(alerts)
     finally:
         db.close()
@@ -0,0 +1,136 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from app.api.pagination import keyset_page, page_response, page_size, row_dict
+from app.db.database import ReadSessionLocal
+from app.db.models import DecisionTrace, RunSummary
+from app.observability.trace_store import run_steps, trace_partitions
+from app.security.admin_auth import admin_auth
+
+"""
+Workflow Runs Admin API
+
+Purpose:
+- One entry per workflow run instead of per agent step
+- Listings read run_summaries (one row per run, written with its
+  traces), never GROUP BY over decision_traces
+- A run's steps come from one range read on the
+  (request_id, created_at) index, in execution order, with timings
+  (with TRACE_PARTITIONING, from the day partition the summary names)
+"""
+
+router = APIRouter(
+    prefix="/admin/runs",
+    tags=["admin"]
+)
+
+STEP_FIELDS = [
+    "id",
+    "agent_name",
+    "decision",
+    "input",
+    "reasoning",
+    "output",
+    "duration_ms",
+    "created_at",
+]
+
+
+class RunSummaryOut(BaseModel):
+    request_id: Optional[str]
+    customer_id: Optional[int]
+    status: Optional[str]
+    steps: Optional[int]
+    duration_ms: Optional[float]
+    created_at: Optional[datetime]
+
+
+class RunStepOut(BaseModel):
+    id: int
+    agent_name: Optional[str]
+    decision: Optional[str]
+    input: Optional[str]
+    reasoning: Optional[str]
+    output: Optional[str]
+    duration_ms: Optional[float]
+    created_at: Optional[datetime]
+
+
+class RunOut(BaseModel):
+    run: Optional[RunSummaryOut]
+    steps: List[RunStepOut]
+
+
+@router.get(
+    "/",
+    response_model=List[RunSummaryOut],
+    response_model_exclude_unset=True,
+    dependencies=[Depends(admin_auth)]
+)
+def list_runs(
+    cursor: Optional[str] = None,
+    limit: int = page_size(50),
+    status: Optional[str] = None,
+    customer_id: Optional[int] = None,
+    fields: Optional[str] = None
+):
+    """
+    List workflow runs, newest first, one page at a time.
+
+    Query params:
+    - cursor: value of the previous page's X-Next-Cursor header
+    - limit: number of runs per page (default 50, max 1000)
+    - status: completed, blocked or failed
+    - customer_id: runs for one customer
+    - fields: comma-separated columns to return (default: all)
+    """
+    criteria = []
+    if status is not None:
+        criteria.append(RunSummary.status == status)
+    if customer_id is not None:
+        criteria.append(RunSummary.customer_id == customer_id)
+
+    db = ReadSessionLocal()
+    try:
+        runs, next_cursor = keyset_page(
+            db,
+            RunSummary,
+            sort_keys=(RunSummary.created_at, RunSummary.request_id),
+            cursor=cursor,
+            limit=limit,
+            fields=fields,
+            criteria=criteria
+        )
+        return page_response(runs, next_cursor)
+    finally:
+        db.close()
+
+
+@router.get("/{request_id}", response_model=RunOut, dependencies=[Depends(admin_auth)])
+def get_run(request_id: str):
+    """
+    A whole workflow run: its summary and every agent step in order.
+    Runs persisted before summaries existed return "run": null.
+    """
+    db = ReadSessionLocal()
+    try:
+        run = row_dict(db, RunSummary, RunSummary.request_id == request_id)
+
+        if trace_partitions is not None:
+            # The summary's created_at names the day partition to read
+            steps = trace_partitions.run_steps(
+                request_id, STEP_FIELDS, created_at=run["created_at"] if run else None
+            )
+        else:
+            steps = run_steps(db, DecisionTrace.__table__, request_id, STEP_FIELDS)
+
+        if not steps and not run:
+            raise HTTPException(status_code=404, detail=f"Run {request_id} not found")
+
+        return ORJSONResponse({"run": run, "steps": steps})
+    finally:
+        db.close()
@@ -0,0 +1,72 @@
+"""
+Audit log hash chain
+
+Purpose:
+- Every audit line ends with "prev_hash": the SHA-256 of the line
+  before it (across segment boundaries), so editing, removing or
+  reordering a record breaks every later link
+- Checkpoints (segment, records, offset, chain hash) are signed with
+  HMAC-SHA256 so the chain head can't be silently rewritten along with
+  the records; see app.audit.verify
+
+prev_hash is always the last key, at a fixed distance from the end of
+the line, so the verifier reads it without parsing the JSON.
+"""
+
+import hashlib
+import hmac
+
+GENESIS_HASH = "0" * 64
+
+_PREV_PREFIX = b'"prev_hash":"'
+_PREV_SUFFIX = b'"}\n'
+_TAIL = len(_PREV_PREFIX) + 64 + len(_PREV_SUFFIX)
+
+
+def line_hash(line: bytes) -> str:
+    return hashlib.sha256(line).hexdigest()
+
+
+def chain_line(encoded: bytes, prev_hash: str) -> bytes:
+    """Append prev_hash to an encoded JSON object line (b'{...}\\n')."""
+    body = encoded[:-2]
+    separator = b"," if len(body) > 1 else b""
+    return body + separator + _PREV_PREFIX + prev_hash.encode() + _PREV_SUFFIX
+
+
+def line_prev_hash(line) -> str:
+    """The prev_hash a chained line carries, or None if it has none."""
+    if len(line) < _TAIL + 1 or bytes(line[-_TAIL:-_TAIL + len(_PREV_PREFIX)]) != _PREV_PREFIX:
+        return None
+    return bytes(line[-len(_PREV_SUFFIX) - 64:-len(_PREV_SUFFIX)]).decode()
+
+
+def checkpoint_mac(key: bytes, segment: int, records: int, offset: int, chain_hash: str, sealed: bool) -> str:
+    message = f"{segment}:{records}:{offset}:{chain_hash}:{int(sealed)}".encode()
+    return hmac.new(key, message, hashlib.sha256).hexdigest()
+
+
+def make_checkpoint(key: bytes, segment: int, records: int, offset: int, chain_hash: str, sealed: bool) -> dict:
+    return {
+        "segment": segment,
+        "records": records,
+        "offset": offset,
+        "hash": chain_hash,
+        "sealed": sealed,
+        "mac": checkpoint_mac(key, segment, records, offset, chain_hash, sealed),
+    }
+
+
+def checkpoint_valid(key: bytes, checkpoint: dict) -> bool:
+    try:
+        expected = checkpoint_mac(
+            key,
+            checkpoint["segment"],
+            checkpoint["records"],
+            checkpoint["offset"],
+            checkpoint["hash"],
+            checkpoint["sealed"]
+        )
+    except (KeyError, TypeError):
+        return False
+    return hmac.compare_digest(expected, str(checkpoint.get("mac", "")))
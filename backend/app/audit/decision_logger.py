@@ -1,20 +1,69 @@
-import json
+import threading
 import uuid
 from datetime import datetime
-from pathlib import Path
 
+from app.audit.segment_log import SegmentedLog
+from app.config import (
+    AUDIT_HMAC_KEY,
+    AUDIT_LOG_COMPRESSION,
+    AUDIT_LOG_DIR,
+    AUDIT_SEGMENT_MAX_BYTES,
+    AUDIT_SEGMENT_MAX_SECONDS,
+)
 
-LOG_DIR = Path("logs")
-LOG_DIR.mkdir(exist_ok=True)
 
+_audit_log = None
+_audit_log_lock = threading.Lock()
 
-def write_decision_log(state: dict) -> str:
+
+def check_audit_key():
+    """Refuse to write unsigned checkpoints (API startup calls this)."""
+    if not AUDIT_HMAC_KEY:
+        raise RuntimeError(
+            "AUDIT_HMAC_KEY is not set: audit log checkpoints can't be signed "
+            "(set it, or ENABLE_AUDIT_LOG=false)"
+        )
+
+
+def get_audit_log() -> SegmentedLog:
+    """Process-wide audit log, started on first use."""
+    global _audit_log
+    if _audit_log is None:
+        with _audit_log_lock:
+            if _audit_log is None:
+                check_audit_key()
+                log = SegmentedLog(
+                    AUDIT_LOG_DIR,
+                    max_segment_bytes=AUDIT_SEGMENT_MAX_BYTES,
+                    max_segment_seconds=AUDIT_SEGMENT_MAX_SECONDS,
+                    compression=None if AUDIT_LOG_COMPRESSION == "none" else AUDIT_LOG_COMPRESSION,
+                    hmac_key=AUDIT_HMAC_KEY
+                )
+                log.start()
+                _audit_log = log
+    return _audit_log
+
+
+def close_audit_log(timeout: float = None):
+    """Flush and seal the audit log (API shutdown)."""
+    global _audit_log
+    with _audit_log_lock:
+        if _audit_log is not None:
+            _audit_log.stop(timeout)
+            _audit_log = None
+
+
+def write_decision_log(state: dict, run_id: str = None) -> str:
     """
-    Writes an immutable audit log for a single workflow run.
-    Returns the run_id.
+    Appends an immutable audit record for a single workflow run to the
+    segmented audit log. Returns the run_id (a new one unless given,
+    e.g. the workflow's request_id, shared with its DecisionTrace rows).
+
+    Only enqueues the record; the log's writer thread does the I/O.
+    TraceRecords in decision_trace reuse their cached encoding.
     """
 
-    run_id = str(uuid.uuid4())
+    run_id = run_id or str(uuid.uuid4())
 
     record = {
         "run_id": run_id,
@@ -27,9 +76,6 @@ def write_decision_log(state: dict) -> str:
         "meta": state.get("meta"),
     }
 
-    file_path = LOG_DIR / f"{run_id}.json"
-
-    with open(file_path, "w") as f:
-        json.dump(record, f, indent=2)
+    get_audit_log().append(record)
 
     return run_id
@@ -0,0 +1,221 @@
+"""
+Audit log reader
+
+Purpose:
+- Point lookup of a run by run_id, and time-range scans, over the
+  segments written by app.audit.segment_log
+- Segment .idx files are memory-mapped and viewed as numpy arrays, so
+  lookups and range filters never parse JSON to find records
+- Uncompressed segments are memory-mapped too, and records are parsed
+  straight from the mapped bytes (orjson reads memoryview slices
+  without copying); compressed segments are decompressed once per open
+- Range scans skip segments whose index timestamps don't overlap, and
+  yield records lazily
+
+A lookup compares the run key against each segment's mapped index with
+numpy, newest segment first, and parses only the matching record: no
+per-record Python work and no in-memory map that grows with the archive.
+
+CLI:
+    python -m app.audit.reader get <run_id>
+    python -m app.audit.reader range --start 2024-01-01T00:00 --end 2024-01-02T00:00
+"""
+
+import argparse
+import mmap
+import struct
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import orjson
+
+from app.audit.segment_log import (
+    INDEX_ENTRY,
+    INDEX_SUFFIX,
+    SEGMENT_PREFIX,
+    SEGMENT_SUFFIX,
+    read_segment,
+    run_key,
+    segment_files,
+    timestamp_ms,
+)
+from app.config import AUDIT_LOG_DIR
+
+# numpy view of INDEX_ENTRY; the 16-byte run key as two uint64 halves
+INDEX_DTYPE = np.dtype([
+    ("offset", "<u8"),
+    ("ts", "<i8"),
+    ("key_hi", "<u8"),
+    ("key_lo", "<u8"),
+])
+
+_KEY = struct.Struct("<QQ")
+
+
+def _map(path: Path):
+    """Read-only mmap of a file, or b"" if it is empty."""
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _load(path: Path):
+    if path.name.endswith(SEGMENT_SUFFIX):
+        return _map(path)
+    return read_segment(path)
+
+
+class Segment:
+
+    def __init__(self, seq: int, data_path: Path, index_path: Path):
+        self.seq = seq
+        self.data_path = data_path
+        self.index_path = index_path
+        self.stamp = self._stamp()
+
+        raw = _map(index_path) if index_path.exists() else b""
+        usable = len(raw) - len(raw) % INDEX_ENTRY.size  # a torn last entry is ignored
+        self.index = np.frombuffer(raw, dtype=INDEX_DTYPE, count=usable // INDEX_ENTRY.size)
+
+        self._data = None
+
+    def _stamp(self) -> tuple:
+        index_size = self.index_path.stat().st_size if self.index_path.exists() else 0
+        return (self.data_path.name, self.data_path.stat().st_size, index_size)
+
+    def changed(self) -> bool:
+        try:
+            return self._stamp() != self.stamp
+        except FileNotFoundError:
+            return True
+
+    @property
+    def data(self) -> memoryview:
+        if self._data is None:
+            self._data = memoryview(_load(self.data_path))
+        return self._data
+
+    def __len__(self):
+        return len(self.index)
+
+    def overlaps(self, start_ms: int, end_ms: int) -> bool:
+        if not len(self.index):
+            return False
+        ts = self.index["ts"]
+        return bool(ts.min() < end_ms and ts.max() >= start_ms)
+
+    def record(self, position: int):
+        """Parse record number `position`; None if it isn't fully written."""
+        data = self.data
+        start = int(self.index["offset"][position])
+        if position + 1 < len(self.index):
+            end = int(self.index["offset"][position + 1])
+        else:
+            end = len(data)
+            # Active segment: the last line may still be in flight
+            if end <= start or data[end - 1] != ord("\n"):
+                return None
+        if end > len(data):
+            return None
+        return orjson.loads(data[start:end])
+
+
+class AuditLogReader:
+
+    def __init__(self, directory=AUDIT_LOG_DIR):
+        self.directory = Path(directory)
+        self._segments = {}   # seq -> Segment
+
+    # -------------------------
+    # Segments
+    # -------------------------
+
+    def refresh(self) -> list:
+        """Pick up new, grown, sealed or compressed segments."""
+        found = segment_files(self.directory)
+
+        for seq, path in found.items():
+            current = self._segments.get(seq)
+            if current is None or current.data_path != path or current.changed():
+                try:
+                    self._segments[seq] = Segment(
+                        seq, path, self.directory / f"{SEGMENT_PREFIX}{seq:08d}{INDEX_SUFFIX}"
+                    )
+                except FileNotFoundError:
+                    continue  # replaced by its compressed form mid-listing
+
+        for seq in set(self._segments) - set(found):
+            del self._segments[seq]
+
+        return [self._segments[seq] for seq in sorted(self._segments)]
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+
+    def get(self, run_id: str):
+        """The record for run_id (its latest write), or None."""
+        hi, lo = _KEY.unpack(run_key(run_id))
+
+        for segment in reversed(self.refresh()):
+            index = segment.index
+            # Low halves rarely collide: check high halves at those only
+            candidates = np.flatnonzero(index["key_lo"] == lo)
+            hits = candidates[index["key_hi"][candidates] == hi]
+
+            for position in reversed(hits.tolist()):
+                record = segment.record(position)
+                # None: a torn record; another run_id: a hash collision
+                if record is not None and record.get("run_id") == run_id:
+                    return record
+
+        return None
+
+    def scan(self, start: datetime = None, end: datetime = None):
+        """
+        Records with start <= timestamp < end, segment by segment in
+        write order. Lazy: nothing is parsed until iterated.
+        """
+        start_ms = timestamp_ms(start) if start else np.iinfo(np.int64).min
+        end_ms = timestamp_ms(end) if end else np.iinfo(np.int64).max
+
+        for segment in self.refresh():
+            if not segment.overlaps(start_ms, end_ms):
+                continue
+            ts = segment.index["ts"]
+            for position in np.flatnonzero((ts >= start_ms) & (ts < end_ms)).tolist():
+                record = segment.record(position)
+                if record is not None:
+                    yield record
+
+
+def _write(record):
+    sys.stdout.buffer.write(orjson.dumps(record) + b"\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read the segmented audit log")
+    parser.add_argument("--dir", default=AUDIT_LOG_DIR, help="audit log directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    get_cmd = commands.add_parser("get", help="print one run by run_id")
+    get_cmd.add_argument("run_id")
+
+    range_cmd = commands.add_parser("range", help="print runs in [start, end)")
+    range_cmd.add_argument("--start", type=datetime.fromisoformat)
+    range_cmd.add_argument("--end", type=datetime.fromisoformat)
+
+    args = parser.parse_args()
+    reader = AuditLogReader(args.dir)
+
+    if args.command == "get":
+        record = reader.get(args.run_id)
+        if record is None:
+            sys.exit(f"❌ run {args.run_id} not found")
+        _write(record)
+    else:
+        for record in reader.scan(args.start, args.end):
+            _write(record)
@@ -0,0 +1,431 @@
+"""
+Segmented append-only audit log
+
+Purpose:
+- One JSON line per record, appended to a segment file instead of one
+  file per workflow run
+- Callers only enqueue: a background writer thread does all file I/O,
+  so append() never blocks the request thread
+- Group commit: the writer drains everything queued, writes it, then
+  fsyncs once for the whole batch
+- Segments rotate by size and by age; sealed segments can be gzip or
+  zstd compressed
+- Each segment has a sidecar .idx with one fixed-size entry per
+  record: offset into the uncompressed segment, timestamp and run_id
+  key (see INDEX_ENTRY), read by app.audit.reader for point lookups
+  and time-range scans without parsing the segment
+- Records are hash-chained and each segment gets a .chk of HMAC-signed
+  checkpoints (app.audit.chain), verified by app.audit.verify
+
+Layout, per segment N:
+    audit-0000000N.jsonl            active (or left unsealed by a crash)
+    audit-0000000N.jsonl.gz / .zst  sealed and compressed
+    audit-0000000N.idx              index entries
+    audit-0000000N.chk              checkpoints, one JSON line each
+
+Durability: a record is on disk once flush() returns, or once the
+writer's next batch fsync completes (normally milliseconds). Records
+still queued when the process dies are lost. The .idx is fsynced only
+when its segment is sealed; it can be rebuilt from the segment.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import queue
+import re
+import shutil
+import struct
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import orjson
+
+from app.audit.chain import GENESIS_HASH, chain_line, line_hash, make_checkpoint
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for compression="zstd"
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "audit-"
+SEGMENT_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx"
+CHECKPOINT_SUFFIX = ".chk"
+
+COMPRESSIONS = {
+    None: None,
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+# Index entry: offset (uint64), timestamp (int64 ms since the epoch, UTC),
+# run_id key (16 bytes: the UUID itself, or a blake2b digest of other ids)
+INDEX_ENTRY = struct.Struct("<Qq16s")
+
+# Most records written per fsync
+MAX_BATCH = 4096
+
+# Records between signed checkpoints; segments also get one when sealed
+CHECKPOINT_EVERY = 1000
+
+_SEGMENT_RE = re.compile(rf"^{SEGMENT_PREFIX}(\d+)")
+_DATA_RE = re.compile(rf"^{SEGMENT_PREFIX}(\d+){re.escape(SEGMENT_SUFFIX)}(\.gz|\.zst)?$")
+
+
+def segment_name(seq: int) -> str:
+    return f"{SEGMENT_PREFIX}{seq:08d}"
+
+
+def segment_files(directory) -> dict:
+    """seq -> data file, preferring the compressed form once it exists."""
+    found = {}
+    directory = Path(directory)
+    for path in directory.iterdir() if directory.exists() else ():
+        m = _DATA_RE.match(path.name)
+        if not m:
+            continue
+        seq = int(m.group(1))
+        # While a segment is being compressed both files exist; the
+        # compressed one is only renamed into place once complete
+        if seq not in found or m.group(2):
+            found[seq] = path
+    return found
+
+
+def read_checkpoints(path: Path) -> list:
+    """Checkpoints in a .chk file; a torn last line is ignored."""
+    if not path.exists():
+        return []
+    checkpoints = []
+    for line in path.read_bytes().splitlines():
+        try:
+            checkpoints.append(orjson.loads(line))
+        except orjson.JSONDecodeError:
+            break
+    return checkpoints
+
+
+def read_segment(path: Path) -> bytes:
+    if path.suffix == ".gz":
+        return gzip.decompress(path.read_bytes())
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"{path.name} needs the zstandard package")
+        with open(path, "rb") as f:
+            return zstandard.ZstdDecompressor().stream_reader(f).read()
+    return path.read_bytes()
+
+
+def _encode_default(value):
+    # Objects carrying their own encoding (TraceRecord) are embedded as is
+    fragment = getattr(value, "json_fragment", None)
+    if fragment is not None:
+        return fragment()
+    return str(value)
+
+
+def encode_record(record) -> bytes:
+    """Compact JSON line; non-JSON values (datetimes, enums) via str()."""
+    return orjson.dumps(record, default=_encode_default, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+
+
+def run_key(run_id) -> bytes:
+    if not run_id:
+        return bytes(16)
+    try:
+        return uuid.UUID(str(run_id)).bytes
+    except ValueError:
+        return hashlib.blake2b(str(run_id).encode(), digest_size=16).digest()
+
+
+def timestamp_ms(value) -> int:
+    """Record timestamp (datetime or ISO string; naive means UTC) in ms."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        value = datetime.now(timezone.utc)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+class _FlushMarker:
+    __slots__ = ("done",)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class SegmentedLog:
+
+    def __init__(
+        self,
+        directory,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_seconds: float = 3600,
+        compression: str = "gzip",
+        queue_size: int = 100_000,
+        hmac_key: bytes = b"",
+        checkpoint_every: int = CHECKPOINT_EVERY
+    ):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("compression='zstd' requires the zstandard package")
+
+        self.directory = Path(directory)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+        self.compression = compression
+        self.hmac_key = hmac_key
+        self.checkpoint_every = checkpoint_every
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+
+        # Records refused because the queue was full
+        self.dropped = 0
+
+        # Writer-thread state
+        self._seq = 0
+        self._data = None
+        self._index = None
+        self._checkpoints = None
+        self._size = 0
+        self._count = 0
+        self._opened_at = 0.0
+        self._last_hash = GENESIS_HASH
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # -------------------------
+    # Request side
+    # -------------------------
+
+    def append(self, record) -> bool:
+        """
+        Queue a record (a dict, indexed by its "run_id" and "timestamp")
+        for writing.
+        Never blocks; returns False if the queue is full and the record
+        was dropped.
+        """
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Audit log queue full; record dropped (%d so far)", self.dropped)
+            return False
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until everything queued so far is written and fsynced."""
+        if not self.running:
+            return self._queue.empty()
+        marker = _FlushMarker()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    # -------------------------
+    # Segments
+    # -------------------------
+
+    def _path(self, seq: int, suffix: str) -> Path:
+        return self.directory / f"{segment_name(seq)}{suffix}"
+
+    def _open_segment(self):
+        self._seq += 1
+        self._data = open(self._path(self._seq, SEGMENT_SUFFIX), "ab")
+        self._index = open(self._path(self._seq, INDEX_SUFFIX), "ab")
+        self._checkpoints = open(self._path(self._seq, CHECKPOINT_SUFFIX), "ab")
+        self._size = self._data.tell()
+        self._count = 0
+        self._opened_at = time.monotonic()
+
+    def _write_checkpoint(self, sealed: bool):
+        checkpoint = make_checkpoint(
+            self.hmac_key, self._seq, self._count, self._size, self._last_hash, sealed
+        )
+        self._checkpoints.write(orjson.dumps(checkpoint) + b"\n")
+
+    def _seal_segment(self):
+        self._write_checkpoint(sealed=True)
+
+        files, seq = (self._data, self._index, self._checkpoints), self._seq
+        self._data = self._index = self._checkpoints = None
+
+        for f in files:
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+
+        if self.compression is not None:
+            self._compress(seq)
+
+    def _compress(self, seq: int):
+        source = self._path(seq, SEGMENT_SUFFIX)
+        target = self._path(seq, SEGMENT_SUFFIX + COMPRESSIONS[self.compression])
+        partial = target.with_name(target.name + ".tmp")
+
+        with open(source, "rb") as src, open(partial, "wb") as raw:
+            if self.compression == "zstd":
+                with zstandard.ZstdCompressor().stream_writer(raw, closefd=False) as out:
+                    shutil.copyfileobj(src, out)
+            else:
+                with gzip.GzipFile(fileobj=raw, mode="wb") as out:
+                    shutil.copyfileobj(src, out)
+            raw.flush()
+            os.fsync(raw.fileno())
+
+        os.replace(partial, target)
+        source.unlink()
+
+    def _should_rotate(self) -> bool:
+        if self._size == 0:
+            return False
+        return (
+            self._size >= self.max_segment_bytes
+            or time.monotonic() - self._opened_at >= self.max_segment_seconds
+        )
+
+    # -------------------------
+    # Writer
+    # -------------------------
+
+    def _write_batch(self, records: list):
+        for record in records:
+            if self._should_rotate():
+                self._seal_segment()
+                self._open_segment()
+            line = chain_line(encode_record(record), self._last_hash)
+            self._index.write(INDEX_ENTRY.pack(
+                self._size,
+                timestamp_ms(record.get("timestamp")),
+                run_key(record.get("run_id"))
+            ))
+            self._data.write(line)
+            self._size += len(line)
+            self._count += 1
+            self._last_hash = line_hash(line)
+            if self._count % self.checkpoint_every == 0:
+                self._write_checkpoint(sealed=False)
+
+        # Group commit: one fsync for the whole batch
+        self._data.flush()
+        os.fsync(self._data.fileno())
+        self._index.flush()
+        self._checkpoints.flush()
+
+    def _drain(self, first) -> list:
+        items = [first]
+        while len(items) < MAX_BATCH:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def run_forever(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=max(self.max_segment_seconds, 0.1))
+            except queue.Empty:
+                first = None
+
+            items = [] if first is None else self._drain(first)
+            stop = _STOP in items
+
+            records = [
+                item for item in items
+                if item is not _STOP and not isinstance(item, _FlushMarker)
+            ]
+
+            try:
+                if records:
+                    self._write_batch(records)
+                elif self._should_rotate():
+                    # Idle past max age: seal so the segment gets compressed
+                    self._seal_segment()
+                    self._open_segment()
+            except Exception:
+                logger.exception("Writing %d audit records failed", len(records))
+
+            for item in items:
+                if isinstance(item, _FlushMarker):
+                    item.done.set()
+
+            if stop:
+                return
+
+    def _recover_chain_head(self) -> str:
+        """Hash of the last record a previous process wrote."""
+        files = segment_files(self.directory)
+        for seq in sorted(files, reverse=True):
+            checkpoints = read_checkpoints(self._path(seq, CHECKPOINT_SUFFIX))
+            if checkpoints and checkpoints[-1].get("sealed"):
+                return checkpoints[-1]["hash"]
+
+            # Unsealed (the process died): hash its last complete line
+            data = read_segment(files[seq])
+            data = data[:data.rfind(b"\n") + 1]
+            if data:
+                return line_hash(data[data.rfind(b"\n", 0, -1) + 1:])
+        return GENESIS_HASH
+
+    def start(self) -> threading.Thread:
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # Never append to a segment from a previous process (it may end
+        # in a torn line); continue numbering after it
+        seqs = [
+            int(m.group(1))
+            for m in (_SEGMENT_RE.match(p.name) for p in self.directory.iterdir())
+            if m
+        ]
+        self._seq = max(seqs, default=0)
+        self._last_hash = self._recover_chain_head()
+        self._open_segment()
+
+        self._thread = threading.Thread(
+            target=self.run_forever,
+            name="audit-log-writer",
+            daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = None):
+        """Write everything queued, seal the active segment, stop."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("Audit log writer still busy after %ss; not sealing", timeout)
+            return
+        self._thread = None
+
+        if self._data is not None:
+            if self._size:
+                self._seal_segment()
+            else:
+                # Nothing written: don't leave an empty segment behind
+                for f, suffix in (
+                    (self._data, SEGMENT_SUFFIX),
+                    (self._index, INDEX_SUFFIX),
+                    (self._checkpoints, CHECKPOINT_SUFFIX),
+                ):
+                    f.close()
+                    self._path(self._seq, suffix).unlink()
+                self._data = self._index = self._checkpoints = None
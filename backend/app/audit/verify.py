@@ -0,0 +1,188 @@
+"""
+Audit log verifier
+
+Purpose:
+- Check the audit log's hash chain and signed checkpoints
+  (app.audit.chain): every record's prev_hash must match the hash of
+  the record before it, and the chain must reach each checkpoint's
+  hash at its record count and byte offset
+- Incremental: the last verified checkpoint per segment is kept in a
+  state file, and each run resumes from it. Fully verified sealed
+  segments are skipped without being read, so a daily check costs
+  what was written since the last one, not the size of the archive
+
+Detects edited, removed, inserted or reordered records, truncated
+sealed segments, segments missing from the middle of the sequence and
+forged or altered checkpoints. Records written after a segment's last
+checkpoint are chain-checked, but they only become "verified" once a
+checkpoint covers them.
+
+CLI:
+    python -m app.audit.verify [--dir logs] [--state logs/verified.json]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import orjson
+
+from app.audit.chain import checkpoint_valid, line_hash, line_prev_hash
+from app.audit.segment_log import (
+    CHECKPOINT_SUFFIX,
+    read_checkpoints,
+    read_segment,
+    segment_files,
+    segment_name,
+)
+from app.config import AUDIT_HMAC_KEY, AUDIT_LOG_DIR
+
+STATE_FILE = "verified.json"
+
+
+class VerifyReport:
+
+    def __init__(self):
+        self.records = 0          # records hashed in this run
+        self.segments = 0         # segments read in this run
+        self.skipped = 0          # sealed segments verified earlier
+        self.problems = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+def _load_state(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    return {int(seq): entry for seq, entry in orjson.loads(path.read_bytes()).items()}
+
+
+def _save_state(path: Path, state: dict):
+    partial = path.with_name(path.name + ".tmp")
+    partial.write_bytes(orjson.dumps({str(seq): entry for seq, entry in state.items()}))
+    partial.replace(path)
+
+
+def _verify_segment(seq, data_path, checkpoints, resume, expected_prev, report, state):
+    """
+    Walk the chain from `resume` (a verified checkpoint, or the start).
+    Returns the hash of the last good record, or None if the chain broke.
+    """
+    name = segment_name(seq)
+    records = resume["records"] if resume else 0
+    offset = resume["offset"] if resume else 0
+    running = resume["hash"] if resume else expected_prev
+
+    pending = [c for c in checkpoints if c["records"] > records]
+    data = read_segment(data_path)
+    report.segments += 1
+
+    while offset < len(data):
+        end = data.find(b"\n", offset)
+        if end < 0:
+            break  # torn tail of an active or crashed segment
+        line = data[offset:end + 1]
+
+        prev = line_prev_hash(line)
+        if prev is None or (running is not None and prev != running):
+            report.problems.append(f"{name}: chain broken at record {records + 1}")
+            return None
+
+        running = line_hash(line)
+        records += 1
+        offset = end + 1
+        report.records += 1
+
+        while pending and pending[0]["records"] == records:
+            checkpoint = pending.pop(0)
+            if checkpoint["hash"] != running or checkpoint["offset"] != offset:
+                report.problems.append(f"{name}: checkpoint at record {records} does not match")
+                return None
+            state[seq] = {k: checkpoint[k] for k in ("records", "offset", "hash", "sealed")}
+
+    if pending:
+        report.problems.append(
+            f"{name}: truncated, {records} records but checkpointed {pending[-1]['records']}"
+        )
+        return None
+    if checkpoints and checkpoints[-1]["sealed"] and records != checkpoints[-1]["records"]:
+        report.problems.append(f"{name}: records after the sealing checkpoint")
+        return None
+
+    return running
+
+
+def verify_log(directory=AUDIT_LOG_DIR, key: bytes = AUDIT_HMAC_KEY, state_path=None) -> VerifyReport:
+    if not key:
+        raise RuntimeError("AUDIT_HMAC_KEY is not set: checkpoint signatures can't be checked")
+
+    directory = Path(directory)
+    state_path = Path(state_path) if state_path else directory / STATE_FILE
+    state = _load_state(state_path)
+    report = VerifyReport()
+
+    files = segment_files(directory)
+    previous_seq = None
+    expected_prev = None  # unknown before the oldest retained segment
+
+    for seq in sorted(files):
+        name = segment_name(seq)
+        if previous_seq is not None and seq != previous_seq + 1:
+            report.problems.append(f"segments missing before {name}")
+            expected_prev = None
+        previous_seq = seq
+
+        checkpoints = read_checkpoints(directory / f"{name}{CHECKPOINT_SUFFIX}")
+        for position, checkpoint in enumerate(checkpoints):
+            if not checkpoint_valid(key, checkpoint) or checkpoint["segment"] != seq:
+                report.problems.append(f"{name}: checkpoint {position + 1} has a bad signature")
+                checkpoints = checkpoints[:position]
+                break
+
+        resume = state.get(seq)
+        if resume is not None and not any(
+            c["records"] == resume["records"] and c["hash"] == resume["hash"]
+            for c in checkpoints
+        ):
+            report.problems.append(f"{name}: verified checkpoint no longer present")
+            resume = None
+
+        if resume is not None and resume["sealed"]:
+            report.skipped += 1
+            expected_prev = resume["hash"]
+            continue
+
+        expected_prev = _verify_segment(
+            seq, files[seq], checkpoints, resume, expected_prev, report, state
+        )
+
+    _save_state(state_path, state)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify the audit log hash chain")
+    parser.add_argument("--dir", default=AUDIT_LOG_DIR, help="audit log directory")
+    parser.add_argument("--state", default=None, help=f"state file (default <dir>/{STATE_FILE})")
+    parser.add_argument("--full", action="store_true", help="ignore saved state and re-verify everything")
+    args = parser.parse_args()
+
+    state_path = Path(args.state) if args.state else Path(args.dir) / STATE_FILE
+    if args.full and state_path.exists():
+        state_path.unlink()
+
+    try:
+        report = verify_log(args.dir, state_path=state_path)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    for problem in report.problems:
+        print(f"❌ {problem}")
+    if not report.ok:
+        sys.exit(1)
+    print(
+        f"✅ Verified {report.records} records in {report.segments} segments "
+        f"({report.skipped} sealed segments already verified)"
+    )
@@ -0,0 +1,269 @@
+"""
+Consumption-rate model for refill prediction
+
+Purpose:
+- Load purchase events into NumPy arrays grouped by (customer, medicine)
+- Estimate each group's daily consumption rate from its empirical
+  inter-purchase intervals, smoothed with an EWMA
+- Project run-out dates for the latest purchase in each group
+
+Everything after loading is vectorized: no per-customer Python loops.
+Groups with a single purchase fall back to DEFAULT_DAYS_PER_UNIT.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.db.models import OrderHistory
+
+DEFAULT_DAYS_PER_UNIT = 1  # Fallback when there is no interval to learn from
+
+# Weight of the most recent interval in the EWMA
+EWMA_ALPHA = 0.3
+
+# Same-day repeat purchases would otherwise imply an infinite rate
+MIN_INTERVAL_DAYS = 1.0
+
+_EPOCH = np.datetime64("1970-01-01T00:00:00", "us")
+_US_PER_DAY = 86400 * 1_000_000
+
+
+@dataclass
+class PurchaseEvents:
+    order_id: np.ndarray       # int64, OrderHistory.id
+    customer_id: np.ndarray    # int64
+    medicine_code: np.ndarray  # int32, index into medicine_names
+    day: np.ndarray            # float64, days since epoch (UTC)
+    quantity: np.ndarray       # float64
+    medicine_names: np.ndarray  # object
+
+
+@dataclass
+class ConsumptionForecast:
+    """One entry per (customer, medicine) group."""
+    last_order_id: np.ndarray
+    customer_id: np.ndarray
+    medicine_code: np.ndarray
+    medicine_names: np.ndarray
+    last_day: np.ndarray
+    last_quantity: np.ndarray
+    purchases: np.ndarray
+    interval_days: np.ndarray  # EWMA inter-purchase interval, NaN if unknown
+    daily_rate: np.ndarray     # EWMA units consumed per day
+    runout_day: np.ndarray
+
+    def __len__(self):
+        return len(self.customer_id)
+
+    def medicine_name(self, i: int) -> str:
+        return self.medicine_names[self.medicine_code[i]]
+
+    def days_remaining(self, now: datetime) -> np.ndarray:
+        return np.maximum(np.ceil(self.runout_day - to_day(now)), 0).astype(np.int64)
+
+
+# -------------------------
+# Conversions
+# -------------------------
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def to_days(values) -> np.ndarray:
+    if len(values) and getattr(values[0], "tzinfo", None) is not None:
+        values = [_naive_utc(v) for v in values]
+    stamps = np.array(values, dtype="datetime64[us]")
+    return (stamps - _EPOCH).astype(np.int64) / _US_PER_DAY
+
+
+def to_day(value: datetime) -> float:
+    return float(to_days([value])[0])
+
+
+def to_datetimes(days: np.ndarray) -> list:
+    stamps = _EPOCH + np.round(days * _US_PER_DAY).astype("timedelta64[us]")
+    return stamps.astype(object).tolist()
+
+
+def from_day(day: float) -> datetime:
+    return to_datetimes(np.array([day]))[0]
+
+
+# -------------------------
+# Loading
+# -------------------------
+
+def events_from_rows(rows) -> PurchaseEvents:
+    """rows: iterable of (id, customer_id, medicine_name, created_at, quantity)"""
+    rows = list(rows)
+    if not rows:
+        return PurchaseEvents(
+            order_id=np.empty(0, np.int64),
+            customer_id=np.empty(0, np.int64),
+            medicine_code=np.empty(0, np.int32),
+            day=np.empty(0, np.float64),
+            quantity=np.empty(0, np.float64),
+            medicine_names=np.empty(0, object),
+        )
+
+    order_ids, customer_ids, names, created, quantities = zip(*rows)
+    medicine_names, codes = np.unique(np.array(names, dtype=object), return_inverse=True)
+
+    return PurchaseEvents(
+        order_id=np.asarray(order_ids, dtype=np.int64),
+        customer_id=np.asarray(customer_ids, dtype=np.int64),
+        medicine_code=codes.astype(np.int32),
+        day=to_days(created),
+        quantity=np.asarray(quantities, dtype=np.float64),
+        medicine_names=medicine_names,
+    )
+
+
+def load_purchase_events(db, customer_ids=None, criterion=None) -> PurchaseEvents:
+    """
+    Load OrderHistory as column arrays.
+
+    customer_ids: restrict to these customers
+    criterion: extra SQLAlchemy filter (e.g. a shard predicate)
+    """
+    query = db.query(
+        OrderHistory.id,
+        OrderHistory.customer_id,
+        OrderHistory.medicine_name,
+        OrderHistory.created_at,
+        OrderHistory.quantity,
+    )
+    if customer_ids is not None:
+        query = query.filter(OrderHistory.customer_id.in_(customer_ids))
+    if criterion is not None:
+        query = query.filter(criterion)
+
+    return events_from_rows(query.all())
+
+
+# -------------------------
+# Model
+# -------------------------
+
+def _segment_ewma(values: np.ndarray, group: np.ndarray, steps_from_end: np.ndarray,
+                  valid: np.ndarray, n_groups: int, alpha: float) -> np.ndarray:
+    """
+    Bias-corrected EWMA of `values` within each group, in one pass.
+
+    The sample k steps before a group's last sample has weight
+    (1 - alpha) ** k; summing weighted values and weights per group
+    with bincount gives every group's EWMA without a Python loop.
+    """
+    weights = np.where(valid, (1.0 - alpha) ** steps_from_end, 0.0)
+    safe_values = np.where(valid, values, 0.0)
+
+    num = np.bincount(group, weights=weights * safe_values, minlength=n_groups)
+    den = np.bincount(group, weights=weights, minlength=n_groups)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den > 0, num / den, np.nan)
+
+
+def _sort_order(group_key: np.ndarray, day: np.ndarray, order_id: np.ndarray) -> np.ndarray:
+    """
+    Permutation sorting events by (group, time, id).
+
+    When group keys and second-resolution timestamps fit together in one
+    int64, a single stable radix argsort over the packed key replaces a
+    multi-key lexsort (~3x faster at millions of events).
+    """
+    seconds = np.round((day - day.min()) * 86400).astype(np.int64)
+
+    if group_key.max() >= 2 ** 32 or seconds.max() >= 2 ** 31:
+        return np.lexsort((order_id, day, group_key))
+
+    packed = (group_key << 31) | seconds
+
+    if np.all(order_id[1:] >= order_id[:-1]):
+        return np.argsort(packed, kind="stable")
+
+    by_id = np.argsort(order_id, kind="stable")
+    return by_id[np.argsort(packed[by_id], kind="stable")]
+
+
+def forecast(events: PurchaseEvents, alpha: float = EWMA_ALPHA) -> ConsumptionForecast:
+    n = len(events.customer_id)
+    if n == 0:
+        empty_f = np.empty(0, np.float64)
+        return ConsumptionForecast(
+            last_order_id=np.empty(0, np.int64),
+            customer_id=np.empty(0, np.int64),
+            medicine_code=np.empty(0, np.int32),
+            medicine_names=events.medicine_names,
+            last_day=empty_f,
+            last_quantity=empty_f,
+            purchases=np.empty(0, np.int64),
+            interval_days=empty_f,
+            daily_rate=empty_f,
+            runout_day=empty_f,
+        )
+
+    # One int64 key per (customer, medicine); ties on timestamp fall
+    # back to insertion order (id)
+    group_key = events.customer_id * max(len(events.medicine_names), 1) + events.medicine_code
+    order = _sort_order(group_key, events.day, events.order_id)
+    group_key = group_key[order]
+    cust = events.customer_id[order]
+    med = events.medicine_code[order]
+    day = events.day[order]
+    qty = events.quantity[order]
+
+    # Group boundaries
+    starts_mask = np.ones(n, dtype=bool)
+    starts_mask[1:] = group_key[1:] != group_key[:-1]
+    group = np.cumsum(starts_mask) - 1
+    n_groups = int(group[-1]) + 1
+
+    starts = np.flatnonzero(starts_mask)
+    ends = np.append(starts[1:], n) - 1
+    steps_from_end = ends[group] - np.arange(n)
+
+    # Interval ending at each event, consumed by the previous purchase
+    interval = np.empty(n, dtype=np.float64)
+    interval[0] = np.nan
+    interval[1:] = day[1:] - day[:-1]
+    interval[starts_mask] = np.nan
+    valid = ~np.isnan(interval)
+
+    prev_qty = np.empty(n, dtype=np.float64)
+    prev_qty[0] = 0.0
+    prev_qty[1:] = qty[:-1]
+
+    clamped = np.maximum(np.where(valid, interval, MIN_INTERVAL_DAYS), MIN_INTERVAL_DAYS)
+    rate_samples = prev_qty / clamped
+
+    interval_ewma = _segment_ewma(interval, group, steps_from_end, valid, n_groups, alpha)
+    rate_ewma = _segment_ewma(rate_samples, group, steps_from_end, valid, n_groups, alpha)
+
+    daily_rate = np.where(np.isnan(rate_ewma), 1.0 / DEFAULT_DAYS_PER_UNIT, rate_ewma)
+    daily_rate = np.where(daily_rate > 0, daily_rate, 1.0 / DEFAULT_DAYS_PER_UNIT)
+
+    last_day = day[ends]
+    last_quantity = qty[ends]
+
+    return ConsumptionForecast(
+        last_order_id=events.order_id[order][ends],
+        customer_id=cust[starts],
+        medicine_code=med[starts],
+        medicine_names=events.medicine_names,
+        last_day=last_day,
+        last_quantity=last_quantity,
+        purchases=ends - starts + 1,
+        interval_days=interval_ewma,
+        daily_rate=daily_rate,
+        runout_day=last_day + last_quantity / daily_rate,
+    )
+
+
+def forecast_customers(db, customer_ids) -> ConsumptionForecast:
+    return forecast(load_purchase_events(db, customer_ids=customer_ids))
@@ -0,0 +1,362 @@
+"""
+Parquet export for offline analytics
+
+Purpose:
+- Stream order_history, order_items (with the order's customer_id and
+  created_at) and decision_traces into Parquet files partitioned by
+  day, Hive style:
+      <PARQUET_EXPORT_DIR>/<table>/date=YYYY-MM-DD/part-<first id>-<last id>.parquet
+  pandas, DuckDB and pyarrow read the layout directly and skip whole
+  days on date filters
+- Bounded memory: rows come from a streaming cursor and are written in
+  row groups of PARQUET_ROW_GROUP_SIZE; at most MAX_OPEN_DAYS day files
+  are open at once
+- Incremental: each table's last exported id is kept in
+  sweep_watermarks, and a run only reads rows past it. Part files are
+  never rewritten: a run adds new ones
+- query(): read an export back as an Arrow table through memory-mapped
+  files, with column projection and date / row filters
+
+A run's files become visible (renamed from a hidden temp name) before
+its watermark commits; files past the watermark left by a crashed run
+are deleted at the start of the next one, so nothing is exported twice.
+
+Needs the pyarrow package (optional dependency: pip install pyarrow).
+"""
+
+import argparse
+import os
+import re
+from collections import OrderedDict
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from app.config import PARQUET_COMPRESSION, PARQUET_EXPORT_DIR, PARQUET_ROW_GROUP_SIZE
+from app.db.database import ReadSessionLocal, SessionLocal
+from app.db.models import DecisionTrace, Order, OrderHistory, OrderItem, SweepWatermark
+from app.observability.trace_store import ID_SPAN, trace_partitions
+from app.services.analytics_service import to_naive_utc
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for Parquet export
+    pa = None
+
+TABLES = ("order_history", "order_items", "decision_traces")
+
+WATERMARK_PREFIX = "parquet_export:"
+
+# Day files open at once; rows arrive in id (roughly time) order, so
+# only the last few days are usually active
+MAX_OPEN_DAYS = 8
+
+# Hive's name for a NULL partition value (rows without created_at)
+NULL_DATE = "__HIVE_DEFAULT_PARTITION__"
+
+_PART_FILE = re.compile(r"^part-(\d+)-(\d+)\.parquet$")
+_TEMP_PREFIX = ".tmp-"
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Parquet export needs the pyarrow package")
+
+
+# -------------------------
+# Sources
+# -------------------------
+
+def _sources(name: str, after: int) -> list:
+    """(session factory, SELECT of rows with id > after in id order) to read, in order."""
+    if name == "order_history":
+        table = OrderHistory.__table__
+        return [(ReadSessionLocal, select(*table.columns).where(table.c.id > after).order_by(table.c.id))]
+
+    if name == "order_items":
+        items, orders = OrderItem.__table__, Order.__table__
+        statement = (
+            select(*items.columns, orders.c.customer_id, orders.c.created_at)
+            .join(orders, orders.c.id == items.c.order_id)
+            .where(items.c.id > after)
+            .order_by(items.c.id)
+        )
+        return [(ReadSessionLocal, statement)]
+
+    if name == "decision_traces":
+        if trace_partitions is None:
+            tables = [(ReadSessionLocal, DecisionTrace.__table__)]
+        else:
+            # Unpartitioned table first, then days oldest first: ascending ids
+            tables = [
+                (partition.sessions, partition.table)
+                for partition in reversed(trace_partitions.spanning())
+                if partition.day is None or (partition.day.toordinal() + 1) * ID_SPAN > after
+            ]
+        return [
+            (sessions, select(*table.columns).where(table.c.id > after).order_by(table.c.id))
+            for sessions, table in tables
+        ]
+
+    raise ValueError(f"Unknown export table: {name}")
+
+
+def _arrow_type(column):
+    python_type = column.type.python_type
+    if python_type is bool:
+        return pa.bool_()
+    if python_type is int:
+        return pa.int64()
+    if python_type is float:
+        return pa.float64()
+    if python_type is datetime:
+        return pa.timestamp("us")  # naive UTC, as stored
+    return pa.string()
+
+
+def _schema(statement):
+    return pa.schema([
+        pa.field(column.key, _arrow_type(column))
+        for column in statement.selected_columns
+    ])
+
+
+# -------------------------
+# Writer
+# -------------------------
+
+class _DayFile:
+    """One part file being written for one day."""
+
+    def __init__(self, directory: str, first_id: int, schema, compression):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.first_id = first_id
+        self.last_id = first_id
+        self.temp_path = os.path.join(directory, f"{_TEMP_PREFIX}{first_id}.parquet")
+        self.writer = pq.ParquetWriter(self.temp_path, schema, compression=compression)
+        self.schema = schema
+        self.rows = []
+
+    def write_group(self):
+        if not self.rows:
+            return
+        columns = list(zip(*self.rows))
+        self.writer.write_table(
+            pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, self.schema)],
+                schema=self.schema
+            ),
+            row_group_size=len(self.rows)
+        )
+        self.rows = []
+
+    def close(self) -> str:
+        self.write_group()
+        self.writer.close()
+        path = os.path.join(self.directory, f"part-{self.first_id:012d}-{self.last_id:012d}.parquet")
+        os.replace(self.temp_path, path)
+        return path
+
+
+class ParquetExporter:
+
+    def __init__(
+        self,
+        directory: str = PARQUET_EXPORT_DIR,
+        row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+        compression: str = PARQUET_COMPRESSION
+    ):
+        _require_pyarrow()
+        self.directory = directory
+        self.row_group_size = row_group_size
+        self.compression = None if compression == "none" else compression
+
+    # -------------------------
+    # Watermark
+    # -------------------------
+
+    def _last_id(self, name: str) -> int:
+        db = SessionLocal()
+        try:
+            watermark = db.get(SweepWatermark, WATERMARK_PREFIX + name)
+            return watermark.last_id if watermark else 0
+        finally:
+            db.close()
+
+    def _advance(self, name: str, last_id: int):
+        db = SessionLocal()
+        try:
+            watermark = db.get(SweepWatermark, WATERMARK_PREFIX + name)
+            if watermark is None:
+                watermark = SweepWatermark(name=WATERMARK_PREFIX + name)
+                db.add(watermark)
+            watermark.last_id = last_id
+            watermark.last_created_at = datetime.utcnow()
+            db.commit()
+
+        except Exception:
+            db.rollback()
+            raise
+
+        finally:
+            db.close()
+
+    def _remove_uncommitted(self, name: str, after: int):
+        """Delete temp files and part files past the watermark (a crashed run's)."""
+        root = os.path.join(self.directory, name)
+        if not os.path.isdir(root):
+            return
+        for day_dir, _, files in os.walk(root):
+            for file_name in files:
+                match = _PART_FILE.match(file_name)
+                if file_name.startswith(_TEMP_PREFIX) or (match and int(match.group(1)) > after):
+                    os.remove(os.path.join(day_dir, file_name))
+
+    # -------------------------
+    # Export
+    # -------------------------
+
+    def export_table(self, name: str) -> int:
+        """Export rows past the table's watermark. Returns the rows written."""
+        # The write session is only opened around the watermark reads
+        # and update, never held for the export itself
+        after = self._last_id(name)
+        self._remove_uncommitted(name, after)
+
+        exported, last_id = self._write(name, after)
+        if exported:
+            self._advance(name, last_id)
+        return exported
+
+    def _write(self, name: str, after: int) -> tuple:
+        open_days = OrderedDict()
+        exported, last_id = 0, after
+
+        try:
+            for sessions, statement in _sources(name, after):
+                schema = _schema(statement)
+                names = schema.names
+                id_index = names.index("id")
+                time_indexes = [i for i, field in enumerate(schema) if pa.types.is_timestamp(field.type)]
+                date_index = names.index("created_at")
+
+                db = sessions()
+                try:
+                    result = db.execute(statement.execution_options(yield_per=self.row_group_size))
+                    for row in result:
+                        row = list(row)
+                        for i in time_indexes:
+                            if row[i] is not None:
+                                row[i] = to_naive_utc(row[i])
+                        created_at = row[date_index]
+                        day = created_at.date().isoformat() if created_at else NULL_DATE
+
+                        day_file = open_days.get(day)
+                        if day_file is None:
+                            if len(open_days) >= MAX_OPEN_DAYS:
+                                open_days.popitem(last=False)[1].close()
+                            day_file = _DayFile(
+                                os.path.join(self.directory, name, f"date={day}"),
+                                row[id_index], schema, self.compression
+                            )
+                            open_days[day] = day_file
+                        else:
+                            open_days.move_to_end(day)
+
+                        day_file.rows.append(row)
+                        day_file.last_id = row[id_index]
+                        if len(day_file.rows) >= self.row_group_size:
+                            day_file.write_group()
+
+                        exported += 1
+                        last_id = row[id_index]
+                finally:
+                    db.close()
+
+                # Each source is one trace partition (or the whole table):
+                # its days are done once it's read
+                while open_days:
+                    open_days.popitem(last=False)[1].close()
+
+        except Exception:
+            for day_file in open_days.values():
+                day_file.writer.close()
+            raise
+
+        return exported, last_id
+
+    def export(self, tables=TABLES) -> dict:
+        return {name: self.export_table(name) for name in tables}
+
+
+# -------------------------
+# Reading back
+# -------------------------
+
+def query(
+    name: str,
+    columns: list = None,
+    start: date = None,
+    end: date = None,
+    filter=None,
+    directory: str = PARQUET_EXPORT_DIR
+):
+    """
+    An exported table as a pyarrow.Table, read through memory-mapped
+    files. start / end select days [start, end); filter is a
+    pyarrow.dataset expression, e.g. ds.field("quantity") > 2.
+    Use .to_pandas(), or query the result from DuckDB directly.
+    """
+    _require_pyarrow()
+    dataset = ds.dataset(
+        os.path.join(directory, name),
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([("date", pa.date32())]), flavor="hive"),
+        filesystem=pafs.LocalFileSystem(use_mmap=True)
+    )
+
+    expression = filter
+    for condition in (
+        ds.field("date") >= start if start else None,
+        ds.field("date") < end if end else None,
+    ):
+        if condition is not None:
+            expression = condition if expression is None else expression & condition
+
+    return dataset.to_table(columns=columns, filter=expression)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parquet export for offline analytics")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="export new rows since the last run")
+    export_parser.add_argument("--tables", default=",".join(TABLES))
+
+    query_parser = commands.add_parser("query", help="read an export back")
+    query_parser.add_argument("table", choices=TABLES)
+    query_parser.add_argument("--columns")
+    query_parser.add_argument("--start", type=date.fromisoformat)
+    query_parser.add_argument("--end", type=date.fromisoformat)
+    query_parser.add_argument("--head", type=int, default=10)
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "export":
+            exported = ParquetExporter().export([t.strip() for t in args.tables.split(",") if t.strip()])
+            for name, rows in exported.items():
+                print(f"✅ Exported {rows} {name} rows to {os.path.join(PARQUET_EXPORT_DIR, name)}")
+        else:
+            columns = args.columns.split(",") if args.columns else None
+            table = query(args.table, columns=columns, start=args.start, end=args.end)
+            print(f"✅ {table.num_rows} {args.table} rows")
+            for row in table.slice(0, args.head).to_pylist():
+                print(row)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
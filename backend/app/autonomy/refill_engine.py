@@ -1,14 +1,27 @@
-from datetime import datetime
-from app.db.database import SessionLocal
-from app.db.models import OrderHistory, RefillAlert, Customer
+import logging
+import math
+from datetime import datetime, timedelta
+from sqlalchemy import func, tuple_
+from app.db.database import ReadSessionLocal, SessionLocal
+from app.db.models import OrderHistory, RefillAlert, RefillProjection, SweepWatermark
+from app.db.upsert import upsert
+from app.autonomy.consumption_model import forecast_customers, to_datetimes
 
-DEFAULT_DAYS_PER_UNIT = 1  # Explicit assumption
+logger = logging.getLogger(__name__)
 
+# Alert once a projection has this many days (or fewer) of supply left
+REFILL_ALERT_WINDOW_DAYS = 3
+HIGH_URGENCY_DAYS = 1
 
-def estimate_days_remaining(quantity: int, days_since: int) -> int:
-    total_days = quantity * DEFAULT_DAYS_PER_UNIT
-    remaining = total_days - days_since
-    return max(remaining, 0)
+WATERMARK_NAME = "refill_engine"
+
+# Keeps IN (...) lists well under SQLite's bound-parameter limit
+CUSTOMER_CHUNK_SIZE = 500
+
+
+def days_remaining_until(runout_at: datetime, now: datetime) -> int:
+    """Whole days of supply left, rounded up; 0 once run out."""
+    return max(math.ceil((runout_at - now).total_seconds() / 86400), 0)
 
 
 def urgency_from_days(days_remaining: int) -> str:
@@ -19,65 +32,301 @@ def urgency_from_days(days_remaining: int) -> str:
     return "low"
 
 
-def run_refill_engine():
+def next_check_from(runout_at: datetime, now: datetime):
     """
-    Autonomous refill intelligence engine.
-    Scans all customers and generates refill alerts.
+    Next moment a projection crosses an alert threshold.
+    None once it is fully escalated (nothing left to re-check).
+    """
+    for days in (REFILL_ALERT_WINDOW_DAYS, HIGH_URGENCY_DAYS):
+        threshold = runout_at - timedelta(days=days)
+        if now < threshold:
+            return threshold
+    return None
+
+
+# -------------------------
+# Watermark
+# -------------------------
+
+def _load_watermark(db, name: str = WATERMARK_NAME) -> SweepWatermark:
+    watermark = db.get(SweepWatermark, name)
+    if watermark is None:
+        watermark = SweepWatermark(name=name, last_id=0)
+        db.add(watermark)
+    return watermark
+
+
+def _touched_customers(db, last_id: int):
+    """
+    Customers with order history newer than the watermark.
+    Returns (customer_ids, max_id, max_created_at).
+    """
+    rows = (
+        db.query(
+            OrderHistory.customer_id,
+            func.max(OrderHistory.id),
+            func.max(OrderHistory.created_at),
+        )
+        .filter(OrderHistory.id > last_id)
+        .group_by(OrderHistory.customer_id)
+        .all()
+    )
+
+    if not rows:
+        return [], last_id, None
+
+    customer_ids = [r[0] for r in rows]
+    max_id = max(r[1] for r in rows)
+    max_created_at = max((r[2] for r in rows if r[2] is not None), default=None)
+    return customer_ids, max_id, max_created_at
+
+
+# -------------------------
+# Projections
+# -------------------------
+
+def _refresh_projections(db, customer_ids, now: datetime, reader=None, force: bool = False) -> list:
+    """
+    reader: session for the order-history scan (may be a lagging
+    replica); projections are always read and written through db.
+    force: recompute projections that are already current too (never
+    ones newer than what the reader saw).
+    """
+    reader = reader or db
+    refreshed = []
+
+    for start in range(0, len(customer_ids), CUSTOMER_CHUNK_SIZE):
+        chunk = customer_ids[start:start + CUSTOMER_CHUNK_SIZE]
+
+        existing = {
+            (p.customer_id, p.medicine_name): p
+            for p in db.query(RefillProjection)
+            .filter(RefillProjection.customer_id.in_(chunk))
+            .all()
+        }
+
+        fc = forecast_customers(reader, chunk)
+        last_purchase = to_datetimes(fc.last_day)
+        runout = to_datetimes(fc.runout_day)
+
+        for i in range(len(fc)):
+            customer_id = int(fc.customer_id[i])
+            med_name = fc.medicine_name(i)
+            order_id = int(fc.last_order_id[i])
+
+            projection = existing.get((customer_id, med_name))
+            last_order_id = (projection.last_order_id or 0) if projection is not None else 0
+            new_purchase = projection is None or last_order_id < order_id
+            # Already current (unless forced), or the reader is behind the primary
+            if not new_purchase and (not force or last_order_id > order_id):
+                continue
+
+            if projection is None:
+                projection = RefillProjection(
+                    customer_id=customer_id,
+                    medicine_name=med_name,
+                )
+                db.add(projection)
+
+            projection.last_order_id = order_id
+            projection.last_purchase_at = last_purchase[i]
+            projection.quantity = int(fc.last_quantity[i])
+            projection.daily_rate = float(fc.daily_rate[i])
+            projection.runout_at = runout[i]
+            # A new purchase resets escalation; check it on this sweep
+            if new_purchase:
+                projection.alert_urgency = None
+            projection.next_check_at = now
+            refreshed.append(projection)
+
+    db.flush()
+    return refreshed
+
+
+# -------------------------
+# Alerts
+# -------------------------
+
+def _upsert_alert(db, customer_id: int, med_name: str, urgency: str, days_remaining: int):
+    # One INSERT ... ON CONFLICT, not a read then an add: the sweep and
+    # the due queues of other API replicas may raise the same alert at
+    # the same time
+    upsert(
+        db,
+        RefillAlert,
+        [{
+            "customer_id": customer_id,
+            "medicine_name": med_name,
+            "urgency": urgency,
+            "days_remaining": days_remaining,
+        }],
+        index_elements=["customer_id", "medicine_name"],
+        update_columns=["urgency", "days_remaining"]
+    )
+
+
+def _evaluate_projection(db, projection: RefillProjection, now: datetime) -> bool:
+    """
+    Raise or escalate the alert for one projection and move its
+    next_check_at to the following threshold. Returns True if alerted.
+    """
+    alerted = False
+    days_remaining = days_remaining_until(projection.runout_at, now)
+
+    if days_remaining <= REFILL_ALERT_WINDOW_DAYS:
+        urgency = urgency_from_days(days_remaining)
+
+        if urgency != projection.alert_urgency:
+            _upsert_alert(
+                db,
+                projection.customer_id,
+                projection.medicine_name,
+                urgency,
+                days_remaining
+            )
+            projection.alert_urgency = urgency
+            alerted = True
+
+            logger.info(
+                "Refill alert: customer=%s medicine=%s days_remaining=%d urgency=%s",
+                projection.customer_id, projection.medicine_name, days_remaining, urgency
+            )
+
+    projection.next_check_at = next_check_from(projection.runout_at, now)
+    return alerted
+
+
+def _process_due_projections(db, now: datetime) -> int:
+    """
+    Projections whose next threshold has passed.
+    Served by the index on next_check_at, so the cost tracks the
+    number of crossings rather than the number of projections.
     """
+    due = (
+        db.query(RefillProjection)
+        .filter(RefillProjection.next_check_at <= now)
+        .order_by(RefillProjection.next_check_at)
+        .all()
+    )
+
+    return sum(_evaluate_projection(db, projection, now) for projection in due)
 
+
+# -------------------------
+# Targeted entrypoints (used by the due-time queue)
+# -------------------------
+
+def refresh_customers(customer_ids) -> list:
+    """
+    Recompute projections for customers who just ordered.
+    Returns [(customer_id, medicine_name, next_check_at)] to schedule.
+    """
     db = SessionLocal()
+    try:
+        refreshed = _refresh_projections(db, list(customer_ids), datetime.utcnow())
+        entries = [
+            (p.customer_id, p.medicine_name, p.next_check_at)
+            for p in refreshed
+        ]
+        db.commit()
+        return entries
 
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+def evaluate_projections(keys) -> list:
+    """
+    Evaluate specific (customer_id, medicine_name) projections now.
+    Returns [(customer_id, medicine_name, next_check_at)] to reschedule.
+    """
+    db = SessionLocal()
     try:
-        customers = db.query(Customer).all()
-
-        for customer in customers:
-            history = (
-                db.query(OrderHistory)
-                .filter(OrderHistory.customer_id == customer.id)
-                .order_by(OrderHistory.created_at.desc())
-                .all()
+        now = datetime.utcnow()
+        projections = (
+            db.query(RefillProjection)
+            .filter(
+                tuple_(RefillProjection.customer_id, RefillProjection.medicine_name)
+                .in_(list(keys))
             )
+            .all()
+        )
 
-            latest_by_medicine = {}
-            for h in history:
-                if h.medicine_name not in latest_by_medicine:
-                    latest_by_medicine[h.medicine_name] = h
-
-            for med_name, record in latest_by_medicine.items():
-                days_since = (datetime.utcnow() - record.created_at).days
-                days_remaining = estimate_days_remaining(record.quantity, days_since)
-
-                if days_remaining <= 3:
-                    urgency = urgency_from_days(days_remaining)
-
-                    exists = (
-                        db.query(RefillAlert)
-                        .filter(
-                            RefillAlert.customer_id == customer.id,
-                            RefillAlert.medicine_name == med_name
-                        )
-                        .first()
-                    )
-
-                    if not exists:
-                        db.add(
-                            RefillAlert(
-                                customer_id=customer.id,
-                                medicine_name=med_name,
-                                urgency=urgency,
-                                days_remaining=days_remaining
-                            )
-                        )
-
-                        print(
-                            f"[REFILL ENGINE] "
-                            f"customer={customer.id} "
-                            f"medicine={med_name} "
-                            f"days_remaining={days_remaining} "
-                            f"urgency={urgency}"
-                        )
+        entries = []
+        for projection in projections:
+            # Skip if a sweep already moved it past this threshold
+            if projection.next_check_at is not None and projection.next_check_at <= now:
+                _evaluate_projection(db, projection, now)
+            entries.append((
+                projection.customer_id,
+                projection.medicine_name,
+                projection.next_check_at
+            ))
 
         db.commit()
+        return entries
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+def run_refill_engine(full_rescan: bool = False) -> int:
+    """
+    Autonomous refill intelligence engine.
+
+    Incremental sweep:
+    - recomputes projections only for customers with order history
+      newer than the persisted watermark
+    - re-evaluates projections whose run-out date crossed a threshold
+    - advances the watermark in the same transaction
+
+    full_rescan=True ignores the watermark and recomputes every projection
+    from order history (e.g. after a consumption model change); alert
+    escalation is kept unless there is a new purchase.
+    Returns the number of alerts created or escalated.
+
+    The order-history scans run on ReadSessionLocal (the replica when
+    one is configured); a lagging replica only delays pickup until the
+    next sweep, because the watermark never passes what was read.
+    """
+
+    db = SessionLocal()
+    reader = ReadSessionLocal()
+
+    try:
+        now = datetime.utcnow()
+        watermark = _load_watermark(db)
+        since_id = 0 if full_rescan else (watermark.last_id or 0)
+
+        customer_ids, max_id, max_created_at = _touched_customers(reader, since_id)
+
+        if customer_ids:
+            _refresh_projections(db, customer_ids, now, reader=reader, force=full_rescan)
+
+        # Release the read snapshot before the write commits
+        reader.close()
+
+        alerted = _process_due_projections(db, now)
+
+        if max_id > (watermark.last_id or 0):
+            watermark.last_id = max_id
+            watermark.last_created_at = max_created_at
+
+        db.commit()
+        return alerted
+
+    except Exception:
+        db.rollback()
+        raise
 
     finally:
+        reader.close()
         db.close()
@@ -0,0 +1,241 @@
+"""
+Due-time refill queue
+
+Purpose:
+- Fire refill alerts within seconds of becoming due, without waiting
+  for the next scheduler tick and without scanning projections
+- A min-heap keyed by each projection's next threshold time
+  (next_check_at, derived from its estimated run-out date)
+- Rebuilt from the next_check_at index on startup
+- Orders placed in-process enqueue the customer; the worker thread
+  recomputes their projections and reschedules them
+
+The periodic sweep stays as the safety net for orders written by other
+processes and for anything missed while the queue was down.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime
+
+from app.autonomy import refill_engine
+from app.db.database import ReadSessionLocal
+from app.db.models import RefillProjection
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Retry delay for items whose evaluation failed
+RETRY_SECONDS = 60
+
+# Rebuild the heap once stale entries outnumber live ones by this factor
+COMPACT_RATIO = 2
+
+
+def _to_ts(value: datetime) -> float:
+    return (value - _EPOCH).total_seconds()
+
+
+class DueItem:
+    """Heap entry; __slots__ keeps it to four references per item."""
+    __slots__ = ("due", "seq", "customer_id", "medicine_name")
+
+    def __init__(self, due: float, seq: int, customer_id: int, medicine_name: str):
+        self.due = due
+        self.seq = seq
+        self.customer_id = customer_id
+        self.medicine_name = medicine_name
+
+    def __lt__(self, other):
+        if self.due != other.due:
+            return self.due < other.due
+        return self.seq < other.seq
+
+    @property
+    def key(self):
+        return (self.customer_id, self.medicine_name)
+
+
+class RefillDueQueue:
+
+    def __init__(self):
+        self._heap = []
+        self._live = {}  # (customer_id, medicine_name) -> current DueItem
+        self._pending_customers = set()
+        self._seq = itertools.count()
+
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._live)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # -------------------------
+    # Heap maintenance
+    # -------------------------
+
+    def _push(self, customer_id: int, medicine_name: str, due_at: datetime):
+        key = (customer_id, medicine_name)
+
+        if due_at is None:
+            # Fully escalated: nothing left to fire
+            self._live.pop(key, None)
+            return
+
+        item = DueItem(_to_ts(due_at), next(self._seq), customer_id, medicine_name)
+        self._live[key] = item
+        heapq.heappush(self._heap, item)
+
+        if len(self._heap) > COMPACT_RATIO * max(len(self._live), 1) + 1024:
+            self._heap = list(self._live.values())
+            heapq.heapify(self._heap)
+
+    def schedule(self, customer_id: int, medicine_name: str, due_at: datetime):
+        """Insert or move a projection; the previous entry becomes stale."""
+        with self._cond:
+            self._push(customer_id, medicine_name, due_at)
+            self._cond.notify()
+
+    def schedule_many(self, entries):
+        with self._cond:
+            for customer_id, medicine_name, due_at in entries:
+                self._push(customer_id, medicine_name, due_at)
+            self._cond.notify()
+
+    def pop_due(self, now_ts: float) -> list:
+        """Remove and return live items due at or before now_ts."""
+        due = []
+        with self._cond:
+            while self._heap and self._heap[0].due <= now_ts:
+                item = heapq.heappop(self._heap)
+                if self._live.get(item.key) is item:
+                    del self._live[item.key]
+                    due.append(item)
+        return due
+
+    def next_due(self):
+        with self._cond:
+            while self._heap and self._live.get(self._heap[0].key) is not self._heap[0]:
+                heapq.heappop(self._heap)
+            return self._heap[0].due if self._heap else None
+
+    def rebuild(self):
+        """Load every pending threshold from the next_check_at index."""
+        db = ReadSessionLocal()
+        try:
+            rows = (
+                db.query(
+                    RefillProjection.customer_id,
+                    RefillProjection.medicine_name,
+                    RefillProjection.next_check_at,
+                )
+                .filter(RefillProjection.next_check_at.isnot(None))
+                .all()
+            )
+        finally:
+            db.close()
+
+        with self._cond:
+            self._live = {}
+            self._heap = [
+                DueItem(_to_ts(due_at), next(self._seq), customer_id, medicine_name)
+                for customer_id, medicine_name, due_at in rows
+            ]
+            heapq.heapify(self._heap)
+            for item in self._heap:
+                self._live[item.key] = item
+            self._cond.notify()
+
+        logger.info("Refill due queue rebuilt with %d projections", len(rows))
+
+    # -------------------------
+    # Order hook
+    # -------------------------
+
+    def notify_order(self, customer_id: int):
+        """
+        Called after an order commits. Only records the customer; the
+        projection work happens on the worker thread.
+        """
+        if not self.running:
+            return
+        with self._cond:
+            self._pending_customers.add(customer_id)
+            self._cond.notify()
+
+    # -------------------------
+    # Worker
+    # -------------------------
+
+    def _wait_for_work(self):
+        with self._cond:
+            while not self._stop.is_set() and not self._pending_customers:
+                next_due = self._heap[0].due if self._heap else None
+                if next_due is not None and next_due <= time.time():
+                    break
+                timeout = None if next_due is None else next_due - time.time()
+                self._cond.wait(timeout)
+
+            pending = self._pending_customers
+            self._pending_customers = set()
+            return pending
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            pending = self._wait_for_work()
+
+            if pending:
+                try:
+                    self.schedule_many(refill_engine.refresh_customers(pending))
+                except Exception:
+                    logger.exception("Refreshing projections for %d customers failed", len(pending))
+
+            due = self.pop_due(time.time())
+            if not due:
+                continue
+
+            try:
+                self.schedule_many(
+                    refill_engine.evaluate_projections([item.key for item in due])
+                )
+            except Exception:
+                logger.exception("Evaluating %d due projections failed", len(due))
+                retry_at = time.time() + RETRY_SECONDS
+                with self._cond:
+                    for item in due:
+                        if item.key not in self._live:
+                            item.due = retry_at
+                            self._live[item.key] = item
+                            heapq.heappush(self._heap, item)
+
+    def start(self) -> threading.Thread:
+        self._stop.clear()
+        self.rebuild()
+        self._thread = threading.Thread(
+            target=self.run_forever,
+            name="refill-due-queue",
+            daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+# Process-wide instance, started by the API when ENABLE_REFILL_DUE_QUEUE is set
+due_queue = RefillDueQueue()
@@ -0,0 +1,337 @@
+"""
+Sharded refill engine
+
+Purpose:
+- Full refill recomputation spread across a process pool
+- Customers are partitioned by hash (customer_id % shards) or by id range
+- Each shard opens its own DB connection and only reads (from the
+  replica when DATABASE_REPLICA_URL is set), up to one order id
+  snapshotted before any shard starts, so every shard sees the same
+  orders and the watermark never skips one
+- The coordinator plans on a read session and takes a write session
+  only to merge the upserts, committing batch by batch; projections
+  (and alerts) the live path moved past the snapshot are left alone
+
+Use for full rescans over large customer bases. Regular scheduler ticks
+should keep using the incremental run_refill_engine().
+"""
+
+import argparse
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from sqlalchemy import and_, create_engine, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.db import database
+from app.db.models import OrderHistory, RefillAlert, RefillProjection
+from app.db.upsert import upsert
+from app.autonomy.consumption_model import forecast, load_purchase_events, to_datetimes
+from app.autonomy.refill_engine import (
+    REFILL_ALERT_WINDOW_DAYS,
+    WATERMARK_NAME,
+    _load_watermark,
+    next_check_from,
+    urgency_from_days,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows per upsert statement (and per commit) on the coordinator
+MERGE_BATCH_SIZE = 5000
+
+
+# -------------------------
+# Shard planning
+# -------------------------
+
+def plan_shards(db, shard_count: int, partition: str = "hash") -> list:
+    """
+    Returns shard specs: ("hash", shard_count, k) or ("range", lo, hi).
+    Range shards split [min, max] customer id evenly and can use the
+    customer_id index; hash shards balance better on skewed ids.
+    """
+    if partition == "hash":
+        return [("hash", shard_count, k) for k in range(shard_count)]
+
+    if partition != "range":
+        raise ValueError(f"Unknown partition mode: {partition}")
+
+    lo, hi = db.query(
+        func.min(OrderHistory.customer_id),
+        func.max(OrderHistory.customer_id)
+    ).one()
+
+    if lo is None:
+        return []
+
+    step = max((hi - lo + 1) // shard_count, 1)
+    specs = []
+    start = lo
+    while start <= hi:
+        end = start + step if len(specs) < shard_count - 1 else hi + 1
+        specs.append(("range", start, end))
+        start = end
+    return specs
+
+
+def _shard_filter(spec):
+    kind, a, b = spec
+    if kind == "hash":
+        return OrderHistory.customer_id.op("%")(a) == b
+    return OrderHistory.customer_id.between(a, b - 1)
+
+
+# -------------------------
+# Worker (runs in a child process)
+# -------------------------
+
+def _compute_shard(database_url: str, spec, now: datetime, max_order_id: int) -> dict:
+    """
+    Computes projections and alert candidates for one shard from orders
+    with id <= max_order_id.
+    Opens a private, unpooled engine: connections must never be
+    shared across process boundaries.
+    """
+    started = time.perf_counter()
+
+    engine = create_engine(
+        database_url,
+        poolclass=NullPool,
+        connect_args={"check_same_thread": False}
+        if database_url.startswith("sqlite")
+        else {}
+    )
+    db = sessionmaker(bind=engine)()
+
+    try:
+        fc = forecast(load_purchase_events(
+            db, criterion=and_(_shard_filter(spec), OrderHistory.id <= max_order_id)
+        ))
+        days_remaining = fc.days_remaining(now)
+        last_purchase = to_datetimes(fc.last_day)
+        runout = to_datetimes(fc.runout_day)
+
+        projections = []
+        alerts = []
+
+        for i in range(len(fc)):
+            customer_id = int(fc.customer_id[i])
+            med_name = fc.medicine_name(i)
+            runout_at = runout[i]
+            remaining = int(days_remaining[i])
+
+            urgency = None
+            if remaining <= REFILL_ALERT_WINDOW_DAYS:
+                urgency = urgency_from_days(remaining)
+                alerts.append((customer_id, med_name, urgency, remaining))
+
+            projections.append((
+                customer_id, med_name, int(fc.last_order_id[i]),
+                last_purchase[i], int(fc.last_quantity[i]),
+                float(fc.daily_rate[i]), runout_at,
+                next_check_from(runout_at, now), urgency
+            ))
+
+        return {
+            "spec": spec,
+            "rows": len(fc),
+            "projections": projections,
+            "alerts": alerts,
+            "elapsed": time.perf_counter() - started,
+        }
+
+    finally:
+        db.close()
+        engine.dispose()
+
+
+# -------------------------
+# Coordinator
+# -------------------------
+
+def _moved_on(db, rows: list) -> set:
+    """Keys of `rows` whose stored projection is past the shard's last order."""
+    ours = {(r["customer_id"], r["medicine_name"]): r["last_order_id"] for r in rows}
+    stored = db.query(
+        RefillProjection.customer_id,
+        RefillProjection.medicine_name,
+        RefillProjection.last_order_id
+    ).filter(RefillProjection.customer_id.in_({key[0] for key in ours}))
+
+    return {
+        (customer_id, med_name)
+        for customer_id, med_name, last_order_id in stored
+        if (customer_id, med_name) in ours and last_order_id > ours[(customer_id, med_name)]
+    }
+
+
+def _merge(db, results: list) -> int:
+    """
+    Upsert projections and their alerts, one commit per batch.
+
+    The incremental sweep and the due queue keep running while shards
+    compute: a projection they have moved past the snapshot (a newer
+    last_order_id) is left alone, and so is its alert. Both are
+    upserted in one transaction, and the projection upsert locks every
+    row it conflicts with, so the live path can't slip in between.
+    """
+    projection_rows = [
+        {
+            "customer_id": p[0],
+            "medicine_name": p[1],
+            "last_order_id": p[2],
+            "last_purchase_at": p[3],
+            "quantity": p[4],
+            "daily_rate": p[5],
+            "runout_at": p[6],
+            "next_check_at": p[7],
+            "alert_urgency": p[8],
+        }
+        for result in results
+        for p in result["projections"]
+    ]
+
+    alert_rows = {
+        (a[0], a[1]): {
+            "customer_id": a[0],
+            "medicine_name": a[1],
+            "urgency": a[2],
+            "days_remaining": a[3],
+        }
+        for result in results
+        for a in result["alerts"]
+    }
+
+    merged = 0
+    for start in range(0, len(projection_rows), MERGE_BATCH_SIZE):
+        batch = projection_rows[start:start + MERGE_BATCH_SIZE]
+        upsert(
+            db,
+            RefillProjection,
+            batch,
+            index_elements=["customer_id", "medicine_name"],
+            update_columns=[
+                "last_order_id", "last_purchase_at", "quantity", "daily_rate",
+                "runout_at", "next_check_at", "alert_urgency",
+            ],
+            version_column="last_order_id"
+        )
+
+        moved_on = _moved_on(db, batch)
+        alerts = [
+            alert_rows[key]
+            for key in ((r["customer_id"], r["medicine_name"]) for r in batch)
+            if key in alert_rows and key not in moved_on
+        ]
+        upsert(
+            db,
+            RefillAlert,
+            alerts,
+            index_elements=["customer_id", "medicine_name"],
+            update_columns=["urgency", "days_remaining"]
+        )
+        db.commit()
+        merged += len(alerts)
+
+    return merged
+
+
+def run_refill_engine_sharded(
+    shards: int = 4,
+    workers: int = None,
+    partition: str = "hash"
+) -> dict:
+    """
+    Full refill recomputation across a process pool.
+
+    Returns a summary:
+    - alerts: alert rows upserted
+    - rows: projections computed
+    - shards: per-shard rows and timings
+    - compute_elapsed: wall time until every shard finished
+    - elapsed: total wall time in seconds, including the merge
+    """
+    started = time.perf_counter()
+    now = datetime.utcnow()
+
+    # Plan on the read side: the write session (under the SQLite
+    # production profile, the only writer connection) is held just for
+    # the merge, not for the whole parallel compute
+    db = database.ReadSessionLocal()
+    try:
+        specs = plan_shards(db, shards, partition)
+        # Orders placed while shards run are past the snapshot; the
+        # incremental engine picks them up from the watermark
+        max_order_id = db.query(func.max(OrderHistory.id)).scalar() or 0
+    finally:
+        db.close()
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or shards) as pool:
+        futures = [
+            pool.submit(_compute_shard, database.READ_DATABASE_URL, spec, now, max_order_id)
+            for spec in specs
+        ]
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results.append(result)
+
+            logger.info(
+                "Refill shard %s done (%d/%d): rows=%d alerts=%d elapsed=%.3fs",
+                result["spec"], done, len(specs), result["rows"],
+                len(result["alerts"]), result["elapsed"]
+            )
+
+    compute_elapsed = time.perf_counter() - started
+
+    db = database.SessionLocal()
+    try:
+        alerts = _merge(db, results)
+
+        # Only once every batch is in: a failed merge is redone in full
+        watermark = _load_watermark(db, WATERMARK_NAME)
+        if max_order_id > (watermark.last_id or 0):
+            watermark.last_id = max_order_id
+        db.commit()
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+    return {
+        "alerts": alerts,
+        "rows": sum(r["rows"] for r in results),
+        "shards": [
+            {"spec": r["spec"], "rows": r["rows"], "elapsed": r["elapsed"]}
+            for r in results
+        ],
+        "compute_elapsed": compute_elapsed,
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sharded full refill recomputation")
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--partition", choices=["hash", "range"], default="hash")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+
+    summary = run_refill_engine_sharded(args.shards, args.workers, args.partition)
+    logger.info(
+        "Sharded refill scan complete: rows=%d alerts=%d elapsed=%.2fs",
+        summary["rows"], summary["alerts"], summary["elapsed"]
+    )
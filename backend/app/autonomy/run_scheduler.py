@@ -1,8 +1,14 @@
-from app.autonomy.refill_engine import run_refill_engine
+import logging
+
 from app.autonomy.scheduler import start_scheduler
 
+logger = logging.getLogger("app.autonomy.run_scheduler")
+
 if __name__ == "__main__":
-    print("🔁 Running autonomous refill scheduler...")
-    run_refill_engine()
-    print("✅ Refill scan complete")
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    logger.info("Running autonomous refill scheduler")
     start_scheduler()
+    logger.info("Refill scheduler exited")
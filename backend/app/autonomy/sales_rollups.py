@@ -0,0 +1,139 @@
+"""
+Sales rollup maintenance
+
+Purpose:
+- Orders increment the hour and day rollups as they are written
+  (analytics_service.record_sales); this module holds the batch side
+- rebuild: recompute whole days of rollups from orders / order_items,
+  for backfills (orders written outside create_order, e.g. seeds) and
+  repairing drift
+- compact: drop hourly buckets past HOURLY_RETENTION_DAYS; daily
+  buckets cover them from then on
+
+Rebuild closed days only: an order committed mid-rebuild for a day
+being rebuilt may be counted twice or not at all.
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func
+
+from app.db.database import SessionLocal
+from app.db.models import Medicine, Order, OrderItem, SalesRollup
+from app.db.upsert import upsert_increment
+from app.services.analytics_service import (
+    HOURLY_RETENTION_DAYS,  # noqa: F401 (re-exported)
+    bucket_start,
+    hourly_cutoff,
+    rollup_rows,
+    to_naive_utc,
+)
+
+BATCH_SIZE = 5000
+
+
+def rebuild_sales_rollups(start: datetime, end: datetime) -> int:
+    """
+    Recompute rollups for the whole days covering [start, end).
+    Returns the number of rollup rows written.
+    """
+    start = bucket_start(start, "day")
+    end_day = bucket_start(end, "day")
+    end = end_day if end_day == to_naive_utc(end) else end_day + timedelta(days=1)
+
+    db = SessionLocal()
+    try:
+        db.query(SalesRollup).filter(
+            SalesRollup.bucket >= start,
+            SalesRollup.bucket < end
+        ).delete(synchronize_session=False)
+
+        # A customer's first order is the "new" segment, as in create_order
+        firsts = (
+            db.query(
+                Order.customer_id.label("customer_id"),
+                func.min(Order.id).label("first_id")
+            )
+            .group_by(Order.customer_id)
+            .subquery()
+        )
+
+        sales = (
+            db.query(
+                Order.created_at,
+                Medicine.name,
+                case((Order.id == firsts.c.first_id, "new"), else_="returning"),
+                OrderItem.quantity
+            )
+            .join(OrderItem, OrderItem.order_id == Order.id)
+            .join(Medicine, Medicine.id == OrderItem.medicine_id)
+            .join(firsts, firsts.c.customer_id == Order.customer_id)
+            .filter(
+                Order.created_at >= start,
+                Order.created_at < end
+            )
+            .yield_per(BATCH_SIZE)
+        )
+
+        rows = rollup_rows(sales)
+        for offset in range(0, len(rows), BATCH_SIZE):
+            upsert_increment(
+                db,
+                SalesRollup,
+                rows[offset:offset + BATCH_SIZE],
+                index_elements=["granularity", "bucket", "medicine_name", "segment"],
+                increment_columns=["units", "purchases"]
+            )
+
+        db.commit()
+        return len(rows)
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+def compact_sales_rollups(now: datetime = None) -> int:
+    """Delete hourly buckets older than the retention window."""
+    cutoff = hourly_cutoff(now)
+
+    db = SessionLocal()
+    try:
+        deleted = (
+            db.query(SalesRollup)
+            .filter(
+                SalesRollup.granularity == "hour",
+                SalesRollup.bucket < cutoff
+            )
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sales rollup maintenance")
+    parser.add_argument("--rebuild-days", type=int, default=0,
+                        help="rebuild this many closed days before today")
+    parser.add_argument("--compact", action="store_true",
+                        help="drop hourly buckets past retention")
+    args = parser.parse_args()
+
+    if args.rebuild_days:
+        today = bucket_start(datetime.utcnow(), "day")
+        rows = rebuild_sales_rollups(today - timedelta(days=args.rebuild_days), today)
+        print(f"✅ Rebuilt {args.rebuild_days} days of sales rollups ({rows} rows)")
+
+    if args.compact:
+        print(f"✅ Compacted {compact_sales_rollups()} hourly rollup rows")
@@ -1,17 +1,296 @@
+import logging
+import math
+import os
+import random
+import signal
+import socket
+import threading
 import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
 from app.autonomy.refill_engine import run_refill_engine
+from app.db.database import SessionLocal
+from app.db.models import SchedulerLease, SchedulerRun
 
-from app.config import REFILL_INTERVAL_SECONDS
+from app.config import (
+    REFILL_INTERVAL_SECONDS,
+    REFILL_JITTER_SECONDS,
+    SCHEDULER_LEASE_SECONDS,
+)
 
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "refill_engine"
+
+
+def _node_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+# -------------------------
+# Lease
+# -------------------------
+
+def acquire_lease(name: str, holder: str, ttl_seconds: int) -> bool:
+    """
+    Acquire or renew the lease for `name`.
+
+    A single conditional UPDATE decides ownership, so two nodes racing
+    for an expired lease can't both win. The first-ever acquisition is
+    an INSERT guarded by the primary key.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=ttl_seconds)
+
+        result = db.execute(
+            update(SchedulerLease)
+            .where(
+                SchedulerLease.name == name,
+                or_(
+                    SchedulerLease.holder == holder,
+                    SchedulerLease.expires_at < now
+                )
+            )
+            .values(holder=holder, expires_at=expires_at, acquired_at=now)
+        )
+
+        if result.rowcount == 0:
+            if db.get(SchedulerLease, name) is not None:
+                db.rollback()
+                return False
+            db.add(SchedulerLease(
+                name=name,
+                holder=holder,
+                expires_at=expires_at,
+                acquired_at=now
+            ))
+
+        db.commit()
+        return True
+
+    except IntegrityError:
+        db.rollback()
+        return False
+
+    finally:
+        db.close()
+
+
+def release_lease(name: str, holder: str):
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+            .values(expires_at=datetime.utcnow())
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+class _LeaseHeartbeat:
+    """
+    Renews a held lease in the background while a sweep runs, so a
+    sweep outliving the lease TTL isn't joined by another node. Sets
+    `lost` if another node took the lease anyway (e.g. renewals failed
+    until it expired).
+    """
+
+    def __init__(self, name: str, holder: str, ttl_seconds: float, every: float):
+        self.name = name
+        self.holder = holder
+        self.ttl_seconds = ttl_seconds
+        self.every = every
+        self.lost = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"{name}-lease", daemon=True)
+
+    def _run(self):
+        while not self._done.wait(self.every):
+            try:
+                renewed = acquire_lease(self.name, self.holder, self.ttl_seconds)
+            except Exception:
+                logger.exception("Failed to renew lease for %s", self.name)
+                continue
+
+            if not renewed:
+                logger.error("Lease for %s lost by %s during the sweep", self.name, self.holder)
+                self.lost.set()
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+
+
+def _record_run(job: str, node: str, started_at: datetime, duration_ms: int,
+                status: str, rows=None, error=None):
+    db = SessionLocal()
+    try:
+        db.add(SchedulerRun(
+            job=job,
+            node=node,
+            status=status,
+            started_at=started_at,
+            duration_ms=duration_ms,
+            rows=rows,
+            error=error
+        ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to record scheduler run")
+    finally:
+        db.close()
 
-def start_scheduler():
-    print("🔁 Autonomous refill scheduler started")
 
-    while True:
+# -------------------------
+# Scheduler
+# -------------------------
+
+class RefillScheduler:
+    """
+    Fixed-rate refill scheduler.
+
+    - Ticks are anchored to the start time, so slow sweeps don't drift
+      the schedule; ticks missed during a long sweep are skipped
+    - Random jitter per tick spreads replicas apart
+    - A non-blocking run lock prevents overlapping sweeps in-process
+    - A DB lease ensures only one node sweeps across replicas; it is
+      renewed every lease_seconds / 3 while a sweep runs
+    - Each sweep records duration and row count in scheduler_runs
+    - stop() finishes the current sweep and releases the lease
+    """
+
+    def __init__(
+        self,
+        job=run_refill_engine,
+        job_name: str = JOB_NAME,
+        interval: float = REFILL_INTERVAL_SECONDS,
+        jitter: float = REFILL_JITTER_SECONDS,
+        lease_seconds: int = SCHEDULER_LEASE_SECONDS,
+        node_id: str = None,
+        renew_every: float = None,
+    ):
+        self.job = job
+        self.job_name = job_name
+        self.interval = interval
+        self.jitter = jitter
+        self.lease_seconds = lease_seconds
+        self.renew_every = renew_every or lease_seconds / 3
+        self.node_id = node_id or _node_id()
+
+        self._stop = threading.Event()
+        self._run_lock = threading.Lock()
+        self._thread = None
+
+        self.last_run = None
+
+    def tick(self):
+        """
+        Run one sweep if this node holds the lease and no sweep is in flight.
+        Returns the job's row count, or None when skipped.
+        """
+        if not self._run_lock.acquire(blocking=False):
+            logger.warning("Refill sweep still running on %s; skipping tick", self.node_id)
+            return None
+
         try:
-            run_refill_engine()
-            print("✅ Refill scan completed")
-        except Exception as e:
-            print(f"❌ Scheduler error: {e}")
+            if not acquire_lease(self.job_name, self.node_id, self.lease_seconds):
+                logger.debug("Lease for %s held by another node", self.job_name)
+                return None
+
+            started_at = datetime.utcnow()
+            started = time.perf_counter()
+
+            heartbeat = _LeaseHeartbeat(self.job_name, self.node_id,
+                                        self.lease_seconds, self.renew_every)
+            try:
+                with heartbeat:
+                    rows = self.job()
+                if heartbeat.lost.is_set():
+                    raise RuntimeError("Lease lost during the sweep")
+            except Exception as e:
+                duration_ms = int((time.perf_counter() - started) * 1000)
+                logger.exception("Refill sweep failed after %dms", duration_ms)
+                _record_run(self.job_name, self.node_id, started_at,
+                            duration_ms, "error", error=str(e))
+                self.last_run = {"status": "error", "duration_ms": duration_ms}
+                return None
+
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            _record_run(self.job_name, self.node_id, started_at,
+                        duration_ms, "ok", rows=rows)
+            self.last_run = {"status": "ok", "duration_ms": duration_ms, "rows": rows}
+
+            logger.info("Refill sweep completed in %dms (rows=%s)", duration_ms, rows)
+            return rows
+
+        finally:
+            self._run_lock.release()
+
+    def run_forever(self):
+        logger.info(
+            "Refill scheduler started on %s (interval=%ss, jitter=%ss)",
+            self.node_id, self.interval, self.jitter
+        )
+
+        anchor = time.monotonic()
+        ticks = 0
+
+        while not self._stop.is_set():
+            self.tick()
+
+            # Next tick on the fixed grid, skipping any we overran
+            elapsed = time.monotonic() - anchor
+            ticks = max(ticks + 1, math.ceil(elapsed / self.interval))
+            delay = anchor + ticks * self.interval - time.monotonic()
+            delay += random.uniform(0, self.jitter)
+
+            self._stop.wait(max(delay, 0))
+
+        release_lease(self.job_name, self.node_id)
+        logger.info("Refill scheduler stopped on %s", self.node_id)
+
+    def start(self) -> threading.Thread:
+        """Run in a background thread (e.g. inside the API process)."""
+        self._thread = threading.Thread(
+            target=self.run_forever,
+            name="refill-scheduler",
+            daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def start_scheduler():
+    """
+    Standalone entrypoint. Blocks until SIGINT/SIGTERM, then lets the
+    current sweep finish before exiting.
+    """
+    scheduler = RefillScheduler()
+
+    def _shutdown(signum, frame):
+        logger.info("Received signal %s; shutting down scheduler", signum)
+        scheduler.stop()
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
 
-        time.sleep(REFILL_INTERVAL_SECONDS)
+    scheduler.run_forever()
@@ -0,0 +1,117 @@
+"""
+Decision trace retention (day-partitioned storage)
+
+Purpose:
+- expire: drop whole day partitions older than TRACE_RETENTION_DAYS
+  (a file unlink / DROP TABLE, however many traces the day holds) and
+  the run summaries of those days
+- downsample: once a day is older than TRACE_DOWNSAMPLE_DAYS, delete
+  its traces except blocked and failed runs (and the completed runs'
+  summaries). Each day is downsampled once; the newest day done is
+  kept in sweep_watermarks
+
+Needs TRACE_PARTITIONING (app.observability.trace_store). Run daily,
+e.g. from cron: python -m app.autonomy.trace_retention
+"""
+
+import argparse
+from datetime import date, datetime, time, timedelta
+
+from app.config import TRACE_DOWNSAMPLE_DAYS, TRACE_RETENTION_DAYS
+from app.db.database import SessionLocal
+from app.db.models import RunSummary, SweepWatermark
+from app.observability.trace_store import trace_partitions
+
+WATERMARK_NAME = "trace_downsample"
+
+
+def _start_of(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def expire_trace_partitions(partitions=None, now: datetime = None,
+                            retention_days: int = TRACE_RETENTION_DAYS) -> list:
+    """Drop partitions older than the retention window. Returns the days dropped."""
+    partitions = partitions or trace_partitions
+    cutoff = (now or datetime.utcnow()).date() - timedelta(days=retention_days)
+
+    expired = [day for day in partitions.days() if day < cutoff]
+    for day in expired:
+        partitions.drop(day)
+
+    db = SessionLocal()
+    try:
+        db.query(RunSummary).filter(
+            RunSummary.created_at < _start_of(cutoff)
+        ).delete(synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    return expired
+
+
+def downsample_trace_partitions(partitions=None, now: datetime = None,
+                                after_days: int = TRACE_DOWNSAMPLE_DAYS) -> int:
+    """
+    Keep only blocked and failed runs in days past `after_days` that
+    haven't been downsampled yet. Returns the number of traces deleted.
+    """
+    partitions = partitions or trace_partitions
+    cutoff = (now or datetime.utcnow()).date() - timedelta(days=after_days)
+
+    db = SessionLocal()
+    try:
+        watermark = db.get(SweepWatermark, WATERMARK_NAME)
+        if watermark is None:
+            watermark = SweepWatermark(name=WATERMARK_NAME, last_id=0)
+            db.add(watermark)
+        done = watermark.last_created_at.date() if watermark.last_created_at else None
+
+        deleted = 0
+        for day in sorted(partitions.days()):
+            if day >= cutoff:
+                break
+            if done is not None and day <= done:
+                continue
+
+            deleted += partitions.downsample(day)
+            db.query(RunSummary).filter(
+                RunSummary.created_at >= _start_of(day),
+                RunSummary.created_at < _start_of(day + timedelta(days=1)),
+                RunSummary.status == "completed"
+            ).delete(synchronize_session=False)
+
+            # Per day, so a failure part way resumes after the last day done
+            watermark.last_created_at = _start_of(day)
+            db.commit()
+
+        db.commit()
+        return deleted
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Decision trace retention")
+    parser.add_argument("--retention-days", type=int, default=TRACE_RETENTION_DAYS)
+    parser.add_argument("--downsample-days", type=int, default=TRACE_DOWNSAMPLE_DAYS)
+    args = parser.parse_args()
+
+    if trace_partitions is None:
+        print("❌ Trace partitioning is off (set TRACE_PARTITIONING=true)")
+        raise SystemExit(1)
+
+    expired = expire_trace_partitions(retention_days=args.retention_days)
+    print(f"✅ Dropped {len(expired)} expired trace partitions")
+
+    deleted = downsample_trace_partitions(after_days=args.downsample_days)
+    print(f"✅ Downsampled traces older than {args.downsample_days} days ({deleted} deleted)")
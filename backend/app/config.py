@@ -26,6 +26,32 @@ REFILL_INTERVAL_SECONDS = int(
     os.getenv("REFILL_INTERVAL_SECONDS", 3600)
 )
 
+# Random delay added to each tick so replicas don't hit the DB in lockstep
+REFILL_JITTER_SECONDS = float(
+    os.getenv("REFILL_JITTER_SECONDS", 30)
+)
+
+# DB lease held by the sweeping node; another node takes over once it expires
+SCHEDULER_LEASE_SECONDS = int(
+    os.getenv("SCHEDULER_LEASE_SECONDS", int(REFILL_INTERVAL_SECONDS * 1.5))
+)
+
+# Fire refill alerts from an in-process due-time queue between sweeps
+ENABLE_REFILL_DUE_QUEUE = os.getenv(
+    "ENABLE_REFILL_DUE_QUEUE", "false"
+).lower() == "true"
+
+# Run the scheduler inside the API process (FastAPI startup/shutdown)
+EMBED_REFILL_SCHEDULER = os.getenv(
+    "EMBED_REFILL_SCHEDULER", "false"
+).lower() == "true"
+
+# How long the API trusts its cached data version before re-reading it;
+# bounds staleness for changes committed by other processes
+DATA_VERSION_TTL_SECONDS = float(
+    os.getenv("DATA_VERSION_TTL_SECONDS", 2)
+)
+
 # -------------------------------------------------------------------
 # Observability
 # -------------------------------------------------------------------
@@ -34,5 +60,81 @@ ENABLE_DECISION_TRACE = os.getenv(
     "ENABLE_DECISION_TRACE", "true"
 ).lower() == "true"
 
+# Decision trace detail: off, decisions or full (app.observability.tracing)
+TRACE_LEVEL = os.getenv(
+    "TRACE_LEVEL", "full" if ENABLE_DECISION_TRACE else "off"
+).lower()
+
+# Fraction of runs traced in full and persisted; blocked and failed
+# runs are always kept
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 1.0))
+
+# Write-behind decision trace sink (app.observability.trace_sink)
+TRACE_SINK_QUEUE_SIZE = int(os.getenv("TRACE_SINK_QUEUE_SIZE", 10000))  # runs
+TRACE_SINK_BATCH_SIZE = int(os.getenv("TRACE_SINK_BATCH_SIZE", 500))    # rows
+TRACE_SINK_FLUSH_INTERVAL = float(os.getenv("TRACE_SINK_FLUSH_INTERVAL", 0.2))
+TRACE_SINK_RETRIES = int(os.getenv("TRACE_SINK_RETRIES", 3))
+
+# When the queue is full: "block" (wait up to the timeout, then drop) or "drop"
+TRACE_SINK_OVERFLOW = os.getenv("TRACE_SINK_OVERFLOW", "block").lower()
+TRACE_SINK_BLOCK_TIMEOUT = float(os.getenv("TRACE_SINK_BLOCK_TIMEOUT", 1.0))
+
+# Trace search ranks the newest this-many matches; broad terms that
+# match most traces stay fast, narrower ones are ranked in full
+TRACE_SEARCH_CANDIDATES = int(os.getenv("TRACE_SEARCH_CANDIDATES", 5000))
+
+# Day-partitioned trace storage (app.observability.trace_store); off
+# keeps every trace in the decision_traces table
+TRACE_PARTITIONING = os.getenv(
+    "TRACE_PARTITIONING", "false"
+).lower() == "true"
+
+# SQLite: one database file per day in this directory
+TRACE_PARTITION_DIR = os.getenv("TRACE_PARTITION_DIR", "trace_partitions")
+
+# Partitions older than this are dropped whole
+TRACE_RETENTION_DAYS = int(os.getenv("TRACE_RETENTION_DAYS", 90))
+
+# Past this age only blocked and failed runs keep their traces
+TRACE_DOWNSAMPLE_DAYS = int(os.getenv("TRACE_DOWNSAMPLE_DAYS", 14))
+
+# Segmented audit log (app.audit.segment_log); one record per workflow run
+ENABLE_AUDIT_LOG = os.getenv(
+    "ENABLE_AUDIT_LOG", "true"
+).lower() == "true"
+
+AUDIT_LOG_DIR = os.getenv("AUDIT_LOG_DIR", "logs")
+
+AUDIT_SEGMENT_MAX_BYTES = int(
+    os.getenv("AUDIT_SEGMENT_MAX_BYTES", 64 * 1024 * 1024)
+)
+
+AUDIT_SEGMENT_MAX_SECONDS = float(
+    os.getenv("AUDIT_SEGMENT_MAX_SECONDS", 3600)
+)
+
+# Compression for sealed segments: gzip, zstd (needs zstandard) or none
+AUDIT_LOG_COMPRESSION = os.getenv("AUDIT_LOG_COMPRESSION", "gzip").lower()
+
+# Signs audit log checkpoints. Only development and test fall back to a
+# built-in key (it is in the source, so anyone could forge checkpoints
+# with it); elsewhere the audit log and its verifier refuse to run unset
+AUDIT_HMAC_KEY = os.getenv(
+    "AUDIT_HMAC_KEY", "dev-audit-key" if ENV in ("development", "test") else ""
+).encode()
+
+# -------------------------------------------------------------------
+# Analytics export
+# -------------------------------------------------------------------
+
+# Parquet export for offline analysis (app.autonomy.parquet_export)
+PARQUET_EXPORT_DIR = os.getenv("PARQUET_EXPORT_DIR", "exports")
+
+# Rows per Parquet row group; also bounds rows buffered per date
+PARQUET_ROW_GROUP_SIZE = int(os.getenv("PARQUET_ROW_GROUP_SIZE", 50000))
+
+# zstd, snappy, gzip or none
+PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "zstd").lower()
+
 
 # --------------------
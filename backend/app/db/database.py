@@ -1,6 +1,10 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 
 from app.db.base import Base
 
@@ -10,12 +14,227 @@ DATABASE_URL = os.getenv(
     "sqlite:///./pharmacy.db"
 )
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}
-    if DATABASE_URL.startswith("sqlite")
-    else {}
-)
+# Optional read replica (e.g. a Postgres streaming replica). When unset,
+# reads use the primary (or the SQLite reader pool, see below).
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+# URL that read-only batch work (refill scans) should connect to
+READ_DATABASE_URL = DATABASE_REPLICA_URL or DATABASE_URL
+
+# SQLite deployment profile:
+# - default: one engine, stock pysqlite settings
+# - production: WAL + tuned pragmas, a single serialized writer
+#   connection (write lock taken at a transaction's first write) and a
+#   pool of read-only reader connections
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default")
+
+SQLITE_READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", 8))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
+SQLITE_PRODUCTION_PRAGMAS = {
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",          # durable at checkpoints; safe with WAL
+    "cache_size": -64000,             # 64 MB page cache per connection
+    "mmap_size": 268435456,           # 256 MB memory-mapped reads
+    "temp_store": "MEMORY",
+}
+
+
+# Statements that never write; anything else opens a write transaction
+_READ_PREFIXES = ("SELECT", "WITH", "PRAGMA", "EXPLAIN")
+
+
+def _apply_pragmas(engine, pragmas: dict, query_only: bool = False):
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # Let SQLAlchemy emit BEGIN itself (see _on_begin)
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}").fetchall()
+        if query_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    if query_only:
+        @event.listens_for(engine, "begin")
+        def _on_begin(conn):
+            # Readers use a plain deferred snapshot
+            conn.exec_driver_sql("BEGIN")
+        return
+
+    # Writer: BEGIN is held back until the transaction's first statement.
+    # Starting with a write, it is BEGIN IMMEDIATE (the lock is taken up
+    # front, waiting up to busy_timeout). Starting with a read, it is a
+    # deferred BEGIN: read-only transactions never take the write lock,
+    # and one that writes later upgrades then. The upgrade fails fast
+    # only if another process committed after this transaction's first
+    # read; in-process writers share the one writer connection
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        conn.info["begin_pending"] = True
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _on_execute(conn, cursor, statement, parameters, context, executemany):
+        if conn.info.pop("begin_pending", False):
+            reads = statement.lstrip().upper().startswith(_READ_PREFIXES)
+            cursor.execute("BEGIN" if reads else "BEGIN IMMEDIATE")
+
+    @event.listens_for(engine, "commit")
+    @event.listens_for(engine, "rollback")
+    def _on_end(conn):
+        conn.info.pop("begin_pending", None)
+
+
+def _stock_engine(database_url: str):
+    return create_engine(
+        database_url,
+        connect_args={"check_same_thread": False}
+        if database_url.startswith("sqlite")
+        else {}
+    )
+
+
+def build_engines(database_url: str, sqlite_profile: str = "default",
+                  replica_url: str = None):
+    """
+    Returns (write_engine, read_engine).
+    - replica_url set: reads go to a separate engine on the replica
+    - SQLite production profile: reads use a query_only reader pool
+    - otherwise both are the same engine
+    """
+    is_sqlite = database_url.startswith("sqlite")
+
+    if not is_sqlite or sqlite_profile != "production":
+        engine = _stock_engine(database_url)
+        if replica_url:
+            return engine, _stock_engine(replica_url)
+        return engine, engine
+
+    write_engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False},
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=30,
+    )
+    _apply_pragmas(write_engine, SQLITE_PRODUCTION_PRAGMAS)
+
+    # Switch to WAL before any reader connects; the mode change needs
+    # an exclusive lock and is persisted in the database file
+    with write_engine.connect():
+        pass
+
+    if replica_url:
+        return write_engine, _stock_engine(replica_url)
+
+    read_engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False},
+        pool_size=SQLITE_READ_POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=30,
+    )
+    # journal_mode is persistent and set by the writer; readers only tune
+    reader_pragmas = {
+        k: v for k, v in SQLITE_PRODUCTION_PRAGMAS.items() if k != "journal_mode"
+    }
+    _apply_pragmas(read_engine, reader_pragmas, query_only=True)
+
+    return write_engine, read_engine
+
+
+# -------------------------
+# Read-your-writes across sessions
+# -------------------------
+
+# {"wrote": bool} for the current request, or None outside one
+_request_writes = ContextVar("request_writes", default=None)
+
+
+@contextmanager
+def primary_after_writes():
+    """
+    Scope for one request (e.g. a workflow run): once any session in it
+    has written, RoutingSession reads go to the primary for the rest of
+    the scope, so a later read in a new session (the refill agent after
+    the action agent's commit) can't hit a replica that lags behind.
+    Only sessions with a lagging replica (a separate server) switch; the
+    SQLite reader pool sees a commit at once, and pinning it would queue
+    reads behind writers on the single writer connection.
+    The flag is a shared dict, so it also reaches threads that run with
+    a copy of the context.
+    """
+    token = _request_writes.set({"wrote": False})
+    try:
+        yield
+    finally:
+        _request_writes.reset(token)
+
+
+def _note_write():
+    scope = _request_writes.get()
+    if scope is not None:
+        scope["wrote"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _write_on_flush(session, flush_context):
+    _note_write()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _write_on_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _note_write()
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from the replica and writes to the primary.
+
+    Read-your-writes: once the session flushes or executes an
+    INSERT/UPDATE/DELETE (or SELECT ... FOR UPDATE), every later
+    statement in it goes to the primary, since the replica may not
+    have caught up yet. The switch is sticky for the session's lifetime.
+    Inside primary_after_writes(), a write by any session pins it too
+    when the replica can lag (replica_lags).
+    """
+
+    def __init__(self, *args, primary=None, replica=None, replica_lags=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.primary = primary
+        self.replica = replica
+        self.replica_lags = replica_lags
+        self.pinned_to_primary = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if not self.pinned_to_primary and (
+            self._flushing
+            or isinstance(clause, UpdateBase)
+            or getattr(clause, "_for_update_arg", None) is not None
+            or (self.replica_lags and (_request_writes.get() or {}).get("wrote"))
+        ):
+            self.pinned_to_primary = True
+
+        return self.primary if self.pinned_to_primary else self.replica
+
+
+def routing_sessionmaker(primary, replica):
+    return sessionmaker(
+        class_=RoutingSession,
+        autocommit=False,
+        autoflush=False,
+        primary=primary,
+        replica=replica,
+        # Another server (DATABASE_REPLICA_URL) may lag; the same
+        # database through a reader pool doesn't
+        replica_lags=replica is not primary and replica.url != primary.url
+    )
+
+
+engine, read_engine = build_engines(DATABASE_URL, SQLITE_PROFILE, DATABASE_REPLICA_URL)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -23,13 +242,24 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Read-mostly work (admin listings, agent lookups, refill scans) goes
+# here; it only reaches the primary after the session writes
+ReadSessionLocal = routing_sessionmaker(engine, read_engine)
+
+# Registers the data-version bump hooks on every Session
+from app.db import versioning  # noqa: E402,F401
+
 
 def init_db():
     """
-    Initialize database tables.
+    Initialize database tables, then apply pending schema migrations
+    (columns and indexes on tables that already exist).
     IMPORTANT:
     - models import MUST be inside this function
     - prevents circular imports
     """
     from app.db import models  # noqa: F401
+    from app.db.migrations import run_migrations
+
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
@@ -0,0 +1,144 @@
+"""
+Keyset (cursor) pagination
+
+Purpose:
+- Each page seeks past the last row of the previous one via the sort
+  index, so page 10,000 costs the same as page 1
+- Optional column projection: only the requested columns are read
+- Cursors are opaque strings (base64 JSON of the last row's sort keys)
+
+Shared by the admin list API (app.api.pagination) and the trace
+partition store (app.observability.trace_store). Bad cursors and
+unknown fields raise ValueError; the API turns them into 400s.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import String, or_, tuple_, type_coerce
+
+
+# -------------------------
+# Cursor encoding
+# -------------------------
+
+def encode_cursor(values: tuple) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_keys) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if len(payload) != len(sort_keys):
+            raise ValueError("cursor does not match sort keys")
+
+        values = []
+        for column, value in zip(sort_keys, payload):
+            if value is not None and column.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            values.append(value)
+        return tuple(values)
+
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+# -------------------------
+# Field projection
+# -------------------------
+
+def table_of(model):
+    """A model's Table; Tables (e.g. trace partitions) pass through."""
+    return getattr(model, "__table__", model)
+
+
+def parse_fields(model, fields: Optional[str]) -> list:
+    """Column names to return; all columns when fields is empty."""
+    allowed = [c.key for c in table_of(model).columns]
+    if not fields:
+        return allowed
+
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+
+# -------------------------
+# Keyset page
+# -------------------------
+
+def seek(db, sort_keys: tuple, after: tuple, descending: bool):
+    """WHERE clause for rows after the cursor position `after`."""
+    position = tuple_(*sort_keys)
+    clause = position < after if descending else position > after
+
+    value = after[0]
+    if (
+        len(sort_keys) != 2
+        or not isinstance(value, datetime)
+        or value.microsecond
+        or db.get_bind().dialect.name != "sqlite"
+    ):
+        return clause
+
+    # SQLite keeps datetimes as text and compares them as strings: rows
+    # from server_default=func.now() read 'YYYY-MM-DD HH:MM:SS', bound
+    # values 'YYYY-MM-DD HH:MM:SS.000000'. A whole-second cursor must
+    # match both spellings, or every row of its second sorts before it
+    # and is read again on each page
+    short = value.strftime("%Y-%m-%d %H:%M:%S")
+    stored, tie_breaker = type_coerce(sort_keys[0], String), sort_keys[1]
+    if descending:
+        tie = stored.in_([short, short + ".000000"]) & (tie_breaker < after[1])
+        return or_(stored < short, tie)
+    tie = stored.in_([short, short + ".000000"]) & (tie_breaker > after[1])
+    return or_(stored > short + ".000000", tie)
+
+
+def keyset_page(
+    db,
+    model,
+    sort_keys: tuple,
+    cursor: Optional[str],
+    limit: int,
+    fields: Optional[str] = None,
+    descending: bool = True,
+    criteria=(),
+):
+    """
+    One page of `model` rows ordered by sort_keys (unique together,
+    e.g. (created_at, id)), starting after `cursor`.
+
+    Returns (rows, next_cursor): rows are dicts holding only the
+    requested fields; next_cursor is None on the last page.
+    """
+    names = parse_fields(model, fields)
+    key_names = [c.key for c in sort_keys]
+    selected = names + [k for k in key_names if k not in names]
+
+    columns = table_of(model).c
+    query = db.query(*[columns[name] for name in selected])
+    for criterion in criteria:
+        query = query.filter(criterion)
+
+    if cursor:
+        query = query.filter(seek(db, sort_keys, decode_cursor(cursor, sort_keys), descending))
+
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in sort_keys])
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor(tuple(last[k] for k in key_names))
+
+    # Requested names lead each row; trailing sort keys drop out of zip
+    return [dict(zip(names, row)) for row in rows], next_cursor
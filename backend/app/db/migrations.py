@@ -0,0 +1,245 @@
+"""
+Versioned schema migrations
+
+Purpose:
+- create_all only creates missing tables; it never adds columns or
+  indexes to tables that already exist
+- Each migration here runs once per database, in version order, and is
+  recorded in schema_migrations
+- Run on startup from init_db(), after create_all
+
+Steps are idempotent (IF NOT EXISTS / column checks), so a fresh
+database, where create_all already built the current schema, just
+records them. Append new migrations; never edit applied ones.
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from app.db.models import SchemaMigration
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------
+# Helpers
+# -------------------------
+
+def _add_column(conn, table: str, column: str, ddl_type: str):
+    columns = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column not in columns:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+
+
+def _create_index(conn, name: str, table: str, columns: list):
+    conn.execute(text(
+        f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+    ))
+
+
+# -------------------------
+# Migrations
+# -------------------------
+
+def _refill_projection_daily_rate(conn):
+    _add_column(conn, "refill_projections", "daily_rate", "FLOAT")
+
+
+def _hot_path_indexes(conn):
+    _create_index(conn, "ix_order_history_customer_created",
+                  "order_history", ["customer_id", "created_at"])
+    _create_index(conn, "ix_decision_traces_created_at",
+                  "decision_traces", ["created_at"])
+    _create_index(conn, "ix_prescriptions_customer_medicine_valid",
+                  "prescriptions", ["customer_id", "medicine_id", "valid_until"])
+    _create_index(conn, "ix_medicines_stock_quantity",
+                  "medicines", ["stock_quantity"])
+
+
+def _order_history_keyset_index(conn):
+    _create_index(conn, "ix_order_history_created_id",
+                  "order_history", ["created_at", "id"])
+
+
+def _medicine_thresholds_and_inventory_alerts(conn):
+    _add_column(conn, "medicines", "reorder_point", "INTEGER NOT NULL DEFAULT 20")
+    _add_column(conn, "medicines", "critical_point", "INTEGER NOT NULL DEFAULT 5")
+    _add_column(conn, "medicines", "reorder_quantity", "INTEGER NOT NULL DEFAULT 100")
+    _create_index(conn, "ix_medicines_stock_headroom",
+                  "medicines", ["(stock_quantity - reorder_point)"])
+
+    # Backfill the snapshot; inventory_service keeps it current afterwards
+    conn.execute(text("DELETE FROM inventory_alerts"))
+    conn.execute(text("""
+        INSERT INTO inventory_alerts (
+            medicine_id, name, current_stock, status,
+            reorder_point, reorder_quantity, prescription_required, updated_at
+        )
+        SELECT
+            id, name, stock_quantity,
+            CASE WHEN stock_quantity <= critical_point THEN 'CRITICAL' ELSE 'LOW' END,
+            reorder_point, reorder_quantity, prescription_required, CURRENT_TIMESTAMP
+        FROM medicines
+        WHERE stock_quantity - reorder_point <= 0
+    """))
+
+
+def _order_join_indexes(conn):
+    _create_index(conn, "ix_orders_customer_created",
+                  "orders", ["customer_id", "created_at"])
+    _create_index(conn, "ix_order_items_order_id",
+                  "order_items", ["order_id"])
+
+
+# Search ranking weights: reasoning (the agents' human-readable
+# explanations) ranks above output, output above input
+POSTGRES_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(reasoning, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(output, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(input, '')), 'C')"
+)
+SQLITE_SEARCH_RANK = "bm25(1.0, 4.0, 2.0)"  # input, reasoning, output
+
+
+def create_trace_search_index(conn):
+    """
+    Full-text index over decision_traces input / reasoning / output,
+    kept in sync with every insert, update and delete. Also run on each
+    SQLite trace partition file (app.observability.trace_store).
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"""
+            ALTER TABLE decision_traces ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS ({POSTGRES_SEARCH_VECTOR}) STORED
+        """))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_decision_traces_search "
+            "ON decision_traces USING GIN (search_vector)"
+        ))
+        return
+
+    # External-content FTS5 table: the text lives in decision_traces only
+    exists = conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE name = 'decision_traces_fts'"
+    )).first()
+    conn.execute(text("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS decision_traces_fts USING fts5(
+            input, reasoning, output,
+            content='decision_traces', content_rowid='id'
+        )
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS decision_traces_fts_insert
+        AFTER INSERT ON decision_traces BEGIN
+            INSERT INTO decision_traces_fts (rowid, input, reasoning, output)
+            VALUES (new.id, new.input, new.reasoning, new.output);
+        END
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS decision_traces_fts_delete
+        AFTER DELETE ON decision_traces BEGIN
+            INSERT INTO decision_traces_fts (decision_traces_fts, rowid, input, reasoning, output)
+            VALUES ('delete', old.id, old.input, old.reasoning, old.output);
+        END
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS decision_traces_fts_update
+        AFTER UPDATE OF input, reasoning, output ON decision_traces BEGIN
+            INSERT INTO decision_traces_fts (decision_traces_fts, rowid, input, reasoning, output)
+            VALUES ('delete', old.id, old.input, old.reasoning, old.output);
+            INSERT INTO decision_traces_fts (rowid, input, reasoning, output)
+            VALUES (new.id, new.input, new.reasoning, new.output);
+        END
+    """))
+    if not exists:
+        conn.execute(text(
+            "INSERT INTO decision_traces_fts (decision_traces_fts, rank) "
+            f"VALUES ('rank', '{SQLITE_SEARCH_RANK}')"
+        ))
+        # Index the traces written before this migration
+        conn.execute(text(
+            "INSERT INTO decision_traces_fts (decision_traces_fts) VALUES ('rebuild')"
+        ))
+
+
+def _run_lookup(conn):
+    _add_column(conn, "decision_traces", "duration_ms", "FLOAT")
+    _create_index(conn, "ix_decision_traces_request_created",
+                  "decision_traces", ["request_id", "created_at"])
+
+
+def _bigint_trace_ids(conn):
+    # Day partitions number their ids from day.toordinal() * 10**9, past
+    # int4. SQLite's INTEGER is already 64-bit
+    if conn.dialect.name != "postgresql":
+        return
+    conn.execute(text("ALTER TABLE decision_traces ALTER COLUMN id TYPE BIGINT"))
+    conn.execute(text("ALTER SEQUENCE IF EXISTS decision_traces_id_seq AS BIGINT"))
+    conn.execute(text("ALTER TABLE sweep_watermarks ALTER COLUMN last_id TYPE BIGINT"))
+
+    # Partitions created LIKE the int4 table could never take a row
+    partitions = conn.execute(text(
+        "SELECT table_name FROM information_schema.tables "
+        "WHERE table_name ~ '^decision_traces_[0-9]{8}$'"
+    )).scalars().all()
+    for name in partitions:
+        conn.execute(text(f"ALTER TABLE {name} ALTER COLUMN id TYPE BIGINT"))
+        conn.execute(text(f"ALTER SEQUENCE IF EXISTS {name}_id_seq AS BIGINT"))
+
+
+MIGRATIONS = [
+    (1, "refill_projections.daily_rate", _refill_projection_daily_rate),
+    (2, "hot-path composite indexes", _hot_path_indexes),
+    (3, "order_history keyset pagination index", _order_history_keyset_index),
+    (4, "medicine stock thresholds and inventory_alerts", _medicine_thresholds_and_inventory_alerts),
+    (5, "orders(customer_id, created_at) and order_items(order_id)", _order_join_indexes),
+    (6, "decision_traces full-text search index", create_trace_search_index),
+    (7, "decision_traces step timing and (request_id, created_at) index", _run_lookup),
+    (8, "bigint decision_traces ids and sweep watermarks", _bigint_trace_ids),
+]
+
+
+# -------------------------
+# Runner
+# -------------------------
+
+def applied_versions(engine) -> set:
+    with engine.connect() as conn:
+        return set(conn.execute(SchemaMigration.__table__.select()
+                                .with_only_columns(SchemaMigration.version)).scalars())
+
+
+def run_migrations(engine) -> list:
+    """
+    Apply pending migrations, each in its own transaction together with
+    its schema_migrations row. Returns the versions applied.
+    """
+    SchemaMigration.__table__.create(bind=engine, checkfirst=True)
+
+    done = applied_versions(engine)
+    applied = []
+
+    for version, name, step in MIGRATIONS:
+        if version in done:
+            continue
+
+        try:
+            with engine.begin() as conn:
+                step(conn)
+                conn.execute(SchemaMigration.__table__.insert().values(
+                    version=version,
+                    name=name,
+                    applied_at=datetime.utcnow()
+                ))
+        except IntegrityError:
+            # Another process recorded it first; its DDL was idempotent too
+            logger.info("Migration %s already applied by another process", version)
+            continue
+
+        applied.append(version)
+        logger.info("Applied migration %s: %s", version, name)
+
+    return applied
@@ -1,11 +1,15 @@
 from sqlalchemy import (
+    BigInteger,
     Column,
     Integer,
     String,
     Boolean,
     DateTime,
     Text,
-    ForeignKey
+    Float,
+    ForeignKey,
+    Index,
+    UniqueConstraint
 )
 from sqlalchemy.sql import func
 
@@ -37,6 +41,10 @@ class Customer(Base):
 # -------------------------
 class Medicine(Base):
     __tablename__ = "medicines"
+    __table_args__ = (
+        # Low-stock listings filter and sort on stock
+        Index("ix_medicines_stock_quantity", "stock_quantity"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False)
@@ -44,17 +52,36 @@ class Medicine(Base):
     stock_quantity = Column(Integer, default=0)
     prescription_required = Column(Boolean, default=False)
 
+    # Per-medicine stock thresholds (inventory alerts)
+    reorder_point = Column(Integer, nullable=False, default=20, server_default="20")
+    critical_point = Column(Integer, nullable=False, default=5, server_default="5")
+    reorder_quantity = Column(Integer, nullable=False, default=100, server_default="100")
+
     created_at = Column(
         DateTime(timezone=True),
         server_default=func.now()
     )
 
 
+# Medicines at or below their own reorder point: headroom <= 0
+Index(
+    "ix_medicines_stock_headroom",
+    Medicine.stock_quantity - Medicine.reorder_point
+)
+
+
 # -------------------------
 # PRESCRIPTION
 # -------------------------
 class Prescription(Base):
     __tablename__ = "prescriptions"
+    __table_args__ = (
+        # Safety check: valid prescription for (customer, medicine)
+        Index(
+            "ix_prescriptions_customer_medicine_valid",
+            "customer_id", "medicine_id", "valid_until"
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -83,6 +110,12 @@ class Prescription(Base):
 # -------------------------
 class OrderHistory(Base):
     __tablename__ = "order_history"
+    __table_args__ = (
+        # Memory agent: latest purchases per customer
+        Index("ix_order_history_customer_created", "customer_id", "created_at"),
+        # Admin listing: keyset pagination on (created_at, id)
+        Index("ix_order_history_created_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -106,8 +139,16 @@ class OrderHistory(Base):
 # -------------------------
 class DecisionTrace(Base):
     __tablename__ = "decision_traces"
+    __table_args__ = (
+        Index("ix_decision_traces_created_at", "created_at"),
+        # A run's steps in order (ids break created_at ties)
+        Index("ix_decision_traces_request_created", "request_id", "created_at"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    # bigint: day partitions number their ids from day.toordinal() * 10**9
+    # (app.observability.trace_store); INTEGER is already 64-bit (and the
+    # rowid) on SQLite
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, index=True)
 
     request_id = Column(String, index=True)
     agent_name = Column(String)
@@ -117,16 +158,46 @@ class DecisionTrace(Base):
     decision = Column(String)
     output = Column(Text)
 
+    duration_ms = Column(Float, nullable=True)  # time spent in the step
+
     created_at = Column(
         DateTime(timezone=True),
         server_default=func.now()
     )
 
+
+# -------------------------
+# RUN SUMMARY
+# -------------------------
+class RunSummary(Base):
+    """
+    One row per persisted workflow run, written with its decision
+    traces, so run listings don't group the trace table.
+    """
+    __tablename__ = "run_summaries"
+    __table_args__ = (
+        Index("ix_run_summaries_created_request", "created_at", "request_id"),
+    )
+
+    request_id = Column(String, primary_key=True)
+    customer_id = Column(Integer, nullable=True, index=True)
+
+    status = Column(String, nullable=False)  # completed, blocked, failed
+    steps = Column(Integer, nullable=False)
+    duration_ms = Column(Float, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+
 # -------------------------
 # ORDER
 # -------------------------
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Customer refill alerts: a customer's orders by recency
+        Index("ix_orders_customer_created", "customer_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -153,7 +224,8 @@ class OrderItem(Base):
     order_id = Column(
         Integer,
         ForeignKey("orders.id"),
-        nullable=False
+        nullable=False,
+        index=True
     )
 
     medicine_id = Column(
@@ -164,3 +236,205 @@ class OrderItem(Base):
 
     quantity = Column(Integer, nullable=False)
     dosage = Column(String, nullable=True)
+
+
+# -------------------------
+# REFILL ALERT
+# -------------------------
+class RefillAlert(Base):
+    __tablename__ = "refill_alerts"
+    __table_args__ = (
+        UniqueConstraint(
+            "customer_id",
+            "medicine_name",
+            name="uq_refill_alerts_customer_medicine"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    customer_id = Column(
+        Integer,
+        ForeignKey("customers.id"),
+        nullable=False,
+        index=True
+    )
+
+    medicine_name = Column(String, nullable=False)
+    urgency = Column(String, nullable=False)
+    days_remaining = Column(Integer, nullable=False)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+
+
+# -------------------------
+# REFILL PROJECTION
+# -------------------------
+class RefillProjection(Base):
+    """
+    Latest known supply position per (customer, medicine).
+
+    Maintained incrementally by the refill engine so a sweep only
+    touches customers with new orders plus projections whose
+    run-out date is crossing an alert threshold.
+    """
+    __tablename__ = "refill_projections"
+
+    customer_id = Column(
+        Integer,
+        ForeignKey("customers.id"),
+        primary_key=True
+    )
+    medicine_name = Column(String, primary_key=True)
+
+    last_order_id = Column(Integer, nullable=False)
+    last_purchase_at = Column(DateTime, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    daily_rate = Column(Float, nullable=True)
+
+    runout_at = Column(DateTime, nullable=False, index=True)
+    next_check_at = Column(DateTime, nullable=True, index=True)
+    alert_urgency = Column(String, nullable=True)
+
+
+# -------------------------
+# SWEEP WATERMARK
+# -------------------------
+class SweepWatermark(Base):
+    """
+    Persisted high-water mark for incremental background jobs.
+    One row per job name.
+    """
+    __tablename__ = "sweep_watermarks"
+
+    name = Column(String, primary_key=True)
+
+    last_id = Column(BigInteger, nullable=False, default=0)  # trace ids are bigint
+    last_created_at = Column(DateTime, nullable=True)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
+
+# -------------------------
+# SCHEDULER LEASE
+# -------------------------
+class SchedulerLease(Base):
+    """
+    Leader lease for background jobs. Only the current holder sweeps;
+    any node may take over once expires_at has passed.
+    """
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    acquired_at = Column(DateTime, nullable=False)
+
+
+# -------------------------
+# SCHEDULER RUN
+# -------------------------
+class SchedulerRun(Base):
+    __tablename__ = "scheduler_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    job = Column(String, nullable=False)
+    node = Column(String, nullable=False)
+    status = Column(String, nullable=False)  # ok, error
+
+    started_at = Column(DateTime, nullable=False, index=True)
+    duration_ms = Column(Integer, nullable=False)
+    rows = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+
+
+# -------------------------
+# INVENTORY ALERT
+# -------------------------
+class InventoryAlert(Base):
+    """
+    Snapshot of medicines at or below their reorder point, one row per
+    medicine. Kept current by inventory_service whenever stock changes,
+    so listing alerts reads only alerting rows.
+    """
+    __tablename__ = "inventory_alerts"
+
+    medicine_id = Column(
+        Integer,
+        ForeignKey("medicines.id"),
+        primary_key=True
+    )
+
+    name = Column(String, nullable=False)
+    current_stock = Column(Integer, nullable=False, index=True)
+    status = Column(String, nullable=False)  # LOW, CRITICAL
+    reorder_point = Column(Integer, nullable=False)
+    reorder_quantity = Column(Integer, nullable=False)
+    prescription_required = Column(Boolean, nullable=True)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
+
+# -------------------------
+# SALES ROLLUP
+# -------------------------
+class SalesRollup(Base):
+    """
+    Units sold per (hour or day bucket, medicine, customer segment).
+    Incremented on order write; rebuilt and compacted by
+    app.autonomy.sales_rollups.
+    """
+    __tablename__ = "sales_rollups"
+    # The primary key (granularity, bucket, ...) serves range queries
+
+    granularity = Column(String, primary_key=True)  # hour, day
+    bucket = Column(DateTime, primary_key=True)      # bucket start, UTC
+    medicine_name = Column(String, primary_key=True)
+    segment = Column(String, primary_key=True)       # new, returning
+
+    units = Column(Integer, nullable=False, default=0)
+    purchases = Column(Integer, nullable=False, default=0)
+
+
+# -------------------------
+# DATA VERSION
+# -------------------------
+class DataVersion(Base):
+    """
+    Change counter per versioned table, bumped in the same transaction
+    as the change (see app.db.versioning). Feeds HTTP ETags.
+    """
+    __tablename__ = "data_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
+
+# -------------------------
+# SCHEMA MIGRATION
+# -------------------------
+class SchemaMigration(Base):
+    """Versions applied by app.db.migrations."""
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    applied_at = Column(DateTime, nullable=False)
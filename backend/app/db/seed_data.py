@@ -6,6 +6,7 @@ from app.db.models import (
     Customer, Medicine, Prescription, OrderHistory, 
     DecisionTrace, Order, OrderItem
 )
+from app.services.inventory_service import rebuild_inventory_alerts
 
 
 def seed():
@@ -78,6 +79,8 @@ def seed():
         
         db.add_all(medicines)
         db.commit()
+        rebuild_inventory_alerts(db)
+        db.commit()
 
         # ---------- PRESCRIPTIONS ----------
         for customer in customers:
@@ -0,0 +1,58 @@
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def _insert_for(db):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"upsert not supported for dialect: {dialect}")
+
+
+def upsert(db, model, rows: list, index_elements: list, update_columns: list,
+           version_column: str = None):
+    """
+    Bulk INSERT ... ON CONFLICT DO UPDATE for SQLite and Postgres.
+
+    rows: list of dicts keyed by column name
+    index_elements: columns of the unique constraint to conflict on
+    update_columns: columns overwritten when the row already exists
+    version_column: if given, an existing row is only overwritten when
+        the new row's value in it is >= the stored one (never roll a
+        row back to older state)
+    """
+    if not rows:
+        return
+
+    table = model.__table__
+    stmt = _insert_for(db)(table)
+    where = None
+    if version_column is not None:
+        where = getattr(stmt.excluded, version_column) >= table.c[version_column]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={col: getattr(stmt.excluded, col) for col in update_columns},
+        where=where
+    )
+    db.execute(stmt, rows)
+
+
+def upsert_increment(db, model, rows: list, index_elements: list, increment_columns: list):
+    """
+    Like upsert(), but existing rows are incremented by the new values
+    (counter += excluded.counter) instead of overwritten.
+    """
+    if not rows:
+        return
+
+    table = model.__table__
+    stmt = _insert_for(db)(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={
+            col: table.c[col] + getattr(stmt.excluded, col)
+            for col in increment_columns
+        }
+    )
+    db.execute(stmt, rows)
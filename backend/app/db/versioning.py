@@ -0,0 +1,86 @@
+"""
+Data versions
+
+Purpose:
+- One counter per versioned table in data_versions
+- Any ORM flush that inserts, updates or deletes a row of a versioned
+  table bumps its counter inside the same transaction, so every path
+  that changes stock (action agent, inventory service, seeds) is covered
+- Bump listeners run after commit (the API uses this to drop its
+  cached version immediately)
+
+Core bulk UPDATEs bypass the ORM and must call bump_version() themselves.
+"""
+
+from itertools import chain
+
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db.models import DataVersion
+
+# Table name -> version name
+VERSIONED_TABLES = {
+    "medicines": "medicines",
+}
+
+_bump_listeners = []
+
+
+def add_bump_listener(fn):
+    """fn(name) is called after a commit that bumped `name`."""
+    _bump_listeners.append(fn)
+
+
+def read_version(db, name: str) -> int:
+    version = db.execute(
+        select(DataVersion.version).where(DataVersion.name == name)
+    ).scalar()
+    return version or 0
+
+
+def bump_version(db, name: str):
+    table = DataVersion.__table__
+    dialect = db.get_bind(clause=table.insert()).dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+    stmt = insert(table).values(name=name, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"version": table.c.version + 1, "updated_at": func.now()}
+    )
+    db.execute(stmt)
+    db.info.setdefault("bumped_versions", set()).add(name)
+
+
+# -------------------------
+# Session hooks
+# -------------------------
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_flush(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    names = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        name = VERSIONED_TABLES.get(getattr(obj, "__tablename__", None))
+        if name is None or name in names:
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        names.add(name)
+
+    for name in names:
+        bump_version(session, name)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_bumps(session):
+    for name in session.info.pop("bumped_versions", ()):
+        for fn in _bump_listeners:
+            fn(name)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_bumps(session, previous_transaction):
+    session.info.pop("bumped_versions", None)
@@ -1,12 +1,17 @@
+import time
 import uuid
-import json
+from datetime import datetime
 from typing import Dict, Any
 
 from langgraph.graph import StateGraph, END
 
+from app.config import ENABLE_AUDIT_LOG
+from app.db.database import primary_after_writes
 from app.graph.state import PharmacyState
-from app.db.database import SessionLocal
-from app.db.models import DecisionTrace
+from app.audit.decision_logger import write_decision_log
+from app.observability.trace_record import TraceRecord
+from app.observability.trace_sink import trace_sink
+from app.observability.tracing import should_persist, start_trace, step_duration_ms
 
 from app.agents.memory_agent import memory_agent
 from app.agents.conversation_agent import conversation_agent
@@ -19,14 +24,35 @@ from app.agents.predictive_refill_agent import predictive_refill_agent
 # Utilities
 # -------------------------
 
-def _safe_json(value):
+def _run_status(state: dict, failed: bool = False) -> str:
+    if failed:
+        return "failed"
+    if state.get("safety", {}).get("decision") == "blocked":
+        return "blocked"
+    return "completed"
+
+
+def _persist_traces(request_id: str, state: dict, status: str, started: float):
     """
-    Ensures SQLite-safe serialization.
-    Prevents 'Error binding parameter - unsupported type'
+    Hand the run's TraceRecords and its RunSummary row to the trace
+    sink. Nothing is encoded here: the sink's worker (or the audit log
+    writer, whichever comes first) serializes each record once.
     """
-    if value is None:
-        return None
-    return json.dumps(value, default=str)
+    traces = state.get("decision_trace", [])
+    created_at = datetime.utcnow()
+    for trace in traces:
+        trace.request_id = request_id
+        trace.created_at = created_at
+
+    summary = {
+        "request_id": request_id,
+        "customer_id": state.get("customer", {}).get("id"),
+        "status": status,
+        "steps": len(traces),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+        "created_at": created_at,
+    }
+    trace_sink.submit(traces, summary)
 
 
 # -------------------------
@@ -59,9 +85,9 @@ def build_pharmacy_graph():
 
 def run_workflow(customer_id: int, message: str) -> Dict[str, Any]:
     graph = build_pharmacy_graph()
-    db = SessionLocal()
 
     request_id = str(uuid.uuid4())
+    started = time.perf_counter()
 
     # ---- Initial State ----
     state: PharmacyState = {
@@ -71,14 +97,16 @@ def run_workflow(customer_id: int, message: str) -> Dict[str, Any]:
         "safety": {},
         "execution": {},
         "decision_trace": [],
-        "meta": {},
+        "meta": {"trace": start_trace()},
     }
 
     # HARD ASSERT — NON NEGOTIABLE
     assert isinstance(state, dict), f"STATE CORRUPTED AT START: {type(state)}"
 
     try:
-        final_state = graph.invoke(state)
+        # Agents after the order's commit read it back from the primary
+        with primary_after_writes():
+            final_state = graph.invoke(state)
 
         # HARD ASSERT — NON NEGOTIABLE
         assert isinstance(final_state, dict), f"STATE CORRUPTED AT END: {type(final_state)}"
@@ -86,25 +114,25 @@ def run_workflow(customer_id: int, message: str) -> Dict[str, Any]:
         # -------------------------
         # Persist Decision Traces
         # -------------------------
-        traces = final_state.get("decision_trace", [])
-
-        for trace in traces:
-            trace_row = DecisionTrace(
-                request_id=request_id,
-                agent_name=trace.get("agent"),
-                input=_safe_json(trace.get("input")),
-                reasoning=_safe_json(trace.get("reasoning")),
-                decision=_safe_json(trace.get("decision")),
-                output=_safe_json(trace.get("output")),
-            )
-            db.add(trace_row)
+        # Write-behind: queued here, bulk-inserted by the trace sink.
+        # Sampled-out runs are dropped before anything is serialized.
+        if should_persist(final_state):
+            _persist_traces(request_id, final_state, _run_status(final_state), started)
+
+        if ENABLE_AUDIT_LOG:
+            write_decision_log(final_state, run_id=request_id)
 
-        db.commit()
         return final_state
 
     except Exception as e:
-        db.rollback()
-        raise RuntimeError(f"Workflow error: {str(e)}")
+        # Failed runs are always kept
+        if state["meta"]["trace"]["level"] != "off":
+            state["decision_trace"].append(
+                TraceRecord("workflow", "error", output={"error": str(e)},
+                            duration_ms=step_duration_ms(state))
+            )
+            _persist_traces(request_id, state, _run_status(state, failed=True), started)
 
-    finally:
-        db.close()
+        if ENABLE_AUDIT_LOG:
+            write_decision_log(state, run_id=request_id)
+        raise RuntimeError(f"Workflow error: {str(e)}")
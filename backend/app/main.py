@@ -1,7 +1,11 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.config import EMBED_REFILL_SCHEDULER, ENABLE_AUDIT_LOG, ENABLE_REFILL_DUE_QUEUE
 from app.db.database import init_db
+from app.audit.decision_logger import check_audit_key, close_audit_log
+from app.observability.trace_sink import trace_sink
 from app.api.chat import router as chat_router
 from app.api.admin import router as admin_router
 from app.api.customers import router as customers_router
@@ -9,8 +13,14 @@ from app.api.medicines import router as medicines_router
 from app.api.orders import router as orders_router
 from app.api.decision_traces import router as decision_traces_router
 from app.api.refill_alerts import router as refill_alerts_router
+from app.api.exports import router as exports_router
+from app.api.analytics import router as analytics_router
+from app.api.runs import router as runs_router
 
-app = FastAPI(title="Agentic Pharmacy Backend")
+app = FastAPI(
+    title="Agentic Pharmacy Backend",
+    default_response_class=ORJSONResponse
+)
 
 # Enable CORS
 app.add_middleware(
@@ -19,13 +29,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # admin list pagination
 )
 
 
+refill_scheduler = None
+
+
 @app.on_event("startup")
 def on_startup():
+    global refill_scheduler
+    if ENABLE_AUDIT_LOG:
+        check_audit_key()  # fail now, not on the first order
     init_db()
 
+    if EMBED_REFILL_SCHEDULER:
+        from app.autonomy.scheduler import RefillScheduler
+        refill_scheduler = RefillScheduler()
+        refill_scheduler.start()
+
+    if ENABLE_REFILL_DUE_QUEUE:
+        from app.autonomy.refill_queue import due_queue
+        due_queue.start()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    if refill_scheduler is not None:
+        refill_scheduler.stop(timeout=30)
+
+    if ENABLE_REFILL_DUE_QUEUE:
+        from app.autonomy.refill_queue import due_queue
+        due_queue.stop(timeout=10)
+
+    trace_sink.stop(timeout=10)
+    close_audit_log(timeout=10)
+
 
 @app.get("/")
 def root():
@@ -45,3 +84,6 @@ app.include_router(medicines_router)
 app.include_router(orders_router)
 app.include_router(decision_traces_router)
 app.include_router(refill_alerts_router)
+app.include_router(exports_router)
+app.include_router(analytics_router)
+app.include_router(runs_router)
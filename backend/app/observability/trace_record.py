@@ -0,0 +1,105 @@
+"""
+Decision trace record
+
+Purpose:
+- One agent step in decision_trace, as a __slots__ object holding
+  references to the state fragments it describes (no copies, no
+  per-instance __dict__)
+- Read-only Mapping: existing code reading trace["agent"] or
+  trace.get("output") keeps working
+- Serialized lazily and once: the first consumer (the DB trace sink or
+  the audit log writer, both on background threads) encodes each field
+  with orjson; the other reuses the text. The DB rows hold the cached
+  per-column JSON strings, the audit log embeds the whole record as an
+  orjson.Fragment built from them
+
+Records must not be changed after the run returns: encoding happens
+later, off the request thread, from the referenced state.
+"""
+
+from collections.abc import Mapping
+
+import orjson
+
+FIELDS = ("agent", "input", "reasoning", "decision", "output")
+
+# Dict keys may be ints (e.g. keyed by medicine id); other values via str()
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _encode(value) -> str:
+    return orjson.dumps(value, default=str, option=_OPTIONS).decode()
+
+
+class TraceRecord(Mapping):
+    __slots__ = ("agent", "decision", "input", "reasoning", "output",
+                 "duration_ms", "request_id", "created_at", "_encoded")
+
+    def __init__(self, agent: str, decision: str, input=None, reasoning=None, output=None,
+                 duration_ms: float = None):
+        self.agent = agent
+        self.decision = decision
+        self.input = input
+        self.reasoning = reasoning
+        self.output = output
+        self.duration_ms = duration_ms
+
+        # Set by the workflow when the run is persisted
+        self.request_id = None
+        self.created_at = None
+
+        self._encoded = None
+
+    # -------------------------
+    # Mapping (present fields only)
+    # -------------------------
+
+    def __getitem__(self, key):
+        if key not in FIELDS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None and key != "decision":
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        return (f for f in FIELDS if f == "decision" or getattr(self, f) is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"TraceRecord({dict(self)!r})"
+
+    # -------------------------
+    # Serialization
+    # -------------------------
+
+    def encoded(self) -> dict:
+        """Field -> JSON text for present fields, encoded on first use."""
+        encoded = self._encoded
+        if encoded is None:
+            encoded = {field: _encode(self[field]) for field in self}
+            self._encoded = encoded
+        return encoded
+
+    def as_row(self) -> dict:
+        """DecisionTrace column values (JSON text per payload column)."""
+        text = self.encoded()
+        return {
+            "request_id": self.request_id,
+            "agent_name": self.agent,
+            "input": text.get("input"),
+            "reasoning": text.get("reasoning"),
+            "decision": text.get("decision"),
+            "output": text.get("output"),
+            "duration_ms": self.duration_ms,
+            "created_at": self.created_at,
+        }
+
+    def json_fragment(self) -> orjson.Fragment:
+        """The whole record as pre-encoded JSON, for embedding via orjson."""
+        members = [f'"{field}":{value}' for field, value in self.encoded().items()]
+        if self.duration_ms is not None:
+            members.append(f'"duration_ms":{self.duration_ms!r}')
+        return orjson.Fragment("{" + ",".join(members) + "}")
@@ -0,0 +1,270 @@
+"""
+Write-behind decision trace sink
+
+Purpose:
+- Take DecisionTrace inserts off the request path: run_workflow only
+  enqueues a run's trace rows (and its RunSummary row); a background
+  worker bulk-inserts them (into day partitions with TRACE_PARTITIONING)
+- The worker collects runs for up to TRACE_SINK_FLUSH_INTERVAL seconds
+  (or TRACE_SINK_BATCH_SIZE rows) and writes them as one executemany
+  INSERT in one transaction, so traces take the SQLite write lock once
+  per batch instead of once per run
+- Bounded queue with an explicit backpressure policy when it is full:
+  "block" waits up to TRACE_SINK_BLOCK_TIMEOUT for space, then drops;
+  "drop" drops immediately. Drops are counted and logged
+- flush() waits for everything queued so far; stop() drains the queue
+  and is called on API shutdown (and at interpreter exit)
+
+Durability:
+- A run's traces are committed together, after run_workflow returned.
+  Partitioned, each day's rows commit in their partition and the run
+  summaries in the main database afterwards
+- Not durable until flushed: a crash loses what is queued plus the
+  batch being written (at most queue size + one batch)
+- A failed batch is retried TRACE_SINK_RETRIES times with backoff,
+  then dropped and counted in `failed`
+- Clean shutdown (stop / atexit) loses nothing that was accepted
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from app.config import (
+    TRACE_SINK_BATCH_SIZE,
+    TRACE_SINK_BLOCK_TIMEOUT,
+    TRACE_SINK_FLUSH_INTERVAL,
+    TRACE_SINK_OVERFLOW,
+    TRACE_SINK_QUEUE_SIZE,
+    TRACE_SINK_RETRIES,
+)
+from app.db.database import SessionLocal
+from app.db.models import DecisionTrace, RunSummary
+from app.observability.trace_store import trace_partitions
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop")
+
+
+class _Run:
+    __slots__ = ("rows", "summary")
+
+    def __init__(self, rows: list, summary: dict = None):
+        self.rows = rows
+        self.summary = summary
+
+
+class _FlushMarker:
+    __slots__ = ("done",)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class TraceSink:
+
+    def __init__(
+        self,
+        session_factory=None,
+        queue_size: int = TRACE_SINK_QUEUE_SIZE,
+        batch_size: int = TRACE_SINK_BATCH_SIZE,
+        flush_interval: float = TRACE_SINK_FLUSH_INTERVAL,
+        overflow: str = TRACE_SINK_OVERFLOW,
+        block_timeout: float = TRACE_SINK_BLOCK_TIMEOUT,
+        retries: int = TRACE_SINK_RETRIES,
+        partitions=trace_partitions
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.retries = retries
+        self.partitions = partitions  # TracePartitions, or None for decision_traces
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Counters (runs for dropped, rows for written / failed)
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # -------------------------
+    # Request side
+    # -------------------------
+
+    def submit(self, rows: list, summary: dict = None) -> bool:
+        """
+        Queue one run's trace rows: DecisionTrace column dicts, or
+        objects with as_row() (TraceRecord), materialized by the worker.
+        summary: the run's RunSummary column dict, committed with them.
+        Returns False if the run was dropped by the overflow policy.
+        """
+        if not rows and summary is None:
+            return True
+        if not self.running:
+            self.start()
+
+        run = _Run(rows, summary)
+        try:
+            if self.overflow == "block":
+                self._queue.put(run, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(run)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Trace sink queue full; %d trace rows dropped (%d runs so far)",
+                           len(rows), self.dropped)
+            return False
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until everything queued so far is committed."""
+        if not self.running:
+            return self._queue.empty()
+        marker = _FlushMarker()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    # -------------------------
+    # Worker
+    # -------------------------
+
+    def _by_day(self, rows: list) -> dict:
+        days = defaultdict(list)
+        for row in rows:
+            if row.get("created_at") is None:
+                row["created_at"] = datetime.utcnow()
+            days[row["created_at"].date()].append(row)
+        return days
+
+    def _write(self, rows: list, summaries: list):
+        # Partitioned: each day's rows commit to their own partition,
+        # then the summaries; a retry only repeats what hasn't committed
+        pending = self._by_day(rows) if self.partitions is not None else {}
+
+        for attempt in range(self.retries + 1):
+            db = None
+            try:
+                for day in list(pending):
+                    self.partitions.insert(day, pending[day])
+                    self.written += len(pending.pop(day))
+
+                db = (self.session_factory or SessionLocal)()
+                if rows and self.partitions is None:
+                    db.execute(insert(DecisionTrace.__table__), rows)
+                if summaries:
+                    db.execute(insert(RunSummary.__table__), summaries)
+                db.commit()
+                if self.partitions is None:
+                    self.written += len(rows)
+                return
+            except Exception:
+                if db is not None:
+                    db.rollback()
+                if attempt == self.retries:
+                    if self.partitions is None:
+                        self.failed += len(rows)
+                    else:
+                        self.failed += sum(len(day_rows) for day_rows in pending.values())
+                    logger.exception("Dropping %d trace rows after %d attempts", len(rows), attempt + 1)
+                    return
+                time.sleep(min(0.1 * 2 ** attempt, 2.0))
+            finally:
+                if db is not None:
+                    db.close()
+
+    def _rows(self, items: list) -> tuple:
+        rows, summaries = [], []
+        for item in items:
+            if not isinstance(item, _Run):
+                continue
+            for row in item.rows:
+                try:
+                    rows.append(row if isinstance(row, dict) else row.as_row())
+                except Exception:
+                    self.failed += 1
+                    logger.exception("Encoding a trace row failed; dropped")
+            if item.summary is not None:
+                summaries.append(item.summary)
+        return rows, summaries
+
+    def _collect(self) -> list:
+        """Block for the first item, then gather until the interval or batch size."""
+        items = [self._queue.get()]
+        rows = len(items[0].rows) if isinstance(items[0], _Run) else 0
+        deadline = time.monotonic() + self.flush_interval
+
+        while rows < self.batch_size and items[-1] is not _STOP and not isinstance(items[-1], _FlushMarker):
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            items.append(item)
+            if isinstance(item, _Run):
+                rows += len(item.rows)
+        return items
+
+    def run_forever(self):
+        while True:
+            items = self._collect()
+
+            rows, summaries = self._rows(items)
+            if rows or summaries:
+                self._write(rows, summaries)
+
+            for item in items:
+                if isinstance(item, _FlushMarker):
+                    item.done.set()
+
+            if items[-1] is _STOP:
+                return
+
+    def start(self) -> threading.Thread:
+        with self._lock:
+            if self.running:
+                return self._thread
+            self._thread = threading.Thread(
+                target=self.run_forever,
+                name="trace-sink",
+                daemon=True
+            )
+            self._thread.start()
+            return self._thread
+
+    def stop(self, timeout: float = None):
+        """Write everything queued, then stop the worker."""
+        with self._lock:
+            if self._thread is None:
+                return
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning("Trace sink still writing after %ss", timeout)
+                return
+            self._thread = None
+
+
+# Process-wide instance used by run_workflow; started on first submit
+trace_sink = TraceSink()
+atexit.register(trace_sink.stop, 10)
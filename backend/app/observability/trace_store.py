@@ -0,0 +1,376 @@
+"""
+Day-partitioned decision trace storage
+
+Purpose:
+- With TRACE_PARTITIONING on, each UTC day's traces live in their own
+  table, so indexes (and the FTS index) stay one day big and inserts
+  and lookups cost the same in month six as on day one:
+  - SQLite: one database file per day in TRACE_PARTITION_DIR, holding a
+    decision_traces table and its full-text index
+  - Postgres: a decision_traces_YYYYMMDD table in the main database,
+    created LIKE decision_traces (same indexes and search column)
+- Writes are routed by created_at day (the trace sink calls insert)
+- Reads that span days walk partitions newest first, then the
+  unpartitioned decision_traces table (traces written before
+  partitioning was turned on)
+- Expiring a day drops its partition (unlink the file / DROP TABLE)
+  instead of DELETEing rows; downsampling a day deletes from that
+  day's partition only
+
+Trace ids stay unique across partitions: a day's ids start at
+day.toordinal() * ID_SPAN, so an id alone finds its partition. They
+are past int4 (about 7.4e14 today), so decision_traces.id is a bigint
+on Postgres. run_summaries stays in the main database.
+"""
+
+import logging
+import os
+import re
+import threading
+from datetime import date, datetime
+
+import orjson
+from sqlalchemy import MetaData, create_engine, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.config import TRACE_PARTITION_DIR, TRACE_PARTITIONING, TRACE_SEARCH_CANDIDATES
+from app.db.database import ReadSessionLocal, engine as primary_engine, read_engine
+from app.db.keyset import encode_cursor, keyset_page, parse_fields
+from app.db.migrations import create_trace_search_index
+from app.db.models import DecisionTrace
+from app.services.trace_search_service import search_table, search_terms, trace_filters
+
+logger = logging.getLogger(__name__)
+
+# Ids per day partition (a day's ids start at day.toordinal() * ID_SPAN)
+ID_SPAN = 10 ** 9
+
+# Runs whose traces survive downsampling
+KEEP_DECISIONS = ("blocked", "error")
+
+_FILE_NAME = re.compile(r"^traces-(\d{4}-\d{2}-\d{2})\.db$")
+_TABLE_NAME = re.compile(r"^decision_traces_(\d{8})$")
+
+
+def id_range(day: date) -> tuple:
+    """(first, last) trace id a day's partition can hand out."""
+    first = day.toordinal() * ID_SPAN + 1
+    return first, first + ID_SPAN - 2
+
+
+def partition_table(name: str):
+    """A day partition's table: decision_traces' columns under `name`."""
+    table = DecisionTrace.__table__.to_metadata(MetaData(), name=name)
+    table.dialect_options["sqlite"]["autoincrement"] = True
+    return table
+
+
+def run_steps(db, table, request_id: str, fields: list) -> list:
+    """A run's steps in order (one range read on (request_id, created_at))."""
+    columns = [table.c[name] for name in fields]
+    rows = db.execute(
+        select(*columns)
+        .where(table.c.request_id == request_id)
+        .order_by(table.c.created_at, table.c.id)
+    ).all()
+    return [dict(zip(fields, row)) for row in rows]
+
+
+class Partition:
+    """One day's traces (day None: the unpartitioned decision_traces table)."""
+
+    __slots__ = ("day", "table", "engine", "sessions", "path")
+
+    def __init__(self, day, table, engine, sessions, path=None):
+        self.day = day
+        self.table = table
+        self.engine = engine      # writes
+        self.sessions = sessions  # read session factory
+        self.path = path          # SQLite file
+
+
+class TracePartitions:
+
+    def __init__(self, directory: str = TRACE_PARTITION_DIR, engine=None, reader=None):
+        self.directory = directory
+        self.engine = engine or primary_engine
+        self.reader = reader or read_engine
+        self.sqlite = self.engine.dialect.name == "sqlite"
+
+        self._partitions = {}
+        self._lock = threading.Lock()
+
+        self.legacy = Partition(
+            None, DecisionTrace.__table__, self.engine,
+            ReadSessionLocal if engine is None else sessionmaker(bind=self.reader)
+        )
+
+    # -------------------------
+    # Partitions
+    # -------------------------
+
+    def _path(self, day: date) -> str:
+        return os.path.join(self.directory, f"traces-{day.isoformat()}.db")
+
+    def _create_sqlite(self, day: date, partition: Partition):
+        with partition.engine.begin() as conn:
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+            partition.table.create(conn, checkfirst=True)
+            conn.execute(text(
+                "INSERT INTO sqlite_sequence (name, seq) "
+                "SELECT :name, :base WHERE NOT EXISTS "
+                "(SELECT 1 FROM sqlite_sequence WHERE name = :name)"
+            ), {"name": partition.table.name, "base": id_range(day)[0] - 1})
+            create_trace_search_index(conn)
+
+    def _create_postgres(self, day: date, partition: Partition):
+        name = partition.table.name
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} (LIKE decision_traces INCLUDING ALL)"
+            ))
+            # bigint even if decision_traces predates migration 8 (a no-op
+            # otherwise): the day's ids are past int4
+            conn.execute(text(f"ALTER TABLE {name} ALTER COLUMN id TYPE BIGINT"))
+            conn.execute(text(
+                f"CREATE SEQUENCE IF NOT EXISTS {name}_id_seq AS BIGINT "
+                f"START WITH {id_range(day)[0]} OWNED BY {name}.id"
+            ))
+            conn.execute(text(
+                f"ALTER TABLE {name} ALTER COLUMN id SET DEFAULT nextval('{name}_id_seq')"
+            ))
+
+    def _open(self, day: date) -> Partition:
+        if self.sqlite:
+            path = self._path(day)
+            engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+            return Partition(day, partition_table("decision_traces"), engine, sessionmaker(bind=engine), path)
+
+        name = f"decision_traces_{day.strftime('%Y%m%d')}"
+        return Partition(day, partition_table(name), self.engine, sessionmaker(bind=self.reader))
+
+    def _exists(self, day: date) -> bool:
+        if self.sqlite:
+            return os.path.exists(self._path(day))
+        with self.engine.connect() as conn:
+            return conn.execute(
+                text("SELECT to_regclass(:name) IS NOT NULL"),
+                {"name": f"decision_traces_{day.strftime('%Y%m%d')}"}
+            ).scalar()
+
+    def partition(self, day: date, create: bool = False):
+        """The day's partition; None if it doesn't exist and create is False."""
+        with self._lock:
+            partition = self._partitions.get(day)
+            if partition is not None:
+                return partition
+            if not create and not self._exists(day):
+                return None
+
+            partition = self._open(day)
+            if create:
+                if self.sqlite:
+                    os.makedirs(self.directory, exist_ok=True)
+                    self._create_sqlite(day, partition)
+                else:
+                    self._create_postgres(day, partition)
+            self._partitions[day] = partition
+            return partition
+
+    def days(self) -> list:
+        """Existing partition days, newest first."""
+        if self.sqlite:
+            if not os.path.isdir(self.directory):
+                return []
+            matches = (_FILE_NAME.match(name) for name in os.listdir(self.directory))
+            days = [date.fromisoformat(m.group(1)) for m in matches if m]
+        else:
+            with self.engine.connect() as conn:
+                names = conn.execute(text(
+                    "SELECT table_name FROM information_schema.tables "
+                    "WHERE table_name LIKE 'decision\\_traces\\_%'"
+                )).scalars()
+                matches = (_TABLE_NAME.match(name) for name in names)
+                days = [datetime.strptime(m.group(1), "%Y%m%d").date() for m in matches if m]
+        return sorted(days, reverse=True)
+
+    def spanning(self, start: datetime = None, end: datetime = None) -> list:
+        """Partitions that may hold start <= created_at < end, newest first, then legacy."""
+        partitions = []
+        for day in self.days():
+            if start is not None and day < start.date():
+                continue
+            if end is not None and day > end.date():
+                continue
+            partition = self.partition(day)
+            if partition is not None:
+                partitions.append(partition)
+        return partitions + [self.legacy]
+
+    # -------------------------
+    # Writes
+    # -------------------------
+
+    def insert(self, day: date, rows: list):
+        """Insert one day's trace rows (one transaction)."""
+        partition = self.partition(day, create=True)
+        with partition.engine.begin() as conn:
+            conn.execute(insert(partition.table), rows)
+
+    def drop(self, day: date):
+        """Drop a whole day: unlink its file / DROP its table."""
+        with self._lock:
+            partition = self._partitions.pop(day, None) or self._open(day)
+            if self.sqlite:
+                partition.engine.dispose()
+                for suffix in ("", "-wal", "-shm"):
+                    try:
+                        os.remove(partition.path + suffix)
+                    except FileNotFoundError:
+                        pass
+            else:
+                with self.engine.begin() as conn:
+                    conn.execute(text(f"DROP TABLE IF EXISTS {partition.table.name}"))
+
+    def downsample(self, day: date) -> int:
+        """
+        Delete the day's traces except those of blocked or failed runs.
+        A trace without a request_id belongs to no run and is kept only
+        if it is itself blocked or failed.
+        """
+        partition = self.partition(day)
+        if partition is None:
+            return 0
+
+        table = partition.table.name
+        keep = [orjson.dumps(d).decode() for d in KEEP_DECISIONS]
+        with partition.engine.begin() as conn:
+            # NULL request_ids can't go through NOT IN (NULL NOT IN an
+            # empty set is true, otherwise it is NULL): own branch
+            deleted = conn.execute(text(f"""
+                DELETE FROM {table} WHERE (
+                    request_id IS NOT NULL AND request_id NOT IN (
+                        SELECT request_id FROM {table}
+                        WHERE decision IN (:blocked, :error) AND request_id IS NOT NULL
+                    )
+                ) OR (
+                    request_id IS NULL
+                    AND (decision IS NULL OR decision NOT IN (:blocked, :error))
+                )
+            """), {"blocked": keep[0], "error": keep[1]}).rowcount
+
+        if self.sqlite and deleted:
+            # Hand the freed pages back to the filesystem (one day's file)
+            with partition.engine.connect() as conn:
+                conn.exec_driver_sql("VACUUM")
+        return deleted
+
+    # -------------------------
+    # Reads
+    # -------------------------
+
+    def page(self, cursor, limit: int, fields=None) -> tuple:
+        """
+        A keyset page of traces across partitions, newest first (same
+        cursor format as a single-table page). Returns (rows, next_cursor);
+        a bad cursor or unknown field raises ValueError.
+        """
+        names = parse_fields(DecisionTrace, fields)
+        rows = []
+        partitions = self.spanning()
+
+        for i, partition in enumerate(partitions):
+            table = partition.table
+            db = partition.sessions()
+            try:
+                page, next_cursor = keyset_page(
+                    db, table,
+                    sort_keys=(table.c.created_at, table.c.id),
+                    cursor=cursor,
+                    limit=limit - len(rows)
+                )
+            finally:
+                db.close()
+
+            rows.extend(page)
+            if len(rows) == limit:
+                if next_cursor is None and i + 1 < len(partitions):
+                    last = rows[-1]
+                    next_cursor = encode_cursor((last["created_at"], last["id"]))
+                return [{n: row[n] for n in names} for row in rows], next_cursor
+
+        return [{n: row[n] for n in names} for row in rows], None
+
+    def get(self, trace_id: int):
+        """A trace by id, from the partition its id belongs to."""
+        if trace_id >= ID_SPAN:
+            partition = self.partition(date.fromordinal(trace_id // ID_SPAN))
+        else:
+            partition = self.legacy
+        if partition is None:
+            return None
+
+        table = partition.table
+        db = partition.sessions()
+        try:
+            row = db.execute(select(*table.columns).where(table.c.id == trace_id)).first()
+            return dict(row._mapping) if row else None
+        finally:
+            db.close()
+
+    def run_steps(self, request_id: str, fields: list, created_at: datetime = None) -> list:
+        """
+        A run's steps. With the run's created_at (from run_summaries)
+        only its day is read; otherwise partitions are tried newest first.
+        """
+        if created_at is not None:
+            partitions = [self.partition(created_at.date()), self.legacy]
+        else:
+            partitions = self.spanning()
+
+        for partition in partitions:
+            if partition is None:
+                continue
+            db = partition.sessions()
+            try:
+                steps = run_steps(db, partition.table, request_id, fields)
+            finally:
+                db.close()
+            if steps:
+                return steps
+        return []
+
+    def search(self, query: str, agent_name: str = None, decision: str = None,
+               start: datetime = None, end: datetime = None, limit: int = 50,
+               candidates: int = TRACE_SEARCH_CANDIDATES) -> list:
+        """
+        search_traces across partitions: the newest `candidates` matches
+        overall (walking days newest first) are ranked, best `limit` returned.
+        """
+        terms = search_terms(query)
+        if not terms:
+            raise ValueError("Empty search query")
+
+        results = []
+        for partition in self.spanning(start, end):
+            if candidates <= 0:
+                break
+            table = partition.table
+            db = partition.sessions()
+            try:
+                rows, matches = search_table(
+                    db, table, terms,
+                    trace_filters(table, agent_name, decision, start, end),
+                    limit, candidates
+                )
+            finally:
+                db.close()
+            results.extend(rows)
+            candidates -= matches
+
+        results.sort(key=lambda row: row["rank"], reverse=True)
+        return results[:limit]
+
+
+# Process-wide store; None keeps every trace in decision_traces
+trace_partitions = TracePartitions() if TRACE_PARTITIONING else None
@@ -0,0 +1,107 @@
+"""
+Decision trace levels and sampling
+
+Purpose:
+- TRACE_LEVEL decides how much each agent records in decision_trace:
+  - off:       nothing (ENABLE_DECISION_TRACE=false implies this)
+  - decisions: agent name and decision only
+  - full:      plus input, reasoning and output payloads
+- Head sampling: TRACE_SAMPLE_RATE of runs are sampled when they start.
+  Only sampled runs get full payloads, and only sampled runs are
+  persisted
+- Always keep: a step recorded with keep=True (a blocked safety
+  decision), a blocked run or a failed run is persisted whatever the
+  sample. Steps recorded before the outcome was known keep decision
+  detail only
+- Payloads are passed as zero-argument builders and only called when
+  the step is kept at full detail, so sampled-out and decisions-level
+  runs never build or serialize them
+
+- Each step is timed: its duration_ms runs from the previous step (or
+  the start of the run) to when it is recorded
+
+The run's trace settings live in state["meta"]["trace"].
+"""
+
+import random
+import time
+
+from app.config import TRACE_LEVEL, TRACE_SAMPLE_RATE
+from app.observability.trace_record import TraceRecord
+
+LEVELS = ("off", "decisions", "full")
+
+
+def start_trace(level: str = TRACE_LEVEL, sample_rate: float = TRACE_SAMPLE_RATE) -> dict:
+    """Trace settings for a new run (stored in state["meta"]["trace"])."""
+    if level not in LEVELS:
+        raise ValueError(f"Unknown trace level: {level}")
+    return {
+        "level": level,
+        "sampled": sample_rate >= 1 or random.random() < sample_rate,
+        "keep": False,
+        "mark": time.perf_counter(),
+    }
+
+
+def _settings(state) -> dict:
+    meta = state.setdefault("meta", {})
+    if "trace" not in meta:
+        meta["trace"] = start_trace()
+    return meta["trace"]
+
+
+def trace_level(state) -> str:
+    return _settings(state)["level"]
+
+
+def full_detail(state, keep: bool = False) -> bool:
+    """Whether a step recorded now would carry payloads."""
+    settings = _settings(state)
+    return settings["level"] == "full" and (settings["sampled"] or keep or settings["keep"])
+
+
+def step_duration_ms(state) -> float:
+    """Milliseconds since the previous step (or run start); restarts the clock."""
+    settings = _settings(state)
+    now = time.perf_counter()
+    elapsed = now - settings.get("mark", now)
+    settings["mark"] = now
+    return round(elapsed * 1000, 3)
+
+
+def record_step(state, agent: str, decision: str, build=None, keep: bool = False):
+    """
+    Append an agent step (a TraceRecord) to state["decision_trace"] at
+    the run's level.
+    build: zero-argument callable returning the payload fields (input,
+    reasoning, output); not called unless the step is kept in full.
+    keep: the run must be persisted regardless of sampling.
+    """
+    settings = _settings(state)
+    if settings["level"] == "off":
+        return
+    if keep:
+        settings["keep"] = True
+
+    duration_ms = step_duration_ms(state)
+    if build is not None and full_detail(state):
+        step = TraceRecord(agent, decision, duration_ms=duration_ms, **build())
+    else:
+        step = TraceRecord(agent, decision, duration_ms=duration_ms)
+    state["decision_trace"].append(step)
+
+
+def should_persist(state) -> bool:
+    """Persist a finished run's trace: sampled, marked keep, or blocked."""
+    settings = _settings(state)
+    if settings["level"] == "off":
+        return False
+    if settings["sampled"] or settings["keep"]:
+        return True
+    return state.get("safety", {}).get("decision") == "blocked"
+
+
+def discard(*_):
+    """Stand-in for an agent's note() when reasoning isn't being kept."""
+
@@ -0,0 +1,127 @@
+# backend/app/services/analytics_service.py
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+from app.db.models import SalesRollup
+from app.db.upsert import upsert_increment
+
+GRANULARITIES = ("hour", "day")
+SEGMENTS = ("new", "returning")
+
+# Hourly resolution is kept this long (app.autonomy.sales_rollups
+# compacts older hours); older ranges are served daily
+HOURLY_RETENTION_DAYS = 90
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def bucket_start(value: datetime, granularity: str) -> datetime:
+    """Start of the hour/day containing value, as naive UTC."""
+    value = to_naive_utc(value)
+    if granularity == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def rollup_rows(sales) -> list:
+    """
+    Aggregate sales into rollup rows for every granularity.
+    sales: iterable of (created_at, medicine_name, segment, quantity)
+    """
+    totals = defaultdict(lambda: [0, 0])
+
+    for created_at, medicine_name, segment, quantity in sales:
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(created_at, granularity), medicine_name, segment)
+            totals[key][0] += quantity
+            totals[key][1] += 1
+
+    return [
+        {
+            "granularity": granularity,
+            "bucket": bucket,
+            "medicine_name": medicine_name,
+            "segment": segment,
+            "units": units,
+            "purchases": purchases,
+        }
+        for (granularity, bucket, medicine_name, segment), (units, purchases) in totals.items()
+    ]
+
+
+def record_sales(db: Session, created_at: datetime, segment: str, lines: list):
+    """
+    Add one order's lines [(medicine_name, quantity)] to the hour and
+    day rollups. Call in the order's transaction.
+    """
+    upsert_increment(
+        db,
+        SalesRollup,
+        rollup_rows((created_at, name, segment, quantity) for name, quantity in lines),
+        index_elements=["granularity", "bucket", "medicine_name", "segment"],
+        increment_columns=["units", "purchases"]
+    )
+
+
+def hourly_cutoff(now: datetime = None) -> datetime:
+    """Hourly buckets before this have been compacted into daily ones."""
+    return bucket_start(now or datetime.utcnow(), "day") - timedelta(days=HOURLY_RETENTION_DAYS)
+
+
+def _rollups(db: Session, granularity: str, start: datetime, end: datetime,
+             medicine_name: str, segment: str) -> list:
+    query = (
+        db.query(
+            SalesRollup.bucket,
+            SalesRollup.medicine_name,
+            SalesRollup.segment,
+            SalesRollup.units,
+            SalesRollup.purchases
+        )
+        .filter(
+            SalesRollup.granularity == granularity,
+            SalesRollup.bucket >= bucket_start(start, granularity),
+            SalesRollup.bucket < to_naive_utc(end)
+        )
+    )
+    if medicine_name is not None:
+        query = query.filter(SalesRollup.medicine_name == medicine_name)
+    if segment is not None:
+        query = query.filter(SalesRollup.segment == segment)
+
+    return query.order_by(SalesRollup.bucket, SalesRollup.medicine_name).all()
+
+
+def query_sales(
+    db: Session,
+    granularity: str,
+    start: datetime,
+    end: datetime,
+    medicine_name: str = None,
+    segment: str = None,
+    now: datetime = None
+) -> list:
+    """
+    Rollup rows with start <= bucket < end, ordered by bucket.
+    Returns (bucket, medicine_name, segment, units, purchases) tuples.
+
+    Hourly buckets are only kept for HOURLY_RETENTION_DAYS: the part of
+    an hourly range before the cutoff comes back as daily buckets.
+    """
+    if granularity == "hour":
+        cutoff = hourly_cutoff(now)
+        if to_naive_utc(start) < cutoff:
+            daily = _rollups(db, "day", start, min(to_naive_utc(end), cutoff), medicine_name, segment)
+            if to_naive_utc(end) <= cutoff:
+                return daily
+            return daily + _rollups(db, "hour", cutoff, end, medicine_name, segment)
+
+    return _rollups(db, granularity, start, end, medicine_name, segment)
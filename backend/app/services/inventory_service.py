@@ -1,7 +1,8 @@
 # backend/app/services/inventory_service.py
 
 from sqlalchemy.orm import Session
-from app.db.models import Medicine
+from app.db.models import InventoryAlert, Medicine
+from app.db.upsert import upsert
 
 def get_all_medicines(db: Session):
     return db.query(Medicine).all()
@@ -14,6 +15,72 @@ def update_stock(db: Session, medicine_id: int, quantity_change: int):
     if not medicine:
         return None
     medicine.stock_quantity += quantity_change
+    sync_inventory_alerts(db, [medicine])
     db.commit()
     db.refresh(medicine)
     return medicine
+
+
+# -------------------------
+# Inventory alert snapshot
+# -------------------------
+
+def alert_status(medicine: Medicine):
+    """CRITICAL / LOW against the medicine's own thresholds, else None."""
+    stock = medicine.stock_quantity or 0
+    if stock <= medicine.critical_point:
+        return "CRITICAL"
+    if stock <= medicine.reorder_point:
+        return "LOW"
+    return None
+
+def sync_inventory_alerts(db: Session, medicines: list):
+    """
+    Bring the snapshot rows for these medicines in line with their
+    current stock. Call in the same transaction as the stock change.
+    """
+    rows = []
+    cleared = []
+
+    for medicine in medicines:
+        status = alert_status(medicine)
+        if status is None:
+            cleared.append(medicine.id)
+            continue
+        rows.append({
+            "medicine_id": medicine.id,
+            "name": medicine.name,
+            "current_stock": medicine.stock_quantity or 0,
+            "status": status,
+            "reorder_point": medicine.reorder_point,
+            "reorder_quantity": medicine.reorder_quantity,
+            "prescription_required": medicine.prescription_required,
+        })
+
+    upsert(
+        db,
+        InventoryAlert,
+        rows,
+        index_elements=["medicine_id"],
+        update_columns=[
+            "name", "current_stock", "status", "reorder_point",
+            "reorder_quantity", "prescription_required",
+        ]
+    )
+
+    if cleared:
+        (
+            db.query(InventoryAlert)
+            .filter(InventoryAlert.medicine_id.in_(cleared))
+            .delete(synchronize_session=False)
+        )
+
+def rebuild_inventory_alerts(db: Session):
+    """Recompute the whole snapshot (after seeding or bulk edits)."""
+    db.query(InventoryAlert).delete(synchronize_session=False)
+    medicines = (
+        db.query(Medicine)
+        .filter(Medicine.stock_quantity - Medicine.reorder_point <= 0)
+        .all()
+    )
+    sync_inventory_alerts(db, medicines)
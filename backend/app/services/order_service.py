@@ -1,7 +1,8 @@
 # backend/app/services/order_service.py
 
 from sqlalchemy.orm import Session
-from app.db.models import Order, OrderItem
+from app.db.models import Medicine, Order, OrderItem, OrderHistory
+from app.services.analytics_service import record_sales
 
 def create_order(db: Session, customer_id: int, items: list):
     order = Order(customer_id=customer_id)
@@ -9,6 +10,19 @@ def create_order(db: Session, customer_id: int, items: list):
     db.commit()
     db.refresh(order)
 
+    medicine_names = dict(
+        db.query(Medicine.id, Medicine.name)
+        .filter(Medicine.id.in_([item["medicine_id"] for item in items]))
+        .all()
+    )
+
+    # Segment for sales rollups: first order or repeat customer
+    is_returning = (
+        db.query(Order.id)
+        .filter(Order.customer_id == customer_id, Order.id < order.id)
+        .first()
+    ) is not None
+
     for item in items:
         db.add(OrderItem(
             order_id=order.id,
@@ -17,5 +31,20 @@ def create_order(db: Session, customer_id: int, items: list):
             dosage=item.get("dosage", "")
         ))
 
+        # Purchase history read by memory_agent and the refill engine
+        db.add(OrderHistory(
+            customer_id=customer_id,
+            medicine_name=medicine_names[item["medicine_id"]],
+            quantity=item["quantity"],
+            created_at=order.created_at
+        ))
+
+    record_sales(
+        db,
+        order.created_at,
+        "returning" if is_returning else "new",
+        [(medicine_names[item["medicine_id"]], item["quantity"]) for item in items]
+    )
+
     db.commit()
     return order
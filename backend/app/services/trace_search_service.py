@@ -0,0 +1,137 @@
+# backend/app/services/trace_search_service.py
+
+import re
+from datetime import datetime
+
+import orjson
+from sqlalchemy import column, func, literal_column, select, table as sql_table, text
+from sqlalchemy.orm import Session
+
+from app.config import TRACE_SEARCH_CANDIDATES
+from app.db.models import DecisionTrace
+
+# Full-text index built by migration 6: an FTS5 table (<table>_fts) on
+# SQLite, a generated tsvector column (GIN-indexed) on Postgres
+
+_TERMS = re.compile(r'"([^"]*)"|([^\s"]+)')
+
+
+def search_terms(query: str) -> list:
+    """
+    Split a search into terms: "quoted text" is one phrase, other words
+    are single terms. Every term must match.
+    """
+    terms = []
+    for phrase, word in _TERMS.findall(query):
+        term = (phrase or word).strip()
+        if term:
+            terms.append(term)
+    return terms
+
+
+def fts5_query(terms: list) -> str:
+    """FTS5 MATCH expression with every term quoted (no operator syntax)."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def websearch_query(terms: list) -> str:
+    """Postgres websearch_to_tsquery input, every term quoted (no or / -)."""
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def trace_filters(table, agent_name: str = None, decision: str = None,
+                  start: datetime = None, end: datetime = None) -> list:
+    """Filter criteria on a decision trace table's columns."""
+    filters = []
+    if agent_name is not None:
+        filters.append(table.c.agent_name == agent_name)
+    if decision is not None:
+        # Stored as JSON text, like the other payload columns
+        filters.append(table.c.decision == orjson.dumps(decision).decode())
+    if start is not None:
+        filters.append(table.c.created_at >= start)
+    if end is not None:
+        filters.append(table.c.created_at < end)
+    return filters
+
+
+def search_table(db: Session, table, terms: list, filters: list, limit: int, candidates: int) -> tuple:
+    """
+    Search one decision trace table (decision_traces or a day
+    partition). Returns (rows, matches): the best `limit` rows of the
+    newest `candidates` matches, and how many candidates were ranked.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        tsquery = func.websearch_to_tsquery("english", websearch_query(terms))
+        vector = literal_column(f"{table.name}.search_vector")
+        newest = (
+            select(table.c.id)
+            .where(vector.op("@@")(tsquery), *filters)
+            .order_by(table.c.id.desc())
+            .limit(candidates)
+            .subquery()
+        )
+        # Ranked after the candidate cut, so only candidates are scored
+        rank = func.ts_rank_cd(vector, tsquery)
+        statement = (
+            select(*table.columns, rank.label("rank"))
+            .join(newest, newest.c.id == table.c.id)
+            .order_by(rank.desc())
+        )
+    else:
+        # FTS5 walks matches newest-first and stops at the cut; bm25
+        # (the table's rank function) is only computed for those rows
+        fts_name = f"{table.name}_fts"
+        fts = sql_table(fts_name, column("rowid"), column("rank"))
+        newest = (
+            select(fts.c.rowid.label("id"), fts.c.rank.label("score"))
+            .select_from(fts)
+            .join(table, table.c.id == fts.c.rowid)
+            .where(text(f"{fts_name} MATCH :match").bindparams(match=fts5_query(terms)), *filters)
+            .order_by(fts.c.rowid.desc())
+            .limit(candidates)
+            .subquery()
+        )
+        statement = (
+            select(*table.columns, (-newest.c.score).label("rank"))
+            .join(newest, newest.c.id == table.c.id)
+            .order_by(newest.c.score)
+        )
+
+    statement = statement.add_columns(func.count().over().label("matches"))
+    rows = [dict(row._mapping) for row in db.execute(statement.limit(limit))]
+    matches = rows[0]["matches"] if rows else 0
+    for row in rows:
+        del row["matches"]
+    return rows, matches
+
+
+def search_traces(
+    db: Session,
+    query: str,
+    agent_name: str = None,
+    decision: str = None,
+    start: datetime = None,
+    end: datetime = None,
+    limit: int = 50,
+    candidates: int = TRACE_SEARCH_CANDIDATES
+) -> list:
+    """
+    Decision traces whose input / reasoning / output match every term of
+    `query`, optionally filtered by agent, decision and
+    start <= created_at < end.
+
+    The newest `candidates` matches are ranked and the best `limit`
+    returned, so a term matching millions of traces costs no more than
+    one matching `candidates`.
+    Returns dicts of the trace columns plus "rank" (higher is better).
+    """
+    terms = search_terms(query)
+    if not terms:
+        raise ValueError("Empty search query")
+
+    table = DecisionTrace.__table__
+    rows, _ = search_table(
+        db, table, terms, trace_filters(table, agent_name, decision, start, end), limit, candidates
+    )
+    return rows
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Benchmark: audit log verification throughput
+
+Writes N decision-log-sized records through SegmentedLog (hash chain +
+checkpoints), then reports:
+- full:        verify_log over the whole log with no saved state
+- incremental: verify_log after appending 1% more records, resuming
+               from the saved state (the daily-check case)
+
+Usage (from backend/):
+    python benchmarks/bench_audit_verify.py --records 200000 --compression gzip
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.audit.segment_log import SegmentedLog  # noqa: E402
+from app.audit.verify import verify_log  # noqa: E402
+
+KEY = b"bench-key"
+
+
+def record(i: int) -> dict:
+    return {
+        "run_id": str(uuid.uuid4()),
+        "timestamp": datetime.utcnow().isoformat(),
+        "customer": {"id": i % 1000, "name": f"Customer {i % 1000}"},
+        "conversation": {"message": "I need 2 strips of paracetamol 500mg"},
+        "safety": {"allowed": True, "reason": None},
+        "execution": {"order_id": i, "status": "success"},
+        "decision_trace": [
+            {"agent": "safety_agent", "decision": "approved"},
+            {"agent": "action_agent", "decision": "order_created"},
+        ],
+        "meta": {"trace_level": "decisions"},
+    }
+
+
+def write(log: SegmentedLog, start: int, count: int):
+    for i in range(start, start + count):
+        while not log.append(record(i)):
+            time.sleep(0.01)
+    log.flush()
+
+
+def timed_verify(directory) -> tuple:
+    started = time.perf_counter()
+    report = verify_log(directory, KEY)
+    elapsed = time.perf_counter() - started
+    assert report.ok, report.problems
+    return report, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--segment-mb", type=int, default=16)
+    parser.add_argument("--compression", default="gzip", choices=["none", "gzip", "zstd"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = SegmentedLog(
+            tmp,
+            max_segment_bytes=args.segment_mb * 1024 * 1024,
+            compression=None if args.compression == "none" else args.compression,
+            hmac_key=KEY
+        )
+        log.start()
+        write(log, 0, args.records)
+
+        for name, extra in (("full", 0), ("incremental", args.records // 100)):
+            if extra:
+                write(log, args.records, extra)
+            report, elapsed = timed_verify(tmp)
+            print(
+                f"{name:<12} hashed={report.records:>8} segments_read={report.segments:>3} "
+                f"skipped={report.skipped:>3} time={elapsed * 1000:8.1f}ms "
+                f"({report.records / elapsed if elapsed else 0:,.0f} records/s)"
+            )
+
+        log.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Benchmark: vectorized consumption-rate model
+
+Generates synthetic purchase events directly as arrays and times
+forecast() (sort, grouping, EWMA, run-out projection).
+
+Usage (from backend/):
+    python benchmarks/bench_consumption_model.py --events 5000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.autonomy.consumption_model import PurchaseEvents, forecast  # noqa: E402
+
+
+def synthetic_events(n_events: int, n_customers: int, n_medicines: int) -> PurchaseEvents:
+    rng = np.random.default_rng(42)
+    return PurchaseEvents(
+        order_id=np.arange(1, n_events + 1, dtype=np.int64),
+        customer_id=rng.integers(1, n_customers + 1, n_events, dtype=np.int64),
+        medicine_code=rng.integers(0, n_medicines, n_events).astype(np.int32),
+        day=19000 + rng.random(n_events) * 730,
+        quantity=rng.integers(1, 90, n_events).astype(np.float64),
+        medicine_names=np.array([f"med-{i}" for i in range(n_medicines)], dtype=object),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=5_000_000)
+    parser.add_argument("--customers", type=int, default=500_000)
+    parser.add_argument("--medicines", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    events = synthetic_events(args.events, args.customers, args.medicines)
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        fc = forecast(events)
+        timings.append(time.perf_counter() - started)
+
+    best = min(timings)
+    print(
+        f"events={args.events} groups={len(fc)} "
+        f"best={best:.2f}s throughput={args.events / best / 1e6:.2f}M events/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Benchmark: Parquet export of order_history (SQLite)
+
+Exports --rows order rows spread over --days days, then reports:
+- full export time and peak Arrow memory (bounded by the row group
+  size, not the table size)
+- an incremental run after one more day of orders
+- aggregating one column for the last week: a SQL scan of the
+  database vs query() over the memory-mapped Parquet files
+
+Usage (from backend/):
+    python benchmarks/bench_parquet_export.py --rows 1000000 --days 60
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyarrow as pa  # noqa: E402
+import pyarrow.compute as pc  # noqa: E402
+from sqlalchemy import create_engine, insert, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.autonomy import parquet_export  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db import models  # noqa: E402,F401
+from app.db.models import Customer, OrderHistory  # noqa: E402
+
+START = datetime(2024, 1, 1)
+BATCH = 10000
+
+
+def fill(engine, first: int, count: int, start: datetime, days: int):
+    step = timedelta(days=days) / max(count, 1)
+    with engine.begin() as conn:
+        for offset in range(0, count, BATCH):
+            conn.execute(insert(OrderHistory.__table__), [
+                {
+                    "customer_id": 1,
+                    "medicine_name": f"Medicine {(first + i) % 500}",
+                    "quantity": (first + i) % 5 + 1,
+                    "created_at": start + step * i,
+                }
+                for i in range(offset, min(offset + BATCH, count))
+            ])
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--row-group-size", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        sessions = sessionmaker(bind=engine)
+        db = sessions()
+        db.add(Customer(id=1, name="Bench"))
+        db.commit()
+        db.close()
+        fill(engine, 0, args.rows, START, args.days)
+
+        parquet_export.SessionLocal = sessions
+        parquet_export.ReadSessionLocal = sessions
+        exporter = parquet_export.ParquetExporter(f"{tmp}/exports", row_group_size=args.row_group_size)
+
+        pool = pa.default_memory_pool()
+        full_ms, rows = timed(lambda: exporter.export_table("order_history"))
+        peak_mb = pool.max_memory() / 2**20
+
+        per_day = args.rows // args.days
+        fill(engine, args.rows, per_day, START + timedelta(days=args.days), 1)
+        incremental_ms, new_rows = timed(lambda: exporter.export_table("order_history"))
+
+        last_day = (START + timedelta(days=args.days)).date()
+        week = last_day - timedelta(days=7)
+        with engine.connect() as conn:
+            sql_ms, sql_total = timed(lambda: conn.execute(
+                text("SELECT SUM(quantity) FROM order_history WHERE created_at >= :start"),
+                {"start": datetime.combine(week, datetime.min.time())}
+            ).scalar())
+        parquet_ms, table = timed(lambda: parquet_export.query(
+            "order_history", columns=["quantity"], start=week, end=last_day + timedelta(days=1),
+            directory=f"{tmp}/exports"
+        ))
+        assert pc.sum(table.column("quantity")).as_py() == sql_total
+
+        size_mb = sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(f"{tmp}/exports") for name in names
+        ) / 2**20
+
+    print(f"{rows} order rows over {args.days} days, {args.row_group_size}-row groups")
+    print(f"full export            {full_ms:10.1f} ms  ({size_mb:.1f} MiB Parquet, "
+          f"{peak_mb:.1f} MiB peak Arrow memory)")
+    print(f"incremental ({new_rows} rows) {incremental_ms:8.1f} ms")
+    print(f"last week, SQL scan    {sql_ms:10.1f} ms")
+    print(f"last week, query()     {parquet_ms:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Benchmark: sharded refill engine vs. worker count
+
+Builds a synthetic order_history in a temporary SQLite file and times
+run_refill_engine_sharded() at increasing worker counts. Speedup is
+reported on the parallel compute phase; the coordinator merge is a
+single transaction and is reported separately.
+
+Usage (from backend/):
+    python benchmarks/bench_refill_shards.py --customers 200000 --orders-per-customer 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_refill.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import engine, init_db  # noqa: E402
+from app.db.models import Customer, OrderHistory  # noqa: E402
+from app.autonomy.refill_shards import run_refill_engine_sharded  # noqa: E402
+
+MEDICINES = [
+    "Paracetamol 500mg", "Ibuprofen 200mg", "Amoxicillin 500mg",
+    "Metformin 500mg", "Omeprazole 20mg", "Aspirin 81mg",
+]
+
+
+def build_dataset(customers: int, orders_per_customer: int):
+    init_db()
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    with engine.begin() as conn:
+        conn.execute(
+            Customer.__table__.insert(),
+            [{"id": i, "name": f"c{i}"} for i in range(1, customers + 1)]
+        )
+
+        batch = []
+        for customer_id in range(1, customers + 1):
+            for _ in range(orders_per_customer):
+                batch.append({
+                    "customer_id": customer_id,
+                    "medicine_name": rng.choice(MEDICINES),
+                    "quantity": rng.randint(1, 60),
+                    "created_at": now - timedelta(days=rng.randint(0, 120)),
+                })
+            if len(batch) >= 50000:
+                conn.execute(OrderHistory.__table__.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(OrderHistory.__table__.insert(), batch)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--customers", type=int, default=50000)
+    parser.add_argument("--orders-per-customer", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"Building {args.customers * args.orders_per_customer} order rows in {DB_PATH}")
+    build_dataset(args.customers, args.orders_per_customer)
+
+    baseline = None
+    for workers in args.workers:
+        summary = run_refill_engine_sharded(shards=workers, workers=workers)
+        compute = summary["compute_elapsed"]
+        baseline = baseline or compute
+        slowest = max(s["elapsed"] for s in summary["shards"])
+        print(
+            f"workers={workers:<3} compute={compute:.2f}s "
+            f"slowest_shard={slowest:.2f}s "
+            f"merge={summary['elapsed'] - compute:.2f}s "
+            f"speedup={baseline / compute:.2f}x "
+            f"rows={summary['rows']} alerts={summary['alerts']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
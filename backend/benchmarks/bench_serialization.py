@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Benchmark: admin list response serialization
+
+Renders the same page of order history rows three ways and reports
+CPU time per response:
+- orm:       ORM instances -> jsonable_encoder -> JSONResponse
+             (the previous `return orders` path)
+- validated: row dicts -> response_model validation -> jsonable_encoder
+             -> ORJSONResponse (FastAPI's path for a returned list)
+- rows:      row tuples -> dicts -> ORJSONResponse (page_response)
+
+The database query is excluded; only building the response body is timed.
+
+Usage (from backend/):
+    python benchmarks/bench_serialization.py --rows 10000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from pydantic import parse_obj_as  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.api.orders import OrderOut  # noqa: E402
+from app.api.pagination import page_response  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.models import Customer, OrderHistory  # noqa: E402
+
+COLUMNS = [c.key for c in OrderHistory.__table__.columns]
+
+
+def seed(session_factory, n_rows: int):
+    db = session_factory()
+    db.add(Customer(id=1, name="bench"))
+    start = datetime(2024, 1, 1)
+    db.bulk_insert_mappings(OrderHistory, [
+        {
+            "customer_id": 1,
+            "medicine_name": f"Medicine {i % 50}",
+            "quantity": i % 30 + 1,
+            "created_at": start + timedelta(minutes=i),
+        }
+        for i in range(n_rows)
+    ])
+    db.commit()
+    db.close()
+
+
+def render_orm(orders):
+    return JSONResponse(jsonable_encoder(orders)).body
+
+
+def render_validated(rows):
+    models = parse_obj_as(List[OrderOut], rows)
+    return ORJSONResponse(jsonable_encoder(models, exclude_unset=True)).body
+
+
+def render_rows(rows):
+    return page_response(rows, None).body
+
+
+def cpu_time(fn, arg, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.process_time()
+        fn(arg)
+        best = min(best, time.process_time() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        seed(session_factory, args.rows)
+
+        db = session_factory()
+        orders = db.query(OrderHistory).all()
+        rows = [
+            dict(zip(COLUMNS, row))
+            for row in db.query(*OrderHistory.__table__.columns).all()
+        ]
+
+        results = {
+            "orm": cpu_time(render_orm, orders, args.repeat),
+            "validated": cpu_time(render_validated, rows, args.repeat),
+            "rows": cpu_time(render_rows, rows, args.repeat),
+        }
+        db.close()
+        engine.dispose()
+
+    baseline = results["orm"]
+    for name, seconds in results.items():
+        print(
+            f"{name:<10} rows={args.rows} cpu={seconds * 1000:8.1f}ms "
+            f"({baseline / seconds:5.1f}x vs orm)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Benchmark: SQLite default vs. production profile under concurrency
+
+Runs a mixed read/write workload (order inserts + stock updates vs.
+memory_agent-style history reads) from many threads against both
+profiles and reports throughput and 'database is locked' failures.
+
+Usage (from backend/):
+    python benchmarks/bench_sqlite_concurrency.py --threads 16 --seconds 10
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.database import build_engines  # noqa: E402
+from app.db.models import Customer, Medicine, OrderHistory  # noqa: E402
+
+CUSTOMERS = 1000
+MEDICINES = 50
+
+
+def setup(profile: str):
+    path = os.path.join(tempfile.mkdtemp(), f"bench_{profile}.db")
+    write_engine, read_engine = build_engines(f"sqlite:///{path}", profile)
+    Base.metadata.create_all(bind=write_engine)
+
+    with write_engine.begin() as conn:
+        conn.execute(Customer.__table__.insert(), [
+            {"id": i, "name": f"c{i}"} for i in range(1, CUSTOMERS + 1)
+        ])
+        conn.execute(Medicine.__table__.insert(), [
+            {"id": i, "name": f"m{i}", "stock_quantity": 10**9} for i in range(1, MEDICINES + 1)
+        ])
+
+    return (
+        sessionmaker(bind=write_engine),
+        sessionmaker(bind=read_engine),
+        (write_engine, read_engine),
+    )
+
+
+def worker(write_factory, read_factory, write_ratio, deadline, stats, lock):
+    rng = random.Random()
+    ops = errors = 0
+
+    while time.perf_counter() < deadline:
+        customer_id = rng.randint(1, CUSTOMERS)
+        try:
+            if rng.random() < write_ratio:
+                db = write_factory()
+                try:
+                    medicine = db.get(Medicine, rng.randint(1, MEDICINES))
+                    medicine.stock_quantity -= 1
+                    db.add(OrderHistory(
+                        customer_id=customer_id,
+                        medicine_name=medicine.name,
+                        quantity=1
+                    ))
+                    db.commit()
+                finally:
+                    db.close()
+            else:
+                db = read_factory()
+                try:
+                    (
+                        db.query(OrderHistory)
+                        .filter(OrderHistory.customer_id == customer_id)
+                        .order_by(OrderHistory.created_at.desc())
+                        .limit(5)
+                        .all()
+                    )
+                    db.query(Medicine).filter(Medicine.stock_quantity <= 20).all()
+                finally:
+                    db.close()
+            ops += 1
+        except OperationalError:
+            errors += 1
+
+    with lock:
+        stats["ops"] += ops
+        stats["errors"] += errors
+
+
+def run(profile: str, threads: int, seconds: float, write_ratio: float):
+    write_factory, read_factory, engines = setup(profile)
+    stats = {"ops": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    pool = [
+        threading.Thread(
+            target=worker,
+            args=(write_factory, read_factory, write_ratio, deadline, stats, lock)
+        )
+        for _ in range(threads)
+    ]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    for engine in set(engines):
+        engine.dispose()
+
+    print(
+        f"profile={profile:<10} threads={threads} "
+        f"ops/s={stats['ops'] / seconds:8.1f} "
+        f"locked_errors={stats['errors']}"
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    base = run("default", args.threads, args.seconds, args.write_ratio)
+    prod = run("production", args.threads, args.seconds, args.write_ratio)
+
+    if base["ops"]:
+        print(f"throughput gain: {prod['ops'] / base['ops']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
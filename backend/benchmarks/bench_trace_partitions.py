@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Benchmark: single decision_traces table vs day partitions (SQLite)
+
+Writes --days days of --traces-per-day traces both ways (FTS triggers
+included, 500-row batches as the trace sink writes them), then reports:
+- insert latency per batch on the first and the last day
+- run lookup latency by request_id after the last day
+- expiring the oldest day: DELETE from the single table vs dropping
+  its partition
+
+Usage (from backend/):
+    python benchmarks/bench_trace_partitions.py --days 20 --traces-per-day 50000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db import models  # noqa: E402,F401
+from app.db.migrations import run_migrations  # noqa: E402
+from app.db.models import DecisionTrace  # noqa: E402
+from app.observability.trace_store import TracePartitions, run_steps  # noqa: E402
+
+BATCH = 500
+START = datetime(2024, 1, 1)
+
+
+def batches(day: int, per_day: int):
+    created_at = START + timedelta(days=day, hours=12)
+    for offset in range(0, per_day, BATCH):
+        yield [
+            {
+                "request_id": f"d{day}-r{(offset + i) // 5}",
+                "agent_name": "safety_agent",
+                "input": None,
+                "reasoning": f'["Paracetamol in stock, within limits {offset + i}"]',
+                "decision": '"approved"',
+                "output": '{"decision":"approved"}',
+                "duration_ms": 1.5,
+                "created_at": created_at,
+            }
+            for i in range(BATCH)
+        ]
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def fill(write, days: int, per_day: int) -> list:
+    """Average batch insert latency (ms) per day."""
+    per_day_ms = []
+    for day in range(days):
+        timings = [timed(lambda rows=rows: write(day, rows)) for rows in batches(day, per_day)]
+        per_day_ms.append(sum(timings) / len(timings))
+    return per_day_ms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=20)
+    parser.add_argument("--traces-per-day", type=int, default=50000)
+    args = parser.parse_args()
+
+    fields = ["id", "agent_name", "created_at"]
+    last_run = f"d{args.days - 1}-r7"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Single table
+        engine = create_engine(f"sqlite:///{tmp}/single.db")
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
+
+        def write_single(day, rows):
+            with engine.begin() as conn:
+                conn.execute(insert(DecisionTrace.__table__), rows)
+
+        single = fill(write_single, args.days, args.traces_per_day)
+        db = sessionmaker(bind=engine)()
+        lookup_single = timed(lambda: run_steps(db, DecisionTrace.__table__, last_run, fields))
+        db.close()
+        cutoff = START + timedelta(days=1)
+        with engine.begin() as conn:
+            expire_single = timed(lambda: conn.execute(
+                text("DELETE FROM decision_traces WHERE created_at < :cutoff"), {"cutoff": cutoff}
+            ))
+
+        # Day partitions
+        main_engine = create_engine(f"sqlite:///{tmp}/main.db")
+        Base.metadata.create_all(bind=main_engine)
+        run_migrations(main_engine)
+        partitions = TracePartitions(directory=f"{tmp}/parts", engine=main_engine, reader=main_engine)
+
+        def write_partitioned(day, rows):
+            partitions.insert((START + timedelta(days=day)).date(), rows)
+
+        partitioned = fill(write_partitioned, args.days, args.traces_per_day)
+        lookup_partitioned = timed(lambda: partitions.run_steps(
+            last_run, fields, created_at=START + timedelta(days=args.days - 1)
+        ))
+        expire_partitioned = timed(lambda: partitions.drop(START.date()))
+
+    total = args.days * args.traces_per_day
+    print(f"{total} traces over {args.days} days, {BATCH}-row batches")
+    print(f"{'':22s} {'single table':>14s} {'partitions':>12s}")
+    print(f"{'insert, first day':22s} {single[0]:11.2f} ms {partitioned[0]:9.2f} ms")
+    print(f"{'insert, last day':22s} {single[-1]:11.2f} ms {partitioned[-1]:9.2f} ms")
+    print(f"{'run lookup':22s} {lookup_single:11.2f} ms {lookup_partitioned:9.2f} ms")
+    print(f"{'expire oldest day':22s} {expire_single:11.2f} ms {expire_partitioned:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
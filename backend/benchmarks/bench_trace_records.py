@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""
+Benchmark: decision trace recording and serialization per request
+
+Builds a realistic five-agent decision_trace for N requests and
+persists each one the way run_workflow does:
+- dicts:   trace dicts, json.dumps per column for the DB rows, then
+           json.dumps of the whole audit record (trace encoded twice)
+- records: TraceRecord, orjson per column once; the audit line embeds
+           the same bytes as a Fragment
+
+Reports CPU time (process_time) and tracemalloc peak per request.
+
+Usage (from backend/):
+    python benchmarks/bench_trace_records.py --requests 5000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.audit.segment_log import encode_record  # noqa: E402
+from app.observability.trace_record import TraceRecord  # noqa: E402
+
+
+def make_state(i: int) -> dict:
+    medicines = [
+        {"name": name, "quantity": 2, "dosage": "500mg", "unit": "strip"}
+        for name in ("Paracetamol", "Cetirizine", "Omeprazole")
+    ]
+    return {
+        "customer": {"id": i % 1000, "name": f"Customer {i % 1000}"},
+        "conversation": {"message": "I need 2 strips of paracetamol, cetirizine and omeprazole"},
+        "extraction": {"medicines": medicines, "confidence": 0.93},
+        "memory": {
+            "order_history": [
+                {"order_id": n, "medicine": m["name"], "quantity": 2, "date": datetime(2024, 1, n + 1)}
+                for n in range(20) for m in medicines
+            ]
+        },
+        "safety": {"decision": "approved", "violations": [], "checked": {m["name"]: "ok" for m in medicines}},
+        "execution": {"order_id": i, "status": "success"},
+        "refill_alerts": [{"medicine": m["name"], "days_left": 3} for m in medicines],
+        "meta": {},
+    }
+
+
+def steps(state):
+    reasoning = [f"✅ {m['name']} in stock, within limits" for m in state["extraction"]["medicines"]]
+    return [
+        ("conversation_agent", "extracted",
+         dict(input=state["conversation"]["message"], output=state["extraction"])),
+        ("memory_agent", "context_provided", dict(output=state["memory"])),
+        ("safety_agent", "approved",
+         dict(input=state["extraction"]["medicines"], reasoning=reasoning, output=state["safety"])),
+        ("action_agent", "order_created", dict(output=state["execution"])),
+        ("predictive_refill_agent", "alerts_generated", dict(output=state["refill_alerts"])),
+    ]
+
+
+def audit_record(state, run_id):
+    return {
+        "run_id": run_id,
+        "timestamp": datetime.utcnow().isoformat(),
+        "customer": state.get("customer"),
+        "conversation": state.get("conversation"),
+        "safety": state.get("safety"),
+        "execution": state.get("execution"),
+        "decision_trace": state.get("decision_trace"),
+        "meta": state.get("meta"),
+    }
+
+
+def _safe_json(value):
+    return None if value is None else json.dumps(value, default=str)
+
+
+def persist_dicts(state, run_id):
+    state["decision_trace"] = [
+        {"agent": agent, "decision": decision, **payload} for agent, decision, payload in steps(state)
+    ]
+    rows = [
+        {
+            "request_id": run_id,
+            "agent_name": t["agent"],
+            "input": _safe_json(t.get("input")),
+            "reasoning": _safe_json(t.get("reasoning")),
+            "decision": _safe_json(t.get("decision")),
+            "output": _safe_json(t.get("output")),
+        }
+        for t in state["decision_trace"]
+    ]
+    line = json.dumps(audit_record(state, run_id), default=str).encode()
+    return rows, line
+
+
+def persist_records(state, run_id):
+    state["decision_trace"] = [
+        TraceRecord(agent, decision, **payload) for agent, decision, payload in steps(state)
+    ]
+    for record in state["decision_trace"]:
+        record.request_id = run_id
+    rows = [record.as_row() for record in state["decision_trace"]]
+    line = encode_record(audit_record(state, run_id))
+    return rows, line
+
+
+def measure(persist, states):
+    tracemalloc.start()
+    start = time.process_time()
+    peak = 0
+    for i, state in enumerate(states):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        result = persist(state, f"req-{i}")
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+        del result
+    elapsed = time.process_time() - start
+    tracemalloc.stop()
+
+    # CPU time without tracemalloc overhead
+    start = time.process_time()
+    for i, state in enumerate(states):
+        persist(state, f"req-{i}")
+    return time.process_time() - start, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    states = [make_state(i) for i in range(args.requests)]
+    for name, persist in (("dicts", persist_dicts), ("records", persist_records)):
+        cpu, _, peak = measure(persist, states)
+        print(
+            f"{name:8s} {cpu / args.requests * 1e6:8.1f} us/request CPU   "
+            f"{peak / 1024:7.1f} KiB peak/request"
+        )
+
+
+if __name__ == "__main__":
+    main()
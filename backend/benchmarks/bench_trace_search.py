@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Benchmark: full-text search over decision traces (SQLite FTS5)
+
+Fills a fresh SQLite database with N five-agent runs of synthetic
+traces (inserted through the sync triggers, as the trace sink does),
+then times search_traces for common and rare phrases, with and
+without filters.
+
+Usage (from backend/):
+    python benchmarks/bench_trace_search.py --runs 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson  # noqa: E402
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db import models  # noqa: E402,F401
+from app.db.migrations import run_migrations  # noqa: E402
+from app.db.models import DecisionTrace  # noqa: E402
+from app.services.trace_search_service import search_traces  # noqa: E402
+
+MEDICINES = [f"Medicine{i}" for i in range(2000)] + ["Metformin", "Paracetamol", "Amoxicillin"]
+
+SEARCHES = [
+    ("rare phrase", '"Insufficient stock for Metformin"', {}),
+    ("common phrase", '"prescription required"', {}),
+    ("common word, limit 50", "stock", {}),
+    ("words + filters", "metformin prescription",
+     {"agent_name": "safety_agent", "decision": "blocked"}),
+    ("phrase + time range", '"prescription required"',
+     {"start": datetime(2024, 1, 10), "end": datetime(2024, 1, 11)}),
+]
+
+
+def run_rows(i: int, created_at: datetime) -> list:
+    medicine = random.choice(MEDICINES)
+    blocked = random.random() < 0.1
+    if blocked:
+        reason = random.choice([
+            f"Insufficient stock for {medicine}",
+            f"{medicine} prescription required",
+            f"Quantity {random.randint(31, 99)} exceeds max limit of 30",
+        ])
+    else:
+        reason = f"{medicine} in stock, within limits"
+
+    def row(agent, decision, reasoning=None, output=None):
+        return {
+            "request_id": f"req-{i}",
+            "agent_name": agent,
+            "input": None,
+            "reasoning": orjson.dumps(reasoning).decode() if reasoning else None,
+            "decision": orjson.dumps(decision).decode(),
+            "output": orjson.dumps(output).decode() if output else None,
+            "created_at": created_at,
+        }
+
+    return [
+        row("conversation_agent", "extracted", output={"medicines": [{"name": medicine, "quantity": 2}]}),
+        row("memory_agent", "context_provided", output={"order_history": []}),
+        row("safety_agent", "blocked" if blocked else "approved", [reason],
+            {"decision": "blocked" if blocked else "approved", "violations": [reason] if blocked else []}),
+        row("action_agent", "order_created", output={"status": "success"}),
+        row("predictive_refill_agent", "alerts_generated", output=[]),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
+
+        start = time.perf_counter()
+        base = datetime(2024, 1, 1)
+        with engine.begin() as conn:
+            batch = []
+            for i in range(args.runs):
+                batch.extend(run_rows(i, base + timedelta(seconds=i * 10)))
+                if len(batch) >= 10000:
+                    conn.execute(insert(DecisionTrace), batch)
+                    batch = []
+            if batch:
+                conn.execute(insert(DecisionTrace), batch)
+        elapsed = time.perf_counter() - start
+        traces = args.runs * 5
+        print(f"indexed {traces} traces in {elapsed:.1f}s ({traces / elapsed:,.0f} traces/s)")
+
+        db = sessionmaker(bind=engine)()
+        for name, query, filters in SEARCHES:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results = search_traces(db, query, limit=50, **filters)
+                timings.append(time.perf_counter() - start)
+            print(f"{name:24s} {min(timings) * 1000:8.1f} ms   {len(results)} results")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
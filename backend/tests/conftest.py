@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db import models  # noqa: F401
+
+
+@pytest.fixture(scope="session", autouse=True)
+def audit_log_dir(tmp_path_factory):
+    """
+    Workflow runs append to the process-wide audit log; keep its
+    segments in a temp directory instead of AUDIT_LOG_DIR (backend/logs).
+    """
+    from app.audit import decision_logger
+
+    directory = tmp_path_factory.mktemp("audit")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(decision_logger, "AUDIT_LOG_DIR", str(directory))
+        yield directory
+        decision_logger.close_audit_log(timeout=5)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def app_database():
+    """
+    Bring the app database (DATABASE_URL) to the current schema, as API
+    startup does; workflow tests run against it directly.
+    """
+    from app.db.database import init_db
+    init_db()
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """
+    Isolated SQLite database with the full schema.
+    Tests patch it over a module's SessionLocal.
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    yield factory
+
+    engine.dispose()
+
+
+class _ASGIClient:
+    """
+    Minimal sync client over httpx's ASGI transport. Startup hooks (and
+    so init_db) are not run; tests patch the routers' session factories.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def request(self, method, url, **kwargs):
+        async def _send():
+            transport = httpx.ASGITransport(app=self.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.request(method, url, **kwargs)
+
+        return asyncio.run(_send())
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+
+@pytest.fixture
+def api_client():
+    from app.main import app
+    return _ASGIClient(app)
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.api import customers, decision_traces, orders
+from app.db.models import Customer, DecisionTrace, OrderHistory
+from app.security.admin_auth import ADMIN_API_KEY
+
+HEADERS = {"X-ADMIN-KEY": ADMIN_API_KEY}
+
+
+@pytest.fixture
+def client(session_factory, api_client, monkeypatch):
+    for module in (customers, decision_traces, orders):
+        monkeypatch.setattr(module, "ReadSessionLocal", session_factory)
+
+    db = session_factory()
+    base = datetime(2024, 1, 1)
+    db.add_all([Customer(id=i, name=f"C{i}") for i in range(1, 8)])
+    # Pairs of orders share a timestamp, so pages must break ties on id
+    db.add_all([
+        OrderHistory(
+            customer_id=1,
+            medicine_name=f"Med {i}",
+            quantity=i,
+            created_at=base + timedelta(hours=i // 2)
+        )
+        for i in range(25)
+    ])
+    db.commit()
+    db.close()
+
+    return api_client
+
+
+def _walk(client, url, limit):
+    rows, cursor = [], None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, params=params, headers=HEADERS)
+        assert response.status_code == 200
+        rows.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return rows
+
+
+def test_orders_pages_cover_every_row_once_newest_first(client):
+    rows = _walk(client, "/admin/orders/", limit=4)
+
+    assert len(rows) == 25
+    assert len({r["id"] for r in rows}) == 25
+    keys = [(r["created_at"], r["id"]) for r in rows]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_customers_pages_ascend_by_id(client):
+    rows = _walk(client, "/admin/customers/", limit=3)
+    assert [r["id"] for r in rows] == list(range(1, 8))
+
+
+def test_fields_projection(client):
+    response = client.get(
+        "/admin/orders/",
+        params={"fields": "id,quantity", "limit": 2},
+        headers=HEADERS
+    )
+    assert response.status_code == 200
+    assert all(set(row) == {"id", "quantity"} for row in response.json())
+
+
+def test_rejects_unknown_fields_bad_cursor_and_oversized_pages(client):
+    assert client.get("/admin/orders/", params={"fields": "password"}, headers=HEADERS).status_code == 400
+    assert client.get("/admin/orders/", params={"cursor": "not-a-cursor"}, headers=HEADERS).status_code == 400
+    assert client.get("/admin/orders/", params={"limit": 100000}, headers=HEADERS).status_code == 422
+
+
+def test_decision_traces_default_page(client, session_factory):
+    db = session_factory()
+    db.add_all([DecisionTrace(request_id=str(i), agent_name="a") for i in range(60)])
+    db.commit()
+    db.close()
+
+    response = client.get("/admin/decision-traces/", headers=HEADERS)
+    assert len(response.json()) == 50
+    assert response.headers.get("X-Next-Cursor")
+
+
+def test_pages_past_server_default_timestamps(client, session_factory):
+    # func.now() on SQLite stores whole seconds without a fraction;
+    # cursors on such rows must still move forward
+    db = session_factory()
+    db.add_all([OrderHistory(customer_id=2, medicine_name="Now", quantity=1) for _ in range(10)])
+    db.add_all([DecisionTrace(request_id=str(i), agent_name="a") for i in range(10)])
+    db.commit()
+    db.close()
+
+    orders = _walk(client, "/admin/orders/", limit=3)
+    assert len(orders) == 35
+    assert len({r["id"] for r in orders}) == 35
+
+    traces = _walk(client, "/admin/decision-traces/", limit=3)
+    assert sorted(r["id"] for r in traces) == list(range(1, 11))
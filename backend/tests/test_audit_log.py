@@ -0,0 +1,89 @@
+import gzip
+import struct
+
+import orjson
+import pytest
+
+from app.audit.segment_log import INDEX_ENTRY, SegmentedLog
+
+
+@pytest.fixture
+def make_log(tmp_path):
+    logs = []
+
+    def _make(**kwargs):
+        log = SegmentedLog(tmp_path / "audit", **kwargs)
+        log.start()
+        logs.append(log)
+        return log
+
+    yield _make
+    for log in logs:
+        log.stop(timeout=5)
+
+
+def _offsets(path):
+    data = path.read_bytes()
+    return [offset for offset, _, _ in struct.iter_unpack(INDEX_ENTRY.format, data)]
+
+
+def test_records_are_json_lines_with_an_offset_index(make_log, tmp_path):
+    log = make_log(compression=None)
+    for i in range(100):
+        assert log.append({"run_id": str(i), "n": i})
+    assert log.flush(timeout=5)
+
+    segment = tmp_path / "audit" / "audit-00000001.jsonl"
+    data = segment.read_bytes()
+    lines = data.splitlines(keepends=True)
+    assert [orjson.loads(line)["n"] for line in lines] == list(range(100))
+
+    offsets = _offsets(tmp_path / "audit" / "audit-00000001.idx")
+    assert len(offsets) == 100
+    stored = orjson.loads(data[offsets[42]:offsets[43]])
+    assert stored["run_id"] == "42" and stored["n"] == 42
+
+
+def test_size_rotation_compresses_sealed_segments(make_log, tmp_path):
+    log = make_log(max_segment_bytes=1024, compression="gzip")
+    for i in range(200):
+        log.append({"run_id": str(i), "payload": "x" * 40})
+    log.flush(timeout=5)
+    log.stop(timeout=5)
+
+    directory = tmp_path / "audit"
+    sealed = sorted(directory.glob("*.jsonl.gz"))
+    assert len(sealed) > 1
+    assert not list(directory.glob("*.jsonl"))
+
+    records = []
+    for path in sealed:
+        data = gzip.decompress(path.read_bytes())
+        assert len(data) < 1024 + 100
+        offsets = _offsets(path.with_name(path.name.replace(".jsonl.gz", ".idx")))
+        assert offsets == [0] + [i + 1 for i, b in enumerate(data[:-1]) if b == ord("\n")]
+        records += [orjson.loads(line)["run_id"] for line in data.splitlines()]
+    assert records == [str(i) for i in range(200)]
+
+
+def test_age_rotation_and_restart_continue_numbering(make_log, tmp_path):
+    log = make_log(max_segment_seconds=0, compression=None)
+    log.append({"n": 1})
+    log.flush(timeout=5)
+    log.append({"n": 2})
+    log.flush(timeout=5)
+    log.stop(timeout=5)
+
+    again = make_log(compression=None)
+    again.append({"n": 3})
+    again.flush(timeout=5)
+
+    names = sorted(p.name for p in (tmp_path / "audit").glob("*.jsonl"))
+    assert names == ["audit-00000001.jsonl", "audit-00000002.jsonl", "audit-00000003.jsonl"]
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    log = SegmentedLog(tmp_path / "audit", queue_size=2)  # not started
+    assert log.append({"n": 1}) and log.append({"n": 2})
+    assert log.append({"n": 3}) is False
+    assert log.dropped == 1
@@ -0,0 +1,81 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.audit.reader import AuditLogReader
+from app.audit.segment_log import SegmentedLog, timestamp_ms
+
+START = datetime(2024, 1, 1)
+
+
+def _records(count):
+    return [
+        {
+            "run_id": str(uuid.uuid4()),
+            "timestamp": (START + timedelta(minutes=i)).isoformat(),
+            "n": i,
+        }
+        for i in range(count)
+    ]
+
+
+def _payload(stored):
+    """A stored record without the hash chain field."""
+    return {k: v for k, v in stored.items() if k != "prev_hash"}
+
+
+@pytest.fixture
+def written(tmp_path):
+    """300 records over three sealed gzip segments plus an active one."""
+    records = _records(300)
+    log = SegmentedLog(tmp_path, max_segment_bytes=8 * 1024, compression="gzip")
+    log.start()
+    for record in records[:250]:
+        log.append(record)
+    log.stop(timeout=5)
+
+    active = SegmentedLog(tmp_path, compression=None)
+    active.start()
+    for record in records[250:]:
+        active.append(record)
+    active.flush(timeout=5)
+    yield records
+    active.stop(timeout=5)
+
+
+def test_point_lookup_across_sealed_and_active_segments(tmp_path, written):
+    reader = AuditLogReader(tmp_path)
+    assert len(list(tmp_path.glob("*.jsonl.gz"))) >= 3
+
+    for record in (written[0], written[137], written[299]):
+        assert _payload(reader.get(record["run_id"])) == record
+    assert reader.get(str(uuid.uuid4())) is None
+    assert reader.get("not-a-uuid") is None
+
+
+def test_range_scan_reads_only_matching_records(tmp_path, written):
+    reader = AuditLogReader(tmp_path)
+
+    window = list(reader.scan(START + timedelta(minutes=100), START + timedelta(minutes=260)))
+    assert [r["n"] for r in window] == list(range(100, 260))
+
+    # Only the first segment overlaps the first ten minutes
+    first_minutes = (timestamp_ms(START), timestamp_ms(START + timedelta(minutes=10)))
+    assert [s.seq for s in reader.refresh() if s.overlaps(*first_minutes)] == [1]
+
+
+def test_reader_sees_records_appended_after_it_opened(tmp_path):
+    log = SegmentedLog(tmp_path, compression=None)
+    log.start()
+    first, second = _records(2)
+    log.append(first)
+    log.flush(timeout=5)
+
+    reader = AuditLogReader(tmp_path)
+    assert _payload(reader.get(first["run_id"])) == first
+
+    log.append(second)
+    log.flush(timeout=5)
+    assert _payload(reader.get(second["run_id"])) == second
+    log.stop(timeout=5)
@@ -0,0 +1,93 @@
+import orjson
+import pytest
+
+from app.audit import decision_logger
+from app.audit.segment_log import SegmentedLog
+from app.audit.verify import verify_log
+
+KEY = b"test-key"
+
+
+def _write(directory, count, start=0, **kwargs):
+    options = dict(max_segment_bytes=4096, compression=None, hmac_key=KEY, checkpoint_every=10)
+    options.update(kwargs)
+    log = SegmentedLog(directory, **options)
+    log.start()
+    for i in range(start, start + count):
+        log.append({"run_id": str(i), "timestamp": "2024-01-01T00:00:00", "n": i})
+    log.flush(timeout=5)
+    return log
+
+
+@pytest.fixture
+def sealed_log(tmp_path):
+    _write(tmp_path, 300).stop(timeout=5)
+    return tmp_path
+
+
+def test_chain_verifies_across_segments_and_restarts(tmp_path):
+    _write(tmp_path, 150, compression="gzip").stop(timeout=5)
+    _write(tmp_path, 150, start=150, compression="gzip").stop(timeout=5)
+
+    report = verify_log(tmp_path, KEY)
+    assert report.ok, report.problems
+    assert report.records == 300
+    assert report.segments > 2
+
+
+def test_second_run_only_reads_new_records(tmp_path):
+    log = _write(tmp_path, 300)
+    first = verify_log(tmp_path, KEY)
+    assert first.ok and first.records == 300
+
+    for i in range(300, 325):
+        log.append({"run_id": str(i), "n": i})
+    log.flush(timeout=5)
+
+    second = verify_log(tmp_path, KEY)
+    assert second.ok, second.problems
+    assert second.skipped > 0
+    # Resumes from the active segment's last verified checkpoint
+    assert second.records < 60
+    log.stop(timeout=5)
+
+
+def test_edited_record_breaks_the_chain(sealed_log):
+    segment = sealed_log / "audit-00000002.jsonl"
+    segment.write_bytes(segment.read_bytes().replace(b'"n":50', b'"n":51', 1))
+
+    problems = verify_log(sealed_log, KEY).problems
+    assert len(problems) == 1
+    # Caught by the next record's prev_hash, or by a checkpoint on it
+    assert problems[0].startswith("audit-00000002: ")
+
+
+def test_removed_segment_and_truncation_are_reported(sealed_log):
+    (sealed_log / "audit-00000002.jsonl").unlink()
+    last = sorted(sealed_log.glob("*.jsonl"))[-1]
+    lines = last.read_bytes().splitlines(keepends=True)
+    last.write_bytes(b"".join(lines[:-1]))
+
+    problems = verify_log(sealed_log, KEY).problems
+    assert "segments missing before audit-00000003" in problems
+    assert any(p.startswith(last.stem) and "truncated" in p for p in problems)
+
+
+def test_forged_checkpoint_is_rejected(sealed_log):
+    checkpoints = sealed_log / "audit-00000001.chk"
+    entries = [orjson.loads(line) for line in checkpoints.read_bytes().splitlines()]
+    entries[-1]["records"] -= 1
+
+    checkpoints.write_bytes(b"".join(orjson.dumps(c) + b"\n" for c in entries))
+    assert any("bad signature" in p for p in verify_log(sealed_log, KEY).problems)
+    assert not verify_log(sealed_log, b"wrong-key", state_path=sealed_log / "other.json").ok
+
+
+def test_no_key_no_audit_log(sealed_log, monkeypatch):
+    monkeypatch.setattr(decision_logger, "AUDIT_HMAC_KEY", b"")
+    monkeypatch.setattr(decision_logger, "_audit_log", None)
+
+    with pytest.raises(RuntimeError, match="AUDIT_HMAC_KEY"):
+        decision_logger.get_audit_log()
+    with pytest.raises(RuntimeError, match="AUDIT_HMAC_KEY"):
+        verify_log(sealed_log, b"")
@@ -0,0 +1,95 @@
+import pytest
+
+from app.api import conditional, medicines, refill_alerts
+from app.db.models import Medicine
+from app.db.versioning import read_version
+from app.services.inventory_service import rebuild_inventory_alerts, update_stock
+from app.security.admin_auth import ADMIN_API_KEY
+
+HEADERS = {"X-ADMIN-KEY": ADMIN_API_KEY}
+
+
+class CountingFactory:
+    def __init__(self, factory):
+        self.factory = factory
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.factory()
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    session.add_all([
+        Medicine(id=1, name="Paracetamol 500mg", stock_quantity=50),
+        Medicine(id=2, name="Ibuprofen 200mg", stock_quantity=4),
+    ])
+    session.commit()
+    rebuild_inventory_alerts(session)
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def sessions(session_factory, monkeypatch):
+    counting = CountingFactory(session_factory)
+    for module in (conditional, medicines, refill_alerts):
+        monkeypatch.setattr(module, "ReadSessionLocal", counting)
+    monkeypatch.setattr(conditional.versions, "ttl", 60)
+    conditional.versions._versions.clear()
+    conditional.bodies.clear()
+    return counting
+
+
+def test_orm_changes_bump_the_version(db):
+    assert read_version(db, "medicines") == 1  # the initial inserts
+
+    medicine = db.get(Medicine, 1)
+    medicine.stock_quantity -= 5
+    db.commit()
+    assert read_version(db, "medicines") == 2
+
+    # No net change, or rolled back: no bump
+    medicine.stock_quantity = medicine.stock_quantity
+    db.commit()
+    medicine.stock_quantity = 0
+    db.flush()
+    db.rollback()
+    assert read_version(db, "medicines") == 2
+
+
+def test_if_none_match_gets_304_without_db_access(db, sessions, api_client):
+    first = api_client.get("/admin/medicines/", headers=HEADERS)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    calls = sessions.calls
+
+    again = api_client.get("/admin/medicines/", headers={**HEADERS, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert sessions.calls == calls
+
+    # A different query is a different representation
+    other = api_client.get("/admin/medicines/", params={"fields": "id"},
+                           headers={**HEADERS, "If-None-Match": etag})
+    assert other.status_code == 200
+
+
+def test_bodies_are_cached_until_stock_changes(db, sessions, api_client):
+    first = api_client.get("/admin/refill-alerts/", headers=HEADERS)
+    assert [a["id"] for a in first.json()] == [2]
+    calls = sessions.calls
+
+    cached = api_client.get("/admin/refill-alerts/", headers=HEADERS)
+    assert cached.content == first.content
+    assert sessions.calls == calls
+
+    # In-process commit invalidates the cached version immediately
+    update_stock(db, 1, -47)
+
+    fresh = api_client.get("/admin/refill-alerts/", headers={**HEADERS, "If-None-Match": first.headers["etag"]})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != first.headers["etag"]
+    assert sorted(a["id"] for a in fresh.json()) == [1, 2]
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.autonomy.consumption_model import EWMA_ALPHA, events_from_rows, forecast
+
+NOW = datetime(2024, 6, 1)
+
+
+def _rows(*purchases):
+    """purchases: (customer_id, medicine, days_ago, quantity)"""
+    return [
+        (i, c, m, NOW - timedelta(days=d), q)
+        for i, (c, m, d, q) in enumerate(purchases, start=1)
+    ]
+
+
+def _reference_ewma(samples, alpha=EWMA_ALPHA):
+    num = den = 0.0
+    for x in samples:
+        num = (1 - alpha) * num + x
+        den = (1 - alpha) * den + 1
+    return num / den
+
+
+def test_single_purchase_falls_back_to_one_unit_per_day():
+    fc = forecast(events_from_rows(_rows((1, "Aspirin", 2, 10))))
+
+    assert len(fc) == 1
+    assert fc.daily_rate[0] == 1.0
+    assert fc.days_remaining(NOW)[0] == 8
+
+
+def test_rate_is_ewma_of_inter_purchase_consumption():
+    # 30 units every 15 days -> 2 units/day, then 30 units lasting 10 days
+    fc = forecast(events_from_rows(_rows(
+        (1, "Metformin", 40, 30),
+        (1, "Metformin", 25, 30),
+        (1, "Metformin", 10, 30),
+        (1, "Metformin", 0, 30),
+    )))
+
+    expected = _reference_ewma([30 / 15, 30 / 15, 30 / 10])
+    assert np.isclose(fc.daily_rate[0], expected)
+    assert np.isclose(fc.interval_days[0], _reference_ewma([15, 15, 10]))
+    assert fc.purchases[0] == 4
+    assert fc.days_remaining(NOW)[0] == np.ceil(30 / expected)
+
+
+def test_groups_are_independent_and_unordered_input_is_sorted():
+    fc = forecast(events_from_rows(_rows(
+        (2, "Aspirin", 0, 5),
+        (1, "Metformin", 0, 30),
+        (1, "Aspirin", 1, 4),
+        (1, "Metformin", 30, 30),
+    )))
+
+    groups = {
+        (int(fc.customer_id[i]), fc.medicine_name(i)): (fc.daily_rate[i], fc.purchases[i])
+        for i in range(len(fc))
+    }
+    assert groups == {
+        (1, "Aspirin"): (1.0, 1),
+        (1, "Metformin"): (1.0, 2),
+        (2, "Aspirin"): (1.0, 1),
+    }
+    assert fc.last_order_id.tolist() == [3, 2, 1]
+
+
+def test_empty_history():
+    fc = forecast(events_from_rows([]))
+    assert len(fc) == 0
+    assert fc.days_remaining(NOW).tolist() == []
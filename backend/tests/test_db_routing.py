@@ -0,0 +1,123 @@
+import pytest
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.database import build_engines, primary_after_writes, routing_sessionmaker
+from app.db.models import Customer
+
+
+@pytest.fixture
+def engines(tmp_path):
+    """Primary and 'replica' as two independent SQLite files."""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        Base.metadata.create_all(bind=engine)
+
+    # Diverging contents make the routing observable
+    with primary.begin() as conn:
+        conn.execute(Customer.__table__.insert(), [{"id": 1, "name": "on primary"}])
+    with replica.begin() as conn:
+        conn.execute(Customer.__table__.insert(), [{"id": 1, "name": "on replica"}])
+
+    yield primary, replica
+
+    primary.dispose()
+    replica.dispose()
+
+
+def test_reads_go_to_replica(engines):
+    db = routing_sessionmaker(*engines)()
+    try:
+        assert db.get(Customer, 1).name == "on replica"
+        assert not db.pinned_to_primary
+    finally:
+        db.close()
+
+
+def test_session_reads_its_own_writes(engines):
+    db = routing_sessionmaker(*engines)()
+    try:
+        db.add(Customer(id=2, name="new"))
+        db.flush()
+
+        assert db.pinned_to_primary
+        names = db.execute(select(Customer.name).order_by(Customer.id)).scalars().all()
+        assert names == ["on primary", "new"]
+
+        db.commit()
+        # Still pinned after commit: the replica may lag behind
+        assert db.execute(select(Customer.name).where(Customer.id == 2)).scalar() == "new"
+    finally:
+        db.close()
+
+    primary, replica = engines
+    with replica.connect() as conn:
+        assert conn.execute(select(Customer.id).where(Customer.id == 2)).first() is None
+
+
+def test_bulk_dml_pins_to_primary(engines):
+    db = routing_sessionmaker(*engines)()
+    try:
+        db.execute(update(Customer).where(Customer.id == 1).values(name="renamed"))
+        db.commit()
+        assert db.pinned_to_primary
+    finally:
+        db.close()
+
+    primary, _ = engines
+    with primary.connect() as conn:
+        assert conn.execute(select(Customer.name)).scalar() == "renamed"
+
+
+@pytest.mark.parametrize("write", ["flush", "core"])
+def test_reads_after_another_sessions_write_go_to_primary(engines, write):
+    primary, replica = engines
+    reads = routing_sessionmaker(primary, replica)
+
+    with primary_after_writes():
+        db = reads()
+        assert db.get(Customer, 1).name == "on replica"  # nothing written yet
+        db.close()
+
+        # The action agent's commit, through the write session
+        writer = sessionmaker(bind=primary)()
+        if write == "flush":
+            writer.add(Customer(id=2, name="ordered"))
+        else:
+            writer.execute(insert(Customer).values(id=2, name="ordered"))
+        writer.commit()
+        writer.close()
+
+        db = reads()
+        assert db.get(Customer, 2).name == "ordered"
+        assert db.pinned_to_primary
+        db.close()
+
+    # Outside the scope reads go back to the replica
+    db = reads()
+    assert db.get(Customer, 1).name == "on replica"
+    db.close()
+
+
+def test_sqlite_reader_pool_is_not_pinned_after_another_sessions_write(tmp_path):
+    # Same database: readers see the commit, and the writer is one connection
+    write_engine, read_engine = build_engines(f"sqlite:///{tmp_path / 'prod.db'}", "production")
+    Base.metadata.create_all(bind=write_engine)
+    reads = routing_sessionmaker(write_engine, read_engine)
+
+    try:
+        with primary_after_writes():
+            writer = sessionmaker(bind=write_engine)()
+            writer.add(Customer(id=1, name="ordered"))
+            writer.commit()
+            writer.close()
+
+            db = reads()
+            assert db.get(Customer, 1).name == "ordered"
+            assert not db.pinned_to_primary
+            db.close()
+    finally:
+        write_engine.dispose()
+        read_engine.dispose()
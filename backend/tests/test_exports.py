@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from app.api import exports
+from app.db.models import Customer, OrderHistory
+from app.security.admin_auth import ADMIN_API_KEY
+
+HEADERS = {"X-ADMIN-KEY": ADMIN_API_KEY}
+
+
+@pytest.fixture
+def client(session_factory, api_client, monkeypatch):
+    monkeypatch.setattr(exports, "ReadSessionLocal", session_factory)
+    monkeypatch.setattr(exports, "EXPORT_BATCH_SIZE", 7)
+
+    db = session_factory()
+    db.add(Customer(id=1, name="A"))
+    db.add_all([
+        OrderHistory(
+            customer_id=1,
+            medicine_name=f"Med, {i}",  # comma exercises CSV quoting
+            quantity=i,
+            created_at=datetime(2024, 1, 1, i % 24)
+        )
+        for i in range(30)
+    ])
+    db.commit()
+    db.close()
+
+    return api_client
+
+
+def test_ndjson_export_streams_every_row(client):
+    response = client.get("/admin/export/orders", headers=HEADERS)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["quantity"] for r in rows] == list(range(30))
+    assert rows[1]["created_at"] == "2024-01-01T01:00:00"
+
+
+def test_csv_export_with_fields_and_gzip(client):
+    response = client.get(
+        "/admin/export/orders",
+        params={"format": "csv", "fields": "id,medicine_name", "gzip": "true"},
+        headers=HEADERS
+    )
+
+    assert response.headers["content-encoding"] == "gzip"
+    rows = list(csv.reader(io.StringIO(response.text)))  # httpx decompresses
+    assert rows[0] == ["id", "medicine_name"]
+    assert len(rows) == 31
+    assert rows[1][1] == "Med, 0"
+
+
+def test_rows_are_read_in_batches(session_factory, monkeypatch):
+    monkeypatch.setattr(exports, "ReadSessionLocal", session_factory)
+    db = session_factory()
+    db.add_all([Customer(id=i) for i in range(1, 11)])
+    db.commit()
+    db.close()
+
+    batches = list(exports._row_batches(Customer, ["id"], 4))
+    assert [len(b) for b in batches] == [4, 4, 2]
+
+
+def test_empty_csv_has_header_and_bad_format_is_rejected(client):
+    response = client.get("/admin/export/medicines", params={"format": "csv"}, headers=HEADERS)
+    assert response.text.splitlines() == [
+        "id,name,stock_quantity,prescription_required,"
+        "reorder_point,critical_point,reorder_quantity,created_at"
+    ]
+
+    assert client.get("/admin/export/orders", params={"format": "xml"}, headers=HEADERS).status_code == 400
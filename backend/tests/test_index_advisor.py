@@ -0,0 +1,181 @@
+"""
+Index advisor: EXPLAIN QUERY PLAN for every hot query.
+
+Each hot path runs the real code (agent, endpoint or engine function)
+against an empty database; the SELECTs it sends on its table are
+captured and explained. Fails when one plans a full table scan or
+sorts in a temp B-tree for ORDER BY, i.e. when the index serving it
+is missing. Add new hot paths to HOT_PATHS.
+"""
+
+import re
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, select
+
+from app.agents import memory_agent, safety_agent
+from app.api import decision_traces, orders, refill_alerts, runs
+from app.autonomy import refill_engine
+from app.db.base import Base
+from app.db.keyset import encode_cursor
+from app.db.migrations import run_migrations
+from app.db.models import Customer, Medicine
+from app.observability.tracing import start_trace
+from app.services.analytics_service import query_sales
+from app.services.inventory_service import rebuild_inventory_alerts
+from app.services.trace_search_service import search_traces
+
+NOW = datetime(2024, 1, 1)  # whole second: SQLite pages seek with the OR/IN form
+
+
+def _state(**extra):
+    state = {"customer": {"id": 1}, "decision_trace": [], "meta": {"trace": start_trace("full", 1.0)}}
+    state.update(extra)
+    return state
+
+
+def _missing_run():
+    with pytest.raises(HTTPException):  # empty database: 404 after the reads
+        runs.get_run("run")
+
+
+# name -> (table whose SELECTs are checked, runs the hot path on a session)
+HOT_PATHS = {
+    "memory_agent.history": (
+        "order_history", lambda db: memory_agent.memory_agent(_state())
+    ),
+    "safety_agent.prescription": (
+        "prescriptions", lambda db: safety_agent.safety_agent(_state(extraction={
+            "medicines": [{"name": "Amoxicillin", "quantity": 1, "dosage": "500mg"}]
+        }))
+    ),
+    "orders.list_page": (
+        "order_history",
+        lambda db: orders.list_orders(cursor=encode_cursor((NOW, 1000)), limit=100, fields=None)
+    ),
+    "decision_traces.list": (
+        "decision_traces",
+        lambda db: decision_traces.list_decision_traces(cursor=None, limit=50, fields=None)
+    ),
+    "decision_traces.list_page": (
+        "decision_traces",
+        lambda db: decision_traces.list_decision_traces(
+            cursor=encode_cursor((NOW, 1000)), limit=50, fields=None
+        )
+    ),
+    "decision_traces.search": (
+        "decision_traces", lambda db: search_traces(db, "Metformin", limit=50)
+    ),
+    "runs.steps": (
+        "decision_traces", lambda db: _missing_run()
+    ),
+    "runs.list_page": (
+        "run_summaries",
+        lambda db: runs.list_runs(
+            cursor=encode_cursor((NOW, "run")), limit=50, status=None, customer_id=None, fields=None
+        )
+    ),
+    "refill_alerts.customer": (
+        "orders", lambda db: refill_alerts.get_customer_refill_alerts(1)
+    ),
+    "refill_alerts.inventory_alerts": (
+        "inventory_alerts", lambda db: refill_alerts._render_stock_alerts()
+    ),
+    "inventory_service.below_reorder_point": (
+        "medicines", rebuild_inventory_alerts
+    ),
+    "refill_engine.touched_customers": (
+        "order_history", lambda db: refill_engine._touched_customers(db, 100)
+    ),
+    "refill_engine.due_projections": (
+        "refill_projections", lambda db: refill_engine._process_due_projections(db, NOW)
+    ),
+    "analytics.sales_range": (
+        "sales_rollups", lambda db: query_sales(db, "day", NOW, datetime(2024, 2, 1))
+    ),
+}
+
+
+@contextmanager
+def captured_selects(engine):
+    """(statement, parameters) of every SELECT sent on engine."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def query_plan(engine, statement: str, parameters=()) -> list:
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+def plan_problems(plan: list) -> list:
+    """
+    Full scans of a table, and ORDER BY sorts of table rows. Scans of a
+    subquery's rows and sorts of grouped or derived rows (a few rows per
+    customer, the search's ranked candidates) are planned above them.
+    """
+    tables = set(Base.metadata.tables)
+    sorts_derived_rows = any(
+        step.startswith(("USE TEMP B-TREE FOR GROUP BY", "MATERIALIZE", "CO-ROUTINE"))
+        for step in plan
+    )
+    return [
+        step for step in plan
+        if (step.startswith("SCAN ") and "USING" not in step and step.split()[1] in tables)
+        or (step.startswith("USE TEMP B-TREE FOR ORDER BY") and not sorts_derived_rows)
+    ]
+
+
+@pytest.fixture
+def engine(session_factory, monkeypatch):
+    engine = session_factory.kw["bind"]
+    run_migrations(engine)
+    for module in (memory_agent, safety_agent, orders, decision_traces, runs, refill_alerts):
+        monkeypatch.setattr(module, "ReadSessionLocal", session_factory)
+    for module in (decision_traces, runs):
+        monkeypatch.setattr(module, "trace_partitions", None)
+
+    db = session_factory()
+    db.add(Customer(id=1, name="A"))
+    db.add(Medicine(id=1, name="Amoxicillin", prescription_required=True, stock_quantity=50))
+    db.commit()
+    db.close()
+    return engine
+
+
+@pytest.mark.parametrize("name", sorted(HOT_PATHS))
+def test_hot_query_uses_an_index(engine, session_factory, name):
+    table, run = HOT_PATHS[name]
+    on_table = re.compile(rf"\b(FROM|JOIN)\s+{table}\b", re.IGNORECASE)
+
+    db = session_factory()
+    try:
+        with captured_selects(engine) as statements:
+            run(db)
+    finally:
+        db.close()
+
+    checked = [(s, p) for s, p in statements if on_table.search(s)]
+    assert checked, f"{name} sent no SELECT on {table}"
+    for statement, parameters in checked:
+        plan = query_plan(engine, statement, parameters)
+        assert not plan_problems(plan), f"{name} plan: {plan}\n{statement}"
+
+
+def test_advisor_flags_full_scans(engine):
+    compiled = select(Customer).where(Customer.email == "a@b.c").compile(dialect=engine.dialect)
+    plan = query_plan(engine, str(compiled), ("a@b.c",))
+    assert plan_problems(plan)
@@ -0,0 +1,30 @@
+from app.db.models import InventoryAlert, Medicine
+from app.services.inventory_service import rebuild_inventory_alerts, update_stock
+
+
+def _snapshot(db):
+    return {
+        (a.medicine_id, a.status, a.current_stock, a.reorder_quantity)
+        for a in db.query(InventoryAlert).all()
+    }
+
+
+def test_snapshot_follows_per_medicine_thresholds(session_factory):
+    db = session_factory()
+    db.add_all([
+        Medicine(id=1, name="A", stock_quantity=30, reorder_point=40, reorder_quantity=500),
+        Medicine(id=2, name="B", stock_quantity=30),  # default reorder point 20
+        Medicine(id=3, name="C", stock_quantity=4),
+    ])
+    db.commit()
+
+    rebuild_inventory_alerts(db)
+    db.commit()
+    assert _snapshot(db) == {(1, "LOW", 30, 500), (3, "CRITICAL", 4, 100)}
+
+    update_stock(db, 2, -15)   # 15 <= 20: LOW
+    update_stock(db, 3, +100)  # restocked: cleared
+    update_stock(db, 1, -27)   # 3 <= critical 5
+    assert _snapshot(db) == {(1, "CRITICAL", 3, 500), (2, "LOW", 15, 100)}
+
+    db.close()
@@ -0,0 +1,61 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app.db.base import Base
+from app.db import migrations
+from app.db.migrations import MIGRATIONS, applied_versions, run_migrations
+
+
+def _index_names(engine, table):
+    return {ix["name"] for ix in inspect(engine).get_indexes(table)}
+
+
+def test_upgrades_a_database_created_before_the_migrations(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+
+    # Roll the schema back to what create_all produced before these changes
+    with engine.begin() as conn:
+        for name in (
+            "ix_order_history_customer_created",
+            "ix_decision_traces_created_at",
+            "ix_prescriptions_customer_medicine_valid",
+            "ix_medicines_stock_quantity",
+            "ix_order_history_created_id",
+            "ix_medicines_stock_headroom",
+            "ix_orders_customer_created",
+            "ix_order_items_order_id",
+        ):
+            conn.execute(text(f"DROP INDEX {name}"))
+        conn.execute(text("ALTER TABLE refill_projections DROP COLUMN daily_rate"))
+        for column in ("reorder_point", "critical_point", "reorder_quantity"):
+            conn.execute(text(f"ALTER TABLE medicines DROP COLUMN {column}"))
+        conn.execute(text("INSERT INTO medicines (id, name, stock_quantity) VALUES (1, 'A', 3), (2, 'B', 50)"))
+        conn.execute(text("DROP TABLE schema_migrations"))
+
+    assert run_migrations(engine) == [v for v, _, _ in MIGRATIONS]
+
+    assert "ix_order_history_customer_created" in _index_names(engine, "order_history")
+    assert "ix_prescriptions_customer_medicine_valid" in _index_names(engine, "prescriptions")
+    columns = {c["name"] for c in inspect(engine).get_columns("refill_projections")}
+    assert "daily_rate" in columns
+
+    # Existing medicines get default thresholds and a backfilled snapshot
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT reorder_point FROM medicines WHERE id = 2")).scalar() == 20
+        assert conn.execute(text("SELECT medicine_id, status FROM inventory_alerts")).all() == [(1, "CRITICAL")]
+
+    engine.dispose()
+
+
+def test_runs_each_migration_once(session_factory, monkeypatch):
+    engine = session_factory.kw["bind"]
+    calls = []
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", MIGRATIONS + [
+        (99, "probe", lambda conn: calls.append(conn))
+    ])
+
+    assert 99 in run_migrations(engine)
+    assert run_migrations(engine) == []
+    assert len(calls) == 1
+    assert 99 in applied_versions(engine)
@@ -0,0 +1,135 @@
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+ds = pytest.importorskip("pyarrow.dataset")
+
+from app.autonomy import parquet_export  # noqa: E402
+from app.autonomy.parquet_export import ParquetExporter, query  # noqa: E402
+from app.db.models import Customer, DecisionTrace, Medicine, Order, OrderHistory, OrderItem, SweepWatermark  # noqa: E402
+
+START = datetime(2024, 3, 1)
+
+
+@pytest.fixture
+def db(session_factory, monkeypatch):
+    monkeypatch.setattr(parquet_export, "SessionLocal", session_factory)
+    monkeypatch.setattr(parquet_export, "ReadSessionLocal", session_factory)
+    monkeypatch.setattr(parquet_export, "trace_partitions", None)
+
+    db = session_factory()
+    db.add(Customer(id=1, name="A"))
+    db.add(Medicine(id=1, name="Paracetamol 500mg", stock_quantity=50))
+    db.commit()
+    yield db
+    db.close()
+
+
+def _add_history(db, count, start=START):
+    db.add_all([
+        OrderHistory(customer_id=1, medicine_name=f"Med {i}", quantity=i,
+                     created_at=start + timedelta(hours=8 * i))
+        for i in range(count)
+    ])
+    db.commit()
+
+
+def _files(directory, table):
+    root = os.path.join(directory, table)
+    return sorted(
+        os.path.join(os.path.basename(day_dir), name)
+        for day_dir, _, names in os.walk(root) for name in names
+    )
+
+
+def test_rows_are_partitioned_by_day_in_bounded_row_groups(db, tmp_path):
+    _add_history(db, 9)  # 3 per day over 3 days
+
+    exported = ParquetExporter(str(tmp_path), row_group_size=2).export_table("order_history")
+
+    assert exported == 9
+    files = _files(tmp_path, "order_history")
+    assert [f.split(os.sep)[0] for f in files] == ["date=2024-03-01", "date=2024-03-02", "date=2024-03-03"]
+    assert files[0].endswith("part-000000000001-000000000003.parquet")
+
+    metadata = pq.ParquetFile(tmp_path / "order_history" / files[0]).metadata
+    assert metadata.num_rows == 3
+    assert metadata.num_row_groups == 2
+
+    table = query("order_history", directory=str(tmp_path))
+    assert sorted(table.column("quantity").to_pylist()) == list(range(9))
+    assert table.schema.field("created_at").type == pa.timestamp("us")
+    assert table.schema.field("date").type == pa.date32()
+
+
+def test_second_run_exports_only_new_rows(db, session_factory, tmp_path):
+    exporter = ParquetExporter(str(tmp_path))
+    _add_history(db, 3)
+    assert exporter.export_table("order_history") == 3
+
+    assert exporter.export_table("order_history") == 0
+    _add_history(db, 2, start=START + timedelta(hours=20))  # same day, then the next
+    assert exporter.export_table("order_history") == 2
+
+    assert len(_files(tmp_path, "order_history")) == 3  # a new part beside the old ones
+    assert query("order_history", directory=str(tmp_path)).num_rows == 5
+
+    check = session_factory()
+    assert check.get(SweepWatermark, "parquet_export:order_history").last_id == 5
+    check.close()
+
+
+def test_files_from_an_unfinished_run_are_replaced(db, tmp_path):
+    _add_history(db, 3)
+    exporter = ParquetExporter(str(tmp_path))
+    exporter._write("order_history", 0)  # files written, watermark never committed
+    stray = tmp_path / "order_history" / "date=2024-03-01" / ".tmp-7.parquet"
+    stray.write_bytes(b"partial")
+
+    assert exporter.export_table("order_history") == 3
+
+    assert query("order_history", directory=str(tmp_path)).num_rows == 3
+    assert not stray.exists()
+
+
+def test_order_items_carry_order_customer_and_date(db, tmp_path):
+    db.add_all([
+        Order(id=1, customer_id=1, created_at=START),
+        Order(id=2, customer_id=1, created_at=START + timedelta(days=1)),
+    ])
+    db.add_all([
+        OrderItem(order_id=1, medicine_id=1, quantity=2, dosage="1x daily"),
+        OrderItem(order_id=2, medicine_id=1, quantity=1),
+    ])
+    db.commit()
+
+    assert ParquetExporter(str(tmp_path)).export_table("order_items") == 2
+
+    rows = query("order_items", directory=str(tmp_path)).sort_by("id").to_pylist()
+    assert [(r["order_id"], r["customer_id"], r["date"]) for r in rows] == [
+        (1, 1, date(2024, 3, 1)), (2, 1, date(2024, 3, 2))
+    ]
+    assert rows[1]["dosage"] is None
+
+
+def test_query_filters_days_columns_and_rows(db, tmp_path):
+    db.add_all([
+        DecisionTrace(request_id=f"r{i}", agent_name="safety_agent",
+                      decision='"blocked"' if i % 3 == 0 else '"approved"',
+                      duration_ms=1.5, created_at=START + timedelta(days=i))
+        for i in range(6)
+    ])
+    db.commit()
+    ParquetExporter(str(tmp_path)).export_table("decision_traces")
+
+    table = query(
+        "decision_traces", columns=["request_id", "decision"],
+        start=date(2024, 3, 2), end=date(2024, 3, 5),
+        filter=ds.field("decision") == '"approved"', directory=str(tmp_path)
+    )
+
+    assert table.column_names == ["request_id", "decision"]
+    assert sorted(table.column("request_id").to_pylist()) == ["r1", "r2"]
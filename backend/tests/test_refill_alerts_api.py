@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+from app.api import refill_alerts
+from app.db.models import Customer, Medicine, Order, OrderItem
+from app.security.admin_auth import ADMIN_API_KEY
+
+HEADERS = {"X-ADMIN-KEY": ADMIN_API_KEY}
+
+
+def _order(db, customer_id, days_ago, medicine_ids):
+    order = Order(customer_id=customer_id, created_at=datetime.utcnow() - timedelta(days=days_ago))
+    db.add(order)
+    db.flush()
+    db.add_all([
+        OrderItem(order_id=order.id, medicine_id=m, quantity=1)
+        for m in medicine_ids
+    ])
+    return order
+
+
+def test_customer_refill_alerts_one_row_per_medicine(session_factory, api_client, monkeypatch):
+    monkeypatch.setattr(refill_alerts, "ReadSessionLocal", session_factory)
+
+    db = session_factory()
+    db.add_all([Customer(id=1), Customer(id=2)])
+    db.add_all([Medicine(id=1, name="Paracetamol 500mg"), Medicine(id=2, name="Ibuprofen 200mg")])
+    _order(db, 1, days_ago=40, medicine_ids=[1, 2])
+    latest = _order(db, 1, days_ago=3, medicine_ids=[2])
+    _order(db, 2, days_ago=1, medicine_ids=[1])
+    db.commit()
+    latest_id = latest.id
+    db.close()
+
+    response = api_client.get("/admin/refill-alerts/customer/1", headers=HEADERS)
+    assert response.status_code == 200
+
+    rows = {r["medicine_name"]: r for r in response.json()}
+    assert set(rows) == {"Paracetamol 500mg", "Ibuprofen 200mg"}
+
+    assert rows["Ibuprofen 200mg"]["order_id"] == latest_id
+    assert rows["Ibuprofen 200mg"]["days_since_order"] == 3
+    assert rows["Ibuprofen 200mg"]["refill_priority"] == "PENDING"
+
+    assert rows["Paracetamol 500mg"]["days_since_order"] == 40
+    assert rows["Paracetamol 500mg"]["refill_eligible"] is True
@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func
+
+from app.autonomy import refill_engine
+from app.db.models import Customer, OrderHistory, RefillAlert, RefillProjection, SweepWatermark
+
+
+@pytest.fixture
+def db(session_factory, monkeypatch):
+    monkeypatch.setattr(refill_engine, "SessionLocal", session_factory)
+    monkeypatch.setattr(refill_engine, "ReadSessionLocal", session_factory)
+    session = session_factory()
+    session.add_all([Customer(id=1, name="A"), Customer(id=2, name="B")])
+    session.commit()
+    yield session
+    session.close()
+
+
+def _order(db, customer_id, name, quantity, days_ago):
+    db.add(OrderHistory(
+        customer_id=customer_id,
+        medicine_name=name,
+        quantity=quantity,
+        created_at=datetime.utcnow() - timedelta(days=days_ago)
+    ))
+    db.commit()
+
+
+def test_alerts_only_for_projections_inside_window(db):
+    _order(db, 1, "Paracetamol 500mg", 5, days_ago=4)   # 1 day left
+    _order(db, 2, "Ibuprofen 200mg", 30, days_ago=1)    # 29 days left
+
+    assert refill_engine.run_refill_engine() == 1
+
+    alerts = db.query(RefillAlert).all()
+    assert [(a.customer_id, a.urgency) for a in alerts] == [(1, "high")]
+
+
+def test_watermark_advances_and_skips_untouched_customers(db):
+    _order(db, 1, "Paracetamol 500mg", 30, days_ago=1)
+    refill_engine.run_refill_engine()
+
+    watermark = db.get(SweepWatermark, refill_engine.WATERMARK_NAME)
+    db.refresh(watermark)
+    first_id = watermark.last_id
+    assert first_id > 0
+
+    # No new activity: nothing due, nothing recomputed
+    assert refill_engine.run_refill_engine() == 0
+    db.refresh(watermark)
+    assert watermark.last_id == first_id
+
+    _order(db, 2, "Aspirin 81mg", 2, days_ago=0)
+    refill_engine.run_refill_engine()
+    db.refresh(watermark)
+    assert watermark.last_id > first_id
+    assert db.query(RefillProjection).count() == 2
+
+
+def test_reorder_resets_projection(db):
+    _order(db, 1, "Paracetamol 500mg", 2, days_ago=2)
+    refill_engine.run_refill_engine()
+    assert db.query(RefillAlert).one().urgency == "high"
+
+    _order(db, 1, "Paracetamol 500mg", 30, days_ago=0)
+    refill_engine.run_refill_engine()
+
+    projection = db.query(RefillProjection).one()
+    db.refresh(projection)
+    assert projection.quantity == 30
+    assert projection.alert_urgency is None
+    assert projection.next_check_at is not None
+
+
+def test_full_rescan_recomputes_current_projections(db):
+    _order(db, 1, "Paracetamol 500mg", 2, days_ago=2)
+    assert refill_engine.run_refill_engine() == 1
+
+    # e.g. left behind by an older consumption model
+    projection = db.query(RefillProjection).one()
+    rate = projection.daily_rate
+    projection.daily_rate = rate * 10
+    db.commit()
+
+    assert refill_engine.run_refill_engine() == 0
+    db.refresh(projection)
+    assert projection.daily_rate == rate * 10
+
+    # Recomputed, but the unchanged urgency isn't raised again
+    assert refill_engine.run_refill_engine(full_rescan=True) == 0
+    db.refresh(projection)
+    assert projection.daily_rate == rate
+    assert projection.alert_urgency == "high"
+
+
+def test_threshold_crossing_escalates_without_new_orders(db, monkeypatch):
+    _order(db, 1, "Paracetamol 500mg", 6, days_ago=2)   # 4 days left
+    assert refill_engine.run_refill_engine() == 0
+
+    class _Later(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.utcnow() + timedelta(days=2)
+
+    monkeypatch.setattr(refill_engine, "datetime", _Later)
+    assert refill_engine.run_refill_engine() == 1
+    assert db.query(RefillAlert).one().urgency == "medium"
+
+
+@pytest.mark.parametrize("partition", ["hash", "range"])
+def test_sharded_engine_matches_incremental(db, session_factory, monkeypatch, partition):
+    from app.db import database
+    from app.autonomy.refill_shards import run_refill_engine_sharded
+
+    _order(db, 1, "Paracetamol 500mg", 5, days_ago=4)
+    _order(db, 2, "Ibuprofen 200mg", 30, days_ago=1)
+    _order(db, 2, "Aspirin 81mg", 3, days_ago=1)
+
+    monkeypatch.setattr(database, "SessionLocal", session_factory)
+    monkeypatch.setattr(database, "ReadSessionLocal", session_factory)
+    monkeypatch.setattr(database, "READ_DATABASE_URL", str(session_factory.kw["bind"].url))
+
+    summary = run_refill_engine_sharded(shards=2, workers=2, partition=partition)
+
+    assert summary["rows"] == 3
+    assert summary["alerts"] == 2
+    alerts = {(a.customer_id, a.medicine_name, a.urgency) for a in db.query(RefillAlert).all()}
+    assert alerts == {(1, "Paracetamol 500mg", "high"), (2, "Aspirin 81mg", "medium")}
+
+    # The incremental engine picks up from the sharded watermark without re-alerting
+    assert refill_engine.run_refill_engine() == 0
+
+
+def test_shards_only_read_orders_up_to_the_snapshot(db, session_factory):
+    from app.autonomy.refill_shards import _compute_shard
+
+    _order(db, 1, "Paracetamol 500mg", 5, days_ago=4)
+    snapshot = db.query(OrderHistory.id).scalar()
+    # Placed after the coordinator took its snapshot
+    _order(db, 2, "Aspirin 81mg", 3, days_ago=1)
+
+    result = _compute_shard(
+        str(session_factory.kw["bind"].url), ("hash", 1, 0), datetime.utcnow(), snapshot
+    )
+
+    assert [p[0] for p in result["projections"]] == [1]
+
+
+def test_merge_keeps_what_the_live_path_did_after_the_snapshot(db, session_factory):
+    from app.autonomy.refill_shards import _compute_shard, _merge
+
+    _order(db, 1, "Paracetamol 500mg", 5, days_ago=4)   # 1 day left
+    _order(db, 2, "Aspirin 81mg", 3, days_ago=1)        # 2 days left
+    snapshot = db.query(func.max(OrderHistory.id)).scalar()
+    result = _compute_shard(
+        str(session_factory.kw["bind"].url), ("hash", 1, 0), datetime.utcnow(), snapshot
+    )
+
+    # While the shards ran: customer 1 restocked and a sweep picked it up
+    _order(db, 1, "Paracetamol 500mg", 30, days_ago=0)
+    refill_engine.run_refill_engine()
+
+    assert _merge(db, [result]) == 1
+
+    projections = {p.customer_id: p for p in db.query(RefillProjection).all()}
+    for projection in projections.values():
+        db.refresh(projection)
+    assert projections[1].quantity == 30
+    assert projections[1].alert_urgency is None
+    assert projections[2].last_order_id == snapshot
+    assert {(a.customer_id, a.urgency) for a in db.query(RefillAlert).all()} == {(2, "medium")}
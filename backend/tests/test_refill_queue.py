@@ -0,0 +1,139 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, insert
+
+from app.autonomy import refill_engine, refill_queue
+from app.autonomy.refill_queue import DueItem, RefillDueQueue
+from app.db.models import Customer, OrderHistory, RefillAlert
+
+
+def test_due_item_is_compact():
+    item = DueItem(1.0, 0, 1, "Aspirin")
+    assert not hasattr(item, "__dict__")
+
+
+def test_reschedule_replaces_previous_entry():
+    q = RefillDueQueue()
+    now = datetime.utcnow()
+
+    q.schedule(1, "Aspirin", now - timedelta(seconds=5))
+    q.schedule(1, "Aspirin", now + timedelta(days=1))
+    q.schedule(2, "Aspirin", now - timedelta(seconds=1))
+
+    due = q.pop_due(time.time())
+    assert [item.key for item in due] == [(2, "Aspirin")]
+    assert len(q) == 1
+
+
+def test_none_due_time_unschedules():
+    q = RefillDueQueue()
+    q.schedule(1, "Aspirin", datetime.utcnow())
+    q.schedule(1, "Aspirin", None)
+
+    assert len(q) == 0
+    assert q.pop_due(time.time() + 10) == []
+
+
+def test_pop_due_in_time_order():
+    q = RefillDueQueue()
+    now = datetime.utcnow()
+    q.schedule_many([
+        (3, "C", now - timedelta(seconds=1)),
+        (1, "A", now - timedelta(seconds=3)),
+        (2, "B", now - timedelta(seconds=2)),
+    ])
+
+    assert [item.customer_id for item in q.pop_due(time.time())] == [1, 2, 3]
+
+
+@pytest.fixture
+def db(session_factory, monkeypatch):
+    monkeypatch.setattr(refill_engine, "SessionLocal", session_factory)
+    monkeypatch.setattr(refill_engine, "ReadSessionLocal", session_factory)
+    monkeypatch.setattr(refill_queue, "ReadSessionLocal", session_factory)
+    session = session_factory()
+    session.add(Customer(id=1, name="A"))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_order_notification_fires_alert_without_a_sweep(db):
+    q = RefillDueQueue()
+    q.start()
+    try:
+        db.add(OrderHistory(
+            customer_id=1,
+            medicine_name="Paracetamol 500mg",
+            quantity=2,
+            created_at=datetime.utcnow() - timedelta(days=1)
+        ))
+        db.commit()
+
+        q.notify_order(1)
+
+        assert _wait_for(lambda: db.query(RefillAlert).count() == 1)
+        assert db.query(RefillAlert).one().urgency == "high"
+    finally:
+        q.stop(timeout=2)
+
+
+def test_rebuild_loads_pending_thresholds(db):
+    db.add(OrderHistory(
+        customer_id=1,
+        medicine_name="Metformin 500mg",
+        quantity=30,
+        created_at=datetime.utcnow()
+    ))
+    db.commit()
+    refill_engine.run_refill_engine()
+
+    q = RefillDueQueue()
+    q.rebuild()
+
+    assert len(q) == 1
+    due_in_days = (q.next_due() - time.time()) / 86400
+    assert 26 < due_in_days < 28
+
+
+def test_alert_raised_meanwhile_by_another_replica_is_updated(db, session_factory):
+    db.add(OrderHistory(
+        customer_id=1,
+        medicine_name="Paracetamol 500mg",
+        quantity=2,
+        created_at=datetime.utcnow() - timedelta(days=1)
+    ))
+    db.commit()
+    entries = refill_engine.refresh_customers([1])
+
+    # Another process's due queue inserts the alert just before ours
+    engine = session_factory.kw["bind"]
+    raised = []
+
+    def other_replica_first(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO refill_alerts") and not raised:
+            raised.append(True)
+            with engine.begin() as other:
+                other.execute(insert(RefillAlert).values(
+                    customer_id=1, medicine_name="Paracetamol 500mg", urgency="medium", days_remaining=2
+                ))
+
+    event.listen(engine, "before_cursor_execute", other_replica_first)
+    try:
+        refill_engine.evaluate_projections([(c, m) for c, m, _ in entries])
+    finally:
+        event.remove(engine, "before_cursor_execute", other_replica_first)
+
+    assert raised
+    assert [(a.urgency, a.days_remaining) for a in db.query(RefillAlert).all()] == [("high", 1)]
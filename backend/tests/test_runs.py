@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.api import runs
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.db.models import DecisionTrace, RunSummary
+from app.observability.trace_sink import TraceSink
+from app.observability.tracing import record_step, start_trace
+from app.security.admin_auth import ADMIN_API_KEY
+
+HEADERS = {"X-ADMIN-KEY": ADMIN_API_KEY}
+AGENTS = ("memory_agent", "conversation_agent", "safety_agent", "action_agent")
+
+
+def _persist(session_factory, request_id, status="completed", created_at=datetime(2024, 5, 1)):
+    """Record and persist a run the way run_workflow does."""
+    state = {"decision_trace": [], "meta": {"trace": start_trace("decisions", 1.0)}}
+    for agent in AGENTS:
+        record_step(state, agent, "ok")
+    for trace in state["decision_trace"]:
+        trace.request_id = request_id
+        trace.created_at = created_at
+
+    sink = TraceSink(session_factory, flush_interval=0)
+    sink.submit(state["decision_trace"], {
+        "request_id": request_id,
+        "customer_id": 7,
+        "status": status,
+        "steps": len(state["decision_trace"]),
+        "duration_ms": 12.5,
+        "created_at": created_at,
+    })
+    sink.stop(timeout=5)
+
+
+@pytest.fixture
+def client(session_factory, monkeypatch, api_client):
+    monkeypatch.setattr(runs, "ReadSessionLocal", session_factory)
+    return api_client
+
+
+def test_sink_writes_the_summary_with_the_traces(session_factory):
+    _persist(session_factory, "run-1")
+
+    db = session_factory()
+    try:
+        summary = db.query(RunSummary).one()
+        durations = [d for (d,) in db.query(DecisionTrace.duration_ms).order_by(DecisionTrace.id)]
+    finally:
+        db.close()
+
+    assert (summary.request_id, summary.status, summary.steps) == ("run-1", "completed", 4)
+    assert len(durations) == 4 and all(d is not None and d >= 0 for d in durations)
+
+
+def test_get_run_returns_every_step_in_order(session_factory, client):
+    _persist(session_factory, "run-1")
+    _persist(session_factory, "run-2")
+
+    response = client.get("/admin/runs/run-1", headers=HEADERS)
+    assert response.status_code == 200
+    body = response.json()
+
+    assert body["run"]["status"] == "completed"
+    assert [s["agent_name"] for s in body["steps"]] == list(AGENTS)
+    assert all("duration_ms" in s for s in body["steps"])
+
+    assert client.get("/admin/runs/missing", headers=HEADERS).status_code == 404
+
+
+def test_list_runs_pages_newest_first(session_factory, client):
+    start = datetime(2024, 5, 1)
+    for i in range(5):
+        _persist(session_factory, f"run-{i}", status="blocked" if i % 2 else "completed",
+                 created_at=start + timedelta(minutes=i))
+
+    response = client.get("/admin/runs/", params={"limit": 3}, headers=HEADERS)
+    assert [r["request_id"] for r in response.json()] == ["run-4", "run-3", "run-2"]
+
+    response = client.get(
+        "/admin/runs/",
+        params={"limit": 3, "cursor": response.headers[NEXT_CURSOR_HEADER]},
+        headers=HEADERS
+    )
+    assert [r["request_id"] for r in response.json()] == ["run-1", "run-0"]
+
+    response = client.get("/admin/runs/", params={"status": "blocked"}, headers=HEADERS)
+    assert [r["request_id"] for r in response.json()] == ["run-3", "run-1"]
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+
+from app.api import analytics
+from app.autonomy import sales_rollups
+from app.db.models import Customer, Medicine, Order, OrderItem, SalesRollup
+from app.security.admin_auth import ADMIN_API_KEY
+from app.services.analytics_service import query_sales
+from app.services.order_service import create_order
+
+HEADERS = {"X-ADMIN-KEY": ADMIN_API_KEY}
+
+
+def _rollups(db):
+    return {
+        (r.granularity, r.bucket, r.medicine_name, r.segment): (r.units, r.purchases)
+        for r in db.query(SalesRollup).all()
+    }
+
+
+def _seed(db):
+    db.add_all([Customer(id=1), Customer(id=2)])
+    db.add_all([Medicine(id=1, name="Paracetamol 500mg"), Medicine(id=2, name="Ibuprofen 200mg")])
+    db.commit()
+
+
+def test_orders_increment_rollups_like_a_rebuild(session_factory, monkeypatch):
+    monkeypatch.setattr(sales_rollups, "SessionLocal", session_factory)
+    db = session_factory()
+    _seed(db)
+
+    create_order(db, 1, [{"medicine_id": 1, "quantity": 2}, {"medicine_id": 2, "quantity": 1}])
+    create_order(db, 1, [{"medicine_id": 1, "quantity": 3}])
+    create_order(db, 2, [{"medicine_id": 1, "quantity": 1}])
+
+    incremental = _rollups(db)
+    day = {k[2:]: v for k, v in incremental.items() if k[0] == "day"}
+    assert day == {
+        ("Paracetamol 500mg", "new"): (3, 2),
+        ("Ibuprofen 200mg", "new"): (1, 1),
+        ("Paracetamol 500mg", "returning"): (3, 1),
+    }
+
+    now = datetime.utcnow()
+    sales_rollups.rebuild_sales_rollups(now - timedelta(days=1), now)
+    db.expire_all()
+    assert _rollups(db) == incremental
+
+    db.close()
+
+
+def test_compaction_drops_old_hourly_buckets(session_factory, monkeypatch):
+    monkeypatch.setattr(sales_rollups, "SessionLocal", session_factory)
+    now = datetime(2024, 6, 1, 12)
+
+    db = session_factory()
+    _seed(db)
+    for days_ago in (sales_rollups.HOURLY_RETENTION_DAYS + 5, 1):
+        order = Order(customer_id=1, created_at=now - timedelta(days=days_ago))
+        db.add(order)
+        db.flush()
+        db.add(OrderItem(order_id=order.id, medicine_id=1, quantity=1))
+    db.commit()
+
+    sales_rollups.rebuild_sales_rollups(now - timedelta(days=200), now)
+    assert sales_rollups.compact_sales_rollups(now) == 1
+
+    remaining = sorted(k[0] for k in _rollups(db))
+    assert remaining == ["day", "day", "hour"]
+
+    db.close()
+
+
+def test_hourly_range_past_retention_is_served_daily(session_factory, monkeypatch):
+    monkeypatch.setattr(sales_rollups, "SessionLocal", session_factory)
+    now = datetime(2024, 6, 1, 12)
+    old, recent = now - timedelta(days=sales_rollups.HOURLY_RETENTION_DAYS + 5), now - timedelta(days=1)
+
+    db = session_factory()
+    _seed(db)
+    for created_at in (old, recent):
+        order = Order(customer_id=1, created_at=created_at)
+        db.add(order)
+        db.flush()
+        db.add(OrderItem(order_id=order.id, medicine_id=1, quantity=1))
+    db.commit()
+
+    sales_rollups.rebuild_sales_rollups(now - timedelta(days=200), now)
+    sales_rollups.compact_sales_rollups(now)
+
+    rows = query_sales(db, "hour", now - timedelta(days=200), now, now=now)
+    assert [(bucket, units) for bucket, _, _, units, _ in rows] == [
+        (old.replace(hour=0), 1),  # daily bucket: its hours are compacted
+        (recent, 1),
+    ]
+
+    db.close()
+
+
+def test_sales_endpoint_range_query(session_factory, api_client, monkeypatch):
+    monkeypatch.setattr(analytics, "ReadSessionLocal", session_factory)
+    db = session_factory()
+    _seed(db)
+    create_order(db, 1, [{"medicine_id": 1, "quantity": 2}])
+    create_order(db, 1, [{"medicine_id": 2, "quantity": 4}])
+    db.close()
+
+    response = api_client.get("/admin/analytics/sales", params={"segment": "returning"}, headers=HEADERS)
+    assert response.status_code == 200
+    assert [(r["medicine_name"], r["units"], r["purchases"]) for r in response.json()] == [
+        ("Ibuprofen 200mg", 4, 1)
+    ]
+
+    hourly = api_client.get("/admin/analytics/sales", params={"granularity": "hour"}, headers=HEADERS)
+    assert {r["medicine_name"] for r in hourly.json()} == {"Paracetamol 500mg", "Ibuprofen 200mg"}
+
+    bad = api_client.get("/admin/analytics/sales", params={"granularity": "week"}, headers=HEADERS)
+    assert bad.status_code == 400
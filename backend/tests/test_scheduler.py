@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+from app.autonomy import scheduler as scheduler_module
+from app.autonomy.scheduler import RefillScheduler, acquire_lease
+from app.db.models import SchedulerLease, SchedulerRun
+
+
+@pytest.fixture(autouse=True)
+def db(session_factory, monkeypatch):
+    monkeypatch.setattr(scheduler_module, "SessionLocal", session_factory)
+    session = session_factory()
+    yield session
+    session.close()
+
+
+def test_only_one_node_holds_the_lease():
+    assert acquire_lease("job", "node-a", ttl_seconds=60)
+    assert not acquire_lease("job", "node-b", ttl_seconds=60)
+    # Holder renews
+    assert acquire_lease("job", "node-a", ttl_seconds=60)
+
+
+def test_expired_lease_is_taken_over():
+    assert acquire_lease("job", "node-a", ttl_seconds=-1)
+    assert acquire_lease("job", "node-b", ttl_seconds=60)
+
+
+def test_tick_records_metrics(db):
+    s = RefillScheduler(job=lambda: 7, job_name="job", node_id="node-a")
+    assert s.tick() == 7
+
+    run = db.query(SchedulerRun).one()
+    assert (run.status, run.rows, run.node) == ("ok", 7, "node-a")
+    assert run.duration_ms >= 0
+
+
+def test_failed_sweep_is_recorded(db):
+    def boom():
+        raise ValueError("db down")
+
+    s = RefillScheduler(job=boom, job_name="job", node_id="node-a")
+    assert s.tick() is None
+
+    run = db.query(SchedulerRun).one()
+    assert run.status == "error"
+    assert "db down" in run.error
+
+
+def test_overlapping_tick_is_skipped():
+    release = threading.Event()
+    s = RefillScheduler(job=lambda: release.wait(5) and 1, job_name="job", node_id="node-a")
+
+    t = threading.Thread(target=s.tick)
+    t.start()
+    time.sleep(0.1)
+
+    assert s.tick() is None
+    release.set()
+    t.join()
+
+
+def test_second_replica_does_not_sweep():
+    calls = []
+    a = RefillScheduler(job=lambda: calls.append("a"), job_name="job", node_id="a")
+    b = RefillScheduler(job=lambda: calls.append("b"), job_name="job", node_id="b")
+
+    a.tick()
+    b.tick()
+    assert calls == ["a"]
+
+
+def test_stop_is_graceful():
+    s = RefillScheduler(job=lambda: 0, job_name="job", interval=0.05, jitter=0, node_id="a")
+    thread = s.start()
+    time.sleep(0.2)
+    s.stop(timeout=2)
+
+    assert not thread.is_alive()
+    assert acquire_lease("job", "other", ttl_seconds=60)
+
+
+def test_lease_is_renewed_during_a_long_sweep(db):
+    def long_sweep():
+        time.sleep(1.5)  # outlives the 1s lease
+        return 0 if acquire_lease("job", "node-b", ttl_seconds=60) else 1
+
+    s = RefillScheduler(job=long_sweep, job_name="job", lease_seconds=1,
+                        renew_every=0.2, node_id="node-a")
+    assert s.tick() == 1
+
+    assert db.query(SchedulerRun).one().status == "ok"
+
+
+def test_sweep_that_lost_its_lease_is_recorded_as_failed(session_factory, db):
+    def stolen():
+        steal = session_factory()
+        steal.query(SchedulerLease).update({"holder": "node-b"})
+        steal.commit()
+        steal.close()
+        time.sleep(0.3)
+        return 5
+
+    s = RefillScheduler(job=stolen, job_name="job", lease_seconds=60,
+                        renew_every=0.1, node_id="node-a")
+    assert s.tick() is None
+
+    run = db.query(SchedulerRun).one()
+    assert run.status == "error"
+    assert "Lease lost" in run.error
@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.database import build_engines
+from app.db.models import Customer
+
+
+@pytest.fixture
+def production(tmp_path):
+    """The SQLite production profile, plus a second process's writer."""
+    path = tmp_path / "prod.db"
+    write_engine, read_engine = build_engines(f"sqlite:///{path}", "production")
+    Base.metadata.create_all(bind=write_engine)
+
+    other = sqlite3.connect(path, timeout=0.1, isolation_level=None)
+    yield sessionmaker(bind=write_engine), read_engine, other
+
+    other.close()
+    write_engine.dispose()
+    read_engine.dispose()
+
+
+def _other_writes(other, customer_id):
+    other.execute("INSERT INTO customers (id, name) VALUES (?, 'other')", (customer_id,))
+
+
+def test_wal_and_query_only_readers(production):
+    sessions, read_engine, other = production
+    assert other.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    with read_engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO customers (id, name) VALUES (1, 'x')"))
+
+
+def test_read_only_transaction_leaves_the_write_lock_free(production):
+    sessions, _, other = production
+    db = sessions()
+    try:
+        db.execute(select(Customer)).all()  # transaction open, reads only
+        _other_writes(other, 1)
+    finally:
+        db.close()
+
+
+def test_write_transaction_takes_the_lock_up_front(production):
+    sessions, _, other = production
+    db = sessions()
+    try:
+        db.add(Customer(id=1, name="mine"))
+        db.flush()
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            _other_writes(other, 2)
+        db.commit()
+    finally:
+        db.close()
+
+    _other_writes(other, 2)
+
+
+def test_read_then_write_upgrades_in_the_same_transaction(production):
+    sessions, _, other = production
+    db = sessions()
+    try:
+        assert db.get(Customer, 1) is None
+        db.add(Customer(id=1, name="mine"))
+        db.commit()
+    finally:
+        db.close()
+
+    assert other.execute("SELECT name FROM customers WHERE id = 1").fetchone() == ("mine",)
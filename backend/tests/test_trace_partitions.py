@@ -0,0 +1,217 @@
+import os
+from datetime import date, datetime, timedelta
+
+import orjson
+import pytest
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.api import decision_traces, exports, runs
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.autonomy import trace_retention
+from app.db.migrations import run_migrations
+from app.db.models import DecisionTrace, RunSummary
+from app.observability.trace_sink import TraceSink
+from app.observability.trace_store import ID_SPAN, TracePartitions, id_range, partition_table
+from app.security.admin_auth import ADMIN_API_KEY
+
+HEADERS = {"X-ADMIN-KEY": ADMIN_API_KEY}
+TODAY = datetime(2024, 5, 20, 12)
+
+
+def _run(request_id, created_at, decision="approved"):
+    return [
+        {
+            "request_id": request_id,
+            "agent_name": agent,
+            "reasoning": orjson.dumps([f"{agent} {decision} Metformin"]).decode(),
+            "decision": orjson.dumps(step_decision).decode(),
+            "created_at": created_at,
+        }
+        for agent, step_decision in (
+            ("memory_agent", "context_provided"),
+            ("safety_agent", decision),
+            ("action_agent", "order_created"),
+        )
+    ]
+
+
+def _summary(request_id, created_at, status="completed"):
+    return {"request_id": request_id, "customer_id": 1, "status": status,
+            "steps": 3, "duration_ms": 5.0, "created_at": created_at}
+
+
+@pytest.fixture
+def partitions(session_factory, tmp_path):
+    engine = session_factory.kw["bind"]
+    run_migrations(engine)
+    return TracePartitions(directory=str(tmp_path / "traces"), engine=engine, reader=engine)
+
+
+@pytest.fixture
+def persist(session_factory, partitions):
+    def persist(*runs):
+        sink = TraceSink(session_factory, flush_interval=0, partitions=partitions)
+        for request_id, created_at, status in runs:
+            decision = {"completed": "approved", "blocked": "blocked"}[status]
+            sink.submit(_run(request_id, created_at, decision), _summary(request_id, created_at, status))
+        sink.stop(timeout=5)
+        return sink
+    return persist
+
+
+@pytest.fixture
+def client(session_factory, partitions, monkeypatch, api_client):
+    for module in (decision_traces, exports, runs):
+        monkeypatch.setattr(module, "ReadSessionLocal", session_factory)
+        monkeypatch.setattr(module, "trace_partitions", partitions)
+    return api_client
+
+
+def _count(session_factory, model):
+    db = session_factory()
+    try:
+        return db.query(model).count()
+    finally:
+        db.close()
+
+
+def test_writes_are_routed_to_day_partitions(session_factory, partitions, persist):
+    sink = persist(("a", TODAY, "completed"), ("b", TODAY - timedelta(days=1), "completed"))
+
+    assert sink.written == 6
+    assert partitions.days() == [date(2024, 5, 20), date(2024, 5, 19)]
+    assert _count(session_factory, DecisionTrace) == 0
+    assert _count(session_factory, RunSummary) == 2
+
+    trace = partitions.page(None, limit=1)[0][0]
+    assert trace["id"] // ID_SPAN == date(2024, 5, 20).toordinal()
+    assert partitions.get(trace["id"])["request_id"] == "a"
+
+
+def test_listing_pages_across_partitions(session_factory, persist, client):
+    persist(*[(f"run-{i}", TODAY - timedelta(days=i), "completed") for i in range(3)])
+
+    # Older traces from before partitioning stay readable
+    db = session_factory()
+    db.add(DecisionTrace(request_id="legacy", agent_name="memory_agent",
+                         created_at=TODAY - timedelta(days=30)))
+    db.commit()
+    db.close()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 4, "fields": "request_id"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/admin/decision-traces/", params=params, headers=HEADERS)
+        seen += [row["request_id"] for row in response.json()]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+
+    assert seen == ["run-0"] * 3 + ["run-1"] * 3 + ["run-2"] * 3 + ["legacy"]
+
+
+def test_export_streams_every_partition(session_factory, persist, client):
+    db = session_factory()
+    db.add(DecisionTrace(request_id="legacy", agent_name="memory_agent",
+                         created_at=TODAY - timedelta(days=30)))
+    db.commit()
+    db.close()
+    persist(("new", TODAY, "completed"), ("old", TODAY - timedelta(days=1), "completed"))
+
+    response = client.get("/admin/export/decision-traces",
+                          params={"fields": "id,request_id"}, headers=HEADERS)
+
+    rows = [orjson.loads(line) for line in response.text.splitlines()]
+    assert [r["request_id"] for r in rows] == ["legacy"] + ["old"] * 3 + ["new"] * 3
+    assert [r["id"] for r in rows] == sorted(r["id"] for r in rows)
+
+
+def test_run_and_search_read_the_right_partition(persist, client):
+    persist(("a", TODAY, "completed"), ("b", TODAY - timedelta(days=2), "blocked"))
+
+    body = client.get("/admin/runs/b", headers=HEADERS).json()
+    assert [s["agent_name"] for s in body["steps"]] == ["memory_agent", "safety_agent", "action_agent"]
+
+    response = client.get("/admin/decision-traces/search",
+                          params={"q": "safety_agent metformin"}, headers=HEADERS)
+    assert sorted(r["request_id"] for r in response.json()) == ["a", "b"]
+
+    response = client.get("/admin/decision-traces/search",
+                          params={"q": "metformin", "decision": "blocked"}, headers=HEADERS)
+    assert [r["request_id"] for r in response.json()] == ["b"]
+
+    trace_id = response.json()[0]["id"]
+    assert client.get(f"/admin/decision-traces/{trace_id}", headers=HEADERS).json()["request_id"] == "b"
+
+
+def test_expired_partitions_are_dropped(session_factory, partitions, persist, monkeypatch):
+    monkeypatch.setattr(trace_retention, "SessionLocal", session_factory)
+    persist(*[(f"run-{i}", TODAY - timedelta(days=i * 10), "completed") for i in range(4)])
+    old_file = partitions.partition(date(2024, 4, 20)).path
+
+    expired = trace_retention.expire_trace_partitions(partitions, now=TODAY, retention_days=15)
+
+    assert expired == [date(2024, 4, 30), date(2024, 4, 20)]
+    assert not os.path.exists(old_file)
+    assert partitions.days() == [date(2024, 5, 20), date(2024, 5, 10)]
+    assert _count(session_factory, RunSummary) == 2
+
+
+def test_downsampling_keeps_blocked_and_failed_runs_once(session_factory, partitions, persist, monkeypatch):
+    monkeypatch.setattr(trace_retention, "SessionLocal", session_factory)
+    old = TODAY - timedelta(days=20)
+    persist(("ok", old, "completed"), ("blocked", old, "blocked"), ("recent", TODAY, "completed"))
+
+    sink = TraceSink(session_factory, flush_interval=0, partitions=partitions)
+    sink.submit(_run("failed", old)[:1] + [{
+        "request_id": "failed", "agent_name": "workflow", "reasoning": None,
+        "decision": '"error"', "created_at": old
+    }])
+    sink.stop(timeout=5)
+
+    deleted = trace_retention.downsample_trace_partitions(partitions, now=TODAY, after_days=14)
+
+    assert deleted == 3
+    kept = {row["request_id"] for row in partitions.page(None, limit=100)[0]}
+    assert kept == {"blocked", "failed", "recent"}
+    assert _count(session_factory, RunSummary) == 2  # "ok" summary removed
+
+    # Already downsampled days are skipped
+    assert trace_retention.downsample_trace_partitions(partitions, now=TODAY, after_days=14) == 0
+
+
+def test_downsampling_handles_traces_without_a_run(partitions):
+    old = date(2024, 5, 1)
+    partitions.insert(old, [
+        {"request_id": None, "agent_name": "workflow", "decision": decision,
+         "created_at": datetime(2024, 5, 1, 12)}
+        for decision in ('"approved"', None, '"error"')
+    ])
+
+    assert partitions.downsample(old) == 2
+    assert [row["decision"] for row in partitions.page(None, limit=10)[0]] == ['"error"']
+
+
+# Largest id each dialect's integer column types hold
+ID_MAX = {
+    "postgresql": {"SMALLINT": 2 ** 15 - 1, "INTEGER": 2 ** 31 - 1, "BIGINT": 2 ** 63 - 1},
+    "sqlite": {"INTEGER": 2 ** 63 - 1, "BIGINT": 2 ** 63 - 1},
+}
+
+
+@pytest.mark.parametrize("dialect", [postgresql.dialect(), sqlite.dialect()], ids=lambda d: d.name)
+def test_partition_id_column_holds_the_partition_id_range(dialect):
+    id_type = partition_table("decision_traces_20240520").c.id.type.compile(dialect=dialect)
+
+    for day in (TODAY.date(), date(2100, 1, 1)):
+        first, last = id_range(day)
+        assert last < ID_MAX[dialect.name][id_type]
+        assert first // ID_SPAN == last // ID_SPAN == day.toordinal()
+
+
+def test_bad_cursor_is_a_400(client):
+    response = client.get("/admin/decision-traces/", params={"cursor": "not-a-cursor"}, headers=HEADERS)
+
+    assert response.status_code == 400
@@ -0,0 +1,56 @@
+import json
+
+import orjson
+import pytest
+
+from app.audit.segment_log import encode_record
+from app.observability import trace_record
+from app.observability.trace_record import TraceRecord
+
+
+def _record():
+    safety = {"approved": False, "decision": "blocked", "violations": ["Quantity 99 exceeds allowed limit (30)"]}
+    return TraceRecord(
+        "safety_agent", "blocked",
+        input=[{"name": "Paracetamol", "quantity": 99}],
+        reasoning=["⚠️ Quantity 99 exceeds max limit of 30"],
+        output=safety
+    )
+
+
+def test_reads_like_the_previous_trace_dicts():
+    record = TraceRecord("predictive_refill_agent", "alerts_generated", output=[])
+
+    assert record["agent"] == "predictive_refill_agent"
+    assert record.get("reasoning") is None
+    assert dict(record) == {"agent": "predictive_refill_agent", "decision": "alerts_generated", "output": []}
+    assert record == {"agent": "predictive_refill_agent", "decision": "alerts_generated", "output": []}
+    assert not hasattr(record, "__dict__")
+
+
+def test_holds_references_not_copies():
+    record = _record()
+    record.output["violations"].append("late")
+    assert record["output"]["violations"][-1] == "late"
+
+
+def test_db_row_and_audit_line_share_one_encoding(monkeypatch):
+    calls = []
+    real = trace_record._encode
+    monkeypatch.setattr(trace_record, "_encode", lambda v: calls.append(v) or real(v))
+
+    record = _record()
+    record.request_id = "req-1"
+    row = record.as_row()
+    line = encode_record({"run_id": "req-1", "decision_trace": [record]})
+
+    assert len(calls) == 5  # each field once, reused by the audit line
+    assert json.loads(row["output"]) == record["output"]
+    assert row["decision"] == '"blocked"'
+    assert orjson.loads(line)["decision_trace"] == [dict(record)]
+
+
+@pytest.mark.parametrize("value", [{1: "int keys"}, {"when": __import__("datetime").datetime(2024, 1, 1)}])
+def test_non_json_values_are_encoded(value):
+    row = TraceRecord("memory_agent", "context_provided", output=value).as_row()
+    assert orjson.loads(row["output"])
@@ -0,0 +1,117 @@
+from datetime import datetime
+
+import orjson
+import pytest
+
+from app.api import decision_traces
+from app.db.migrations import run_migrations
+from app.db.models import DecisionTrace
+from app.security.admin_auth import ADMIN_API_KEY
+from app.services.trace_search_service import search_terms, search_traces
+
+
+def _trace(request_id, agent, decision, reasoning, created_at=datetime(2024, 5, 1)):
+    return DecisionTrace(
+        request_id=request_id,
+        agent_name=agent,
+        decision=orjson.dumps(decision).decode(),
+        reasoning=orjson.dumps(reasoning).decode(),
+        output=orjson.dumps({"decision": decision}).decode(),
+        created_at=created_at
+    )
+
+
+TRACES = [
+    ("r1", "safety_agent", "blocked", ["Insufficient stock for Metformin"], datetime(2024, 5, 1)),
+    ("r2", "safety_agent", "blocked", ["Metformin requires a prescription", "prescription required"], datetime(2024, 5, 2)),
+    ("r3", "safety_agent", "approved", ["Stock for Metformin is sufficient"], datetime(2024, 5, 3)),
+    ("r4", "action_agent", "order_created", ["Order placed for Paracetamol"], datetime(2024, 5, 4)),
+]
+
+
+@pytest.fixture
+def db(session_factory):
+    run_migrations(session_factory.kw["bind"])
+    db = session_factory()
+    db.add_all([_trace(*t) for t in TRACES])
+    db.commit()
+    yield db
+    db.close()
+
+
+def _ids(results):
+    return [r["request_id"] for r in results]
+
+
+def test_search_terms():
+    assert search_terms('"insufficient stock" metformin "') == ["insufficient stock", "metformin"]
+
+
+def test_phrases_and_words_must_all_match(db):
+    assert _ids(search_traces(db, '"Insufficient stock for Metformin"')) == ["r1"]
+    assert _ids(search_traces(db, "prescription required")) == ["r2"]
+    assert sorted(_ids(search_traces(db, "metformin stock"))) == ["r1", "r3"]
+    assert search_traces(db, '"stock insufficient"') == []
+
+
+def test_filters_on_agent_decision_and_time(db):
+    assert sorted(_ids(search_traces(db, "metformin", decision="blocked"))) == ["r1", "r2"]
+    assert _ids(search_traces(db, "order", agent_name="action_agent")) == ["r4"]
+    assert _ids(search_traces(db, "metformin", start=datetime(2024, 5, 2), end=datetime(2024, 5, 3))) == ["r2"]
+
+
+def test_results_are_ranked(db):
+    results = search_traces(db, "prescription")
+    assert _ids(results) == ["r2"]
+
+    db.add(_trace("r5", "safety_agent", "blocked", ["prescription"], datetime(2024, 5, 5)))
+    db.add(_trace("r6", "safety_agent", "blocked", ["see notes"], datetime(2024, 5, 6)))
+    db.commit()
+    db.query(DecisionTrace).filter(DecisionTrace.request_id == "r6").update(
+        {"output": orjson.dumps({"notes": "prescription"}).decode()}
+    )
+    db.commit()
+
+    results = search_traces(db, "prescription")
+    assert set(_ids(results)) == {"r2", "r5", "r6"}
+    assert [r["rank"] for r in results] == sorted((r["rank"] for r in results), reverse=True)
+    # A reasoning match outranks the same word in the output
+    assert _ids(results).index("r5") < _ids(results).index("r6")
+
+
+def test_only_the_newest_candidates_are_ranked(db):
+    assert sorted(_ids(search_traces(db, "metformin", candidates=2))) == ["r2", "r3"]
+
+
+def test_index_follows_deletes(db):
+    db.query(DecisionTrace).filter(DecisionTrace.request_id == "r1").delete()
+    db.commit()
+    assert search_traces(db, "insufficient") == []
+
+
+def test_migration_indexes_existing_traces(session_factory):
+    db = session_factory()
+    try:
+        db.add(_trace(*TRACES[0]))
+        db.commit()
+        run_migrations(session_factory.kw["bind"])
+        assert _ids(search_traces(db, "insufficient")) == ["r1"]
+    finally:
+        db.close()
+
+
+def test_search_endpoint(db, session_factory, monkeypatch, api_client):
+    monkeypatch.setattr(decision_traces, "ReadSessionLocal", session_factory)
+    headers = {"X-ADMIN-KEY": ADMIN_API_KEY}
+
+    response = api_client.get(
+        "/admin/decision-traces/search",
+        params={"q": "metformin", "decision": "blocked", "limit": 1},
+        headers=headers
+    )
+    assert response.status_code == 200
+    [match] = response.json()
+    assert match["request_id"] in ("r1", "r2") and "rank" in match
+
+    response = api_client.get("/admin/decision-traces/search", params={"q": '""'}, headers=headers)
+    assert response.status_code == 400
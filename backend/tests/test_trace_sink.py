@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+from sqlalchemy import event
+
+from app.db.models import DecisionTrace
+from app.observability.trace_sink import TraceSink
+
+
+def _run(request_id, agents=("memory_agent", "safety_agent", "action_agent")):
+    return [
+        {
+            "request_id": request_id,
+            "agent_name": agent,
+            "input": None,
+            "reasoning": None,
+            "decision": '"ok"',
+            "output": None,
+        }
+        for agent in agents
+    ]
+
+
+class BlockingFactory:
+    """Session factory whose sessions wait for `release` (a busy database)."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.entered.set()
+        self.release.wait(5)
+        return self.factory()
+
+
+@pytest.fixture
+def sinks():
+    created = []
+    yield created
+    for sink in created:
+        sink.stop(timeout=5)
+
+
+def _count(session_factory):
+    db = session_factory()
+    try:
+        return db.query(DecisionTrace).count()
+    finally:
+        db.close()
+
+
+def test_runs_are_batched_into_one_executemany(session_factory, sinks):
+    inserts = []
+    engine = session_factory.kw["bind"]
+    event.listen(
+        engine, "before_cursor_execute",
+        lambda conn, cursor, statement, params, context, executemany:
+            inserts.append(executemany) if statement.startswith("INSERT") else None
+    )
+
+    sink = TraceSink(session_factory, flush_interval=5, batch_size=1000)
+    sinks.append(sink)
+    for i in range(10):
+        assert sink.submit(_run(f"req-{i}"))
+    assert sink.flush(timeout=5)
+
+    assert _count(session_factory) == 30
+    assert inserts == [True]
+
+
+def test_stop_writes_everything_accepted(session_factory):
+    sink = TraceSink(session_factory, flush_interval=5)
+    for i in range(5):
+        sink.submit(_run(f"req-{i}"))
+    sink.stop(timeout=5)
+
+    assert sink.written == 15
+    assert _count(session_factory) == 15
+
+
+@pytest.mark.parametrize("overflow", ["drop", "block"])
+def test_full_queue_applies_the_overflow_policy(session_factory, sinks, overflow):
+    busy = BlockingFactory(session_factory)
+    sink = TraceSink(busy, queue_size=1, flush_interval=0, overflow=overflow, block_timeout=0.05)
+    sinks.append(sink)
+
+    assert sink.submit(_run("in-flight"))
+    assert busy.entered.wait(5)
+    assert sink.submit(_run("queued"))
+    assert sink.submit(_run("overflow")) is False
+    assert sink.dropped == 1
+
+    busy.release.set()
+    assert sink.flush(timeout=5)
+    assert _count(session_factory) == 6
+
+
+def test_failed_batches_are_retried(session_factory, sinks):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        return session_factory()
+
+    sink = TraceSink(flaky, flush_interval=0, retries=2)
+    sinks.append(sink)
+    sink.submit(_run("req"))
+    sink.flush(timeout=5)
+
+    assert (sink.written, sink.failed) == (3, 0)
+    assert _count(session_factory) == 3
@@ -0,0 +1,127 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.agents import safety_agent
+from app.graph import pharmacy_workflow
+from app.observability.tracing import record_step, should_persist, start_trace
+
+
+def _state(level="full", sample_rate=1.0):
+    return {"decision_trace": [], "meta": {"trace": start_trace(level, sample_rate)}}
+
+
+class Builder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"input": "x", "output": {"big": list(range(10))}}
+
+
+def test_full_level_builds_payloads_for_sampled_runs():
+    state, build = _state(), Builder()
+    record_step(state, "conversation_agent", "extracted", build)
+
+    assert build.calls == 1
+    assert state["decision_trace"] == [
+        {"agent": "conversation_agent", "decision": "extracted", "input": "x", "output": {"big": list(range(10))}}
+    ]
+    assert should_persist(state)
+
+
+@pytest.mark.parametrize("level,sample_rate", [("off", 1.0), ("decisions", 1.0), ("full", 0.0)])
+def test_payloads_are_never_built_when_not_kept(level, sample_rate):
+    state, build = _state(level, sample_rate), Builder()
+    record_step(state, "memory_agent", "context_provided", build)
+
+    assert build.calls == 0
+    expected = [] if level == "off" else [{"agent": "memory_agent", "decision": "context_provided"}]
+    assert state["decision_trace"] == expected
+
+
+def test_sampled_out_runs_are_kept_when_blocked():
+    state = _state("full", sample_rate=0.0)
+    record_step(state, "conversation_agent", "extracted", Builder())
+    assert not should_persist(state)
+
+    build = Builder()
+    record_step(state, "safety_agent", "blocked", build, keep=True)
+
+    assert build.calls == 1
+    assert should_persist(state)
+    # Recorded before the outcome was known: decision detail only
+    assert state["decision_trace"][0] == {"agent": "conversation_agent", "decision": "extracted"}
+    assert "output" in state["decision_trace"][1]
+
+
+def test_off_level_persists_nothing():
+    state = _state("off")
+    record_step(state, "safety_agent", "blocked", Builder(), keep=True)
+    assert state["decision_trace"] == []
+    assert not should_persist(state)
+
+
+def test_failed_runs_are_always_persisted(monkeypatch):
+    submitted, audited = [], []
+    monkeypatch.setattr(pharmacy_workflow.trace_sink, "submit",
+                        lambda rows, summary: submitted.append((rows, summary)))
+    monkeypatch.setattr(pharmacy_workflow, "write_decision_log",
+                        lambda state, run_id: audited.append(run_id))
+    monkeypatch.setattr(pharmacy_workflow, "start_trace", lambda: start_trace("full", 0.0))
+
+    class BrokenGraph:
+        def invoke(self, state):
+            raise ValueError("boom")
+
+    monkeypatch.setattr(pharmacy_workflow, "build_pharmacy_graph", BrokenGraph)
+
+    with pytest.raises(RuntimeError):
+        pharmacy_workflow.run_workflow(1, "I need paracetamol")
+
+    [(records, summary)] = submitted
+    rows = [r.as_row() for r in records]
+    assert [(r["agent_name"], r["decision"]) for r in rows] == [("workflow", '"error"')]
+    assert audited == [rows[0]["request_id"]]
+    assert (summary["request_id"], summary["status"], summary["steps"]) == (rows[0]["request_id"], "failed", 1)
+
+
+class CountingName(str):
+    formatted = 0
+
+    def __format__(self, spec):
+        CountingName.formatted += 1
+        return str.__format__(self, spec)
+
+
+class FakeSession:
+    def __init__(self, medicines):
+        self.medicines = medicines
+
+    def query(self, model):
+        return SimpleNamespace(all=lambda: self.medicines)
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("quantity,formatted", [(1, False), (500, True)])
+def test_safety_reasoning_is_formatted_only_when_kept(monkeypatch, quantity, formatted):
+    name = CountingName("Paracetamol 500mg")
+    medicine = SimpleNamespace(id=1, name=name, prescription_required=False, stock_quantity=50)
+    monkeypatch.setattr(safety_agent, "ReadSessionLocal", lambda: FakeSession([medicine]))
+    CountingName.formatted = 0
+
+    state = _state("full", sample_rate=0.0)
+    state.update(customer={"id": 1},
+                 extraction={"medicines": [{"name": "paracetamol", "quantity": quantity, "dosage": "500mg"}]})
+    safety_agent.safety_agent(state)
+
+    # Approved and sampled out: nothing formatted. Blocked: kept in full
+    assert bool(CountingName.formatted) == formatted
+    step = state["decision_trace"][-1]
+    if formatted:
+        assert "✅ Found medicine 'Paracetamol 500mg' (OTC=True)" in step["reasoning"]
+    else:
+        assert "reasoning" not in step